@@ -1,233 +1,450 @@
-from integration.blockchain_interface import BlockchainInterface
+from integration.chain_backends import connect_chain, CHAIN_BACKENDS, DEFAULT_NODE_URL
 from integration.ml_interface import MLInterface
+from integration.scoring_pool import ScoringPool
+from integration.checkpoint import MonitorCheckpoint
+from integration.telemetry import Metrics, MetricsServer, configure_logging
+from ml.evaluation import classification_metrics, roc_auc, SWEEP_THRESHOLDS
+from ml.dataset import TransactionDataset, is_dataset
+from ml.feature_cache import FeatureCache, DEFAULT_CACHE_DIR
 from web3 import Web3
 import time
-import datetime
 import json
 import argparse
 import pandas as pd
 import os
-import traceback
+import logging
 
-def generate_sample_transaction():
-    """Generate a sample transaction from the sample_transactions.csv file"""
-    # Path to the sample transactions CSV file
-    csv_path = os.path.join('data', 'sample_transactions.csv')
-    
-    # Read the sample transactions if we haven't already
-    if not hasattr(generate_sample_transaction, 'transactions'):
-        generate_sample_transaction.transactions = pd.read_csv(csv_path)
-        print(f"Loaded {len(generate_sample_transaction.transactions)} sample transactions from {csv_path}")
-        generate_sample_transaction.current_index = 0
-    
-    # Get the current transaction
-    transaction = generate_sample_transaction.transactions.iloc[generate_sample_transaction.current_index]
-    generate_sample_transaction.current_index += 1
-    
-    # Convert timestamp string to Unix timestamp
-    timestamp_str = transaction['timestamp']
-    timestamp_dt = pd.to_datetime(timestamp_str)
-    timestamp_unix = int(timestamp_dt.timestamp())
-    
-    # Format the transaction for our use - using column names
-    return {
-        'sender': transaction['sender'],  
-        'receiver': transaction['receiver'],
-        'amount': float(transaction['amount']),
-        'timestamp': timestamp_unix,  # Now a proper UNIX timestamp
-        'is_fraud': int(transaction['is_fraud'])
-    }
+# Pickle-free model directory written by ml/train.py; worker processes map it
+# instead of each unpickling a private copy
+MODEL_ARTIFACT_PATH = 'ml/saved_models/fraud_model'
+
+# Transactions scored above this fraud probability are flagged on chain
+FLAG_THRESHOLD = 0.4
+
+log = logging.getLogger('fraud_monitor')
 
-def main(mode='monitor'):
+def main(mode='monitor', poll_interval=1.0, workers=1, checkpoint_path='data/monitor_checkpoint.json',
+         reset_checkpoint=False, from_id=1, to_id=None, batch_size=1000,
+         data_path='data/sample_transactions.csv', threshold=FLAG_THRESHOLD, write_chain=False,
+         feature_cache_dir=DEFAULT_CACHE_DIR, metrics_port=None, chain='node', rpc_url=DEFAULT_NODE_URL):
     # Initialize interfaces
-    blockchain = BlockchainInterface()
-    ml = MLInterface()
+    ml = MLInterface(metrics=Metrics())
     
-    if mode == 'test':
-        print("Running in test mode: analyzing sample transactions from CSV file")
-        
-        # Load all transactions from the CSV
-        csv_path = os.path.join('data', 'sample_transactions.csv')
-        transactions_df = pd.read_csv(csv_path)
-        total_transactions = len(transactions_df)
-        
-        # Find all fraud indices first for better visibility
-        fraud_indices = []
-        for i in range(len(transactions_df)):
-            if transactions_df.iloc[i]['is_fraud'] == 1:
-                fraud_indices.append(i)
-                
-        print(f"Processing CSV with {total_transactions} total transactions from {csv_path}")
-        print(f"Found {len(fraud_indices)} fraudulent transactions at indices: {fraud_indices}")
-        print("Analyzing only fraudulent transactions...\n")
+    if mode in ('evaluate', 'test'):
+        # Offline evaluation needs no node unless its results go on chain;
+        # test mode is evaluation that also writes the CSV's frauds on chain
+        blockchain = connect_chain(chain, rpc_url) if write_chain or mode == 'test' else None
+        cache = FeatureCache(feature_cache_dir) if feature_cache_dir else None
+        evaluate_model(ml, data_path, threshold, blockchain, cache)
+            
+    elif mode in ('monitor', 'backfill'):
+        if metrics_port:
+            server = MetricsServer(ml.metrics, port=metrics_port).start()
+            log.info("Serving metrics on http://%s:%d/metrics and /metrics.json", *server.address)
+        blockchain = connect_chain(chain, rpc_url)
+        pool = None
+        if workers > 1:
+            model_path = MODEL_ARTIFACT_PATH if os.path.isdir(MODEL_ARTIFACT_PATH) else ml.model_path
+            pool = ScoringPool(ml, workers, model_path)
         
-        # Track fraudulent transactions and ML performance
-        fraud_count = 0
-        processed_count = 0
-        ml_correct = 0
-        ml_missed = 0
-        avg_fraud_score = 0
+        if mode == 'monitor':
+            checkpoint = MonitorCheckpoint(checkpoint_path)
+            if reset_checkpoint and os.path.exists(checkpoint_path):
+                os.remove(checkpoint_path)
+            monitor_transactions(blockchain, ml, poll_interval, pool, checkpoint)
+        else:
+            backfill_transactions(blockchain, ml, from_id, to_id, batch_size, pool)
+
+def evaluate_model(ml, data_path, threshold=FLAG_THRESHOLD, blockchain=None, cache=None):
+    """Score a labelled CSV or dataset directory in one vectorized pass and report
+    detection metrics; with a blockchain, also write its fraudulent transactions
+    on chain in bulk"""
+    print(f"Running in evaluation mode: scoring {data_path}")
+    
+    # Replay the dataset's address history from empty profiles, as training
+    # does (or reuse the features a previous run cached); evaluation never
+    # saves the profiles
+    start = time.time()
+    X, y = ml.model.feature_matrix(data_path, cache)
+    labels = y.to_numpy(dtype=bool)
+    fraud_proba = ml.model.predict_features(X)['fraud_probability']
+    scoring_seconds = time.time() - start
+    print(f"Scored {len(labels)} transactions ({labels.sum()} labelled fraud) in {scoring_seconds:.2f}s "
+          f"({len(labels) / scoring_seconds:.0f} tx/s)")
+    
+    metrics = classification_metrics(labels, fraud_proba, [threshold])
+    tp, fp, tn, fn = (int(metrics[key][0]) for key in ('tp', 'fp', 'tn', 'fn'))
+    auc = roc_auc(labels, fraud_proba)
+    
+    print(f"\n===== ML MODEL PERFORMANCE (threshold {threshold}) =====")
+    print(f"{'':>16} {'predicted fraud':>16} {'predicted legit':>16}")
+    print(f"{'actual fraud':>16} {tp:>16} {fn:>16}")
+    print(f"{'actual legit':>16} {fp:>16} {tn:>16}")
+    print(f"Precision: {metrics['precision'][0]:.4f}")
+    print(f"Recall: {metrics['recall'][0]:.4f}")
+    print(f"F1: {metrics['f1'][0]:.4f}")
+    print(f"Accuracy: {metrics['accuracy'][0]:.4f}")
+    print(f"ROC AUC: {auc:.4f}" if auc is not None else "ROC AUC: undefined (only one class present)")
+    if labels.any():
+        print(f"Average fraud probability of frauds: {fraud_proba[labels].mean():.2f}")
+    
+    sweep = classification_metrics(labels, fraud_proba, SWEEP_THRESHOLDS)
+    print("\n===== THRESHOLD SWEEP =====")
+    print(f"{'threshold':>9} | {'precision':>9} | {'recall':>6} | {'f1':>6} | {'flagged':>7}")
+    for i, sweep_threshold in enumerate(sweep['threshold']):
+        print(f"{sweep_threshold:>9.2f} | {sweep['precision'][i]:>9.4f} | {sweep['recall'][i]:>6.4f} | "
+              f"{sweep['f1'][i]:>6.4f} | {sweep['tp'][i] + sweep['fp'][i]:>7}")
+    print("===========================\n")
+    
+    if blockchain is not None:
+        df = TransactionDataset.load(data_path).to_frame() if is_dataset(data_path) else pd.read_csv(data_path)
+        write_frauds_to_chain(blockchain, df[labels], fraud_proba[labels], threshold)
+
+def write_frauds_to_chain(blockchain, frauds, fraud_proba, threshold):
+    """Add labelled frauds to the contract and flag the ones the model caught,
+    pipelining the writes instead of waiting for each receipt"""
+    print(f"Writing {len(frauds)} fraudulent transactions on chain...")
+    start = time.time()
+    
+    futures = [
+        blockchain.add_transaction_async(Web3.to_checksum_address(receiver), int(amount))
+        for receiver, amount in zip(frauds['receiver'], frauds['amount'])
+    ]
+    tx_ids = [future.result() for future in futures]
+    
+    caught = fraud_proba > threshold
+    flagged_ids = [tx_id for tx_id, is_caught in zip(tx_ids, caught) if is_caught]
+    if flagged_ids:
+        blockchain.flag_transactions_async(flagged_ids, fraud_proba[caught].tolist())
+    blockchain.close()
+    
+    if tx_ids:
+        print(f"Added transactions {tx_ids[0]}-{tx_ids[-1]} and flagged {len(flagged_ids)} of them "
+              f"in {time.time() - start:.1f}s")
+
+def monitor_transactions(blockchain, ml, poll_interval=1.0, pool=None, checkpoint=None):
+    """Analyze new transactions as their TransactionAdded events are mined"""
+    metrics = ml.metrics
+    log.info("Running in monitoring mode: listening for TransactionAdded events")
+    if pool is not None:
+        log.info("Scoring with %d worker processes", pool.workers)
+    
+    # Initialize counters for statistics
+    fraud_count = 0
+    ml_correct = 0
+    ml_missed = 0
+    total_transactions = 0
+    event_filter = None
+    
+    # Flags are submitted without waiting for receipts; failures are reported
+    # as their futures resolve. Their confidences are kept for the checkpoint.
+    pending_flags = {}
+    pending_confidences = {}
+    
+    def submit_flags(ids, confidences):
+        with metrics.time('flag_submit'):
+            futures = blockchain.flag_transactions_async(ids, confidences)
+        # Time from submission until the receipt (or failure) comes back
+        submitted = time.perf_counter()
+        for future in set(futures):
+            future.add_done_callback(lambda _: metrics.observe('flag_confirm', time.perf_counter() - submitted))
+        pending_flags.update(zip(ids, futures))
+        pending_confidences.update(zip(ids, confidences))
+    
+    contract_address = blockchain.contract_address
+    state = checkpoint.load(contract_address) if checkpoint is not None else None
+    if state is not None:
+        # Resume after the last committed transaction; rescan its block, the
+        # id check below skips what was already analyzed
+        last_checked_id = state['last_checked_id']
+        last_block = state['last_block'] - 1
+        total_transactions = state['stats']['total_transactions']
+        fraud_count = state['stats']['fraud_count']
+        ml_correct = state['stats']['ml_correct']
+        ml_missed = state['stats']['ml_missed']
+        log.info("Resuming from checkpoint %s (transaction ID: %d, block %d, saved %s)",
+                 checkpoint.path, last_checked_id, state['last_block'], state['saved_at'])
         
-        # Process each transaction in the CSV
-        for i in range(total_transactions):
-            try:
-                # Generate sample transaction from CSV
-                tx = generate_sample_transaction()
-                current_index = generate_sample_transaction.current_index - 1
-                processed_count += 1
-                
-                # Skip non-fraudulent transactions
-                if tx['is_fraud'] == 0:
-                    continue
-                
-                fraud_count += 1
+        # Flags that may not have been mined before the last shutdown;
+        # flagging is idempotent, so send them again
+        if state['pending_flags']:
+            submit_flags(list(state['pending_flags']), list(state['pending_flags'].values()))
+            log.info("Resubmitted %d unconfirmed flags", len(state['pending_flags']))
+    else:
+        # Start from the current chain head to avoid monitoring old transactions
+        last_block = blockchain.get_block_number()
+        last_checked_id = blockchain.transaction_count()
+        log.info("Starting monitoring from block %d (transaction ID: %d)", last_block, last_checked_id)
+    
+    def save_checkpoint():
+        if checkpoint is not None:
+            with metrics.time('checkpoint'):
+                checkpoint.save(
+                    contract_address, last_checked_id, last_block,
+                    {
+                        'total_transactions': total_transactions,
+                        'fraud_count': fraud_count,
+                        'ml_correct': ml_correct,
+                        'ml_missed': ml_missed
+                    },
+                    pending_confidences
+                )
+    
+    while True:
+        try:
+            cycle_start = time.perf_counter()
+            # The cycle's high-water mark. The watermark and the statistics only
+            # move to it once the cycle's flags are submitted, so a cycle cut
+            # short (Ctrl+C, an RPC error) is analyzed again from its start
+            # instead of being skipped with its suspicious ids never flagged.
+            cycle_last_id = last_checked_id
+            cycle_last_block = last_block
+            with metrics.time('poll'):
+                if event_filter is None:
+                    # Install the log filter first, then catch up with eth_getLogs on
+                    # anything mined since the last processed block so nothing falls
+                    # between the two
+                    event_filter = blockchain.create_transaction_filter(last_block + 1)
+                    head = blockchain.get_block_number()
+                    new_transactions = blockchain.get_transaction_events(last_block + 1, head)
+                    cycle_last_block = max(last_block, head)
+                else:
+                    new_transactions = blockchain.get_new_transaction_events(event_filter)
+            
+            # The filter and the catch-up range can overlap; skip ids already analyzed
+            new_transactions = sorted(
+                (tx for tx in new_transactions if tx['id'] > last_checked_id),
+                key=lambda tx: tx['id']
+            )
+            metrics.set('backlog_transactions', len(new_transactions))
+            
+            if new_transactions:
+                log.info("Found %d new transactions", len(new_transactions))
+            
+            # Suspicious ids of this cycle, flagged together once it is analyzed
+            suspicious_ids = []
+            suspicious_probs = []
+            
+            # With a worker pool the whole cycle is scored up front, sharded by
+            # id range; results come back in id order
+            pool_results = None
+            if pool is not None and new_transactions:
+                with metrics.time('pool_scoring'):
+                    pool_results = pool.process_transactions_batch(new_transactions)
+            
+            # Analyze each new transaction straight from its event payload
+            for index, blockchain_tx in enumerate(new_transactions):
+                tx_id = blockchain_tx['id']
                 
-                # Convert float amount to integer for blockchain
-                int_amount = int(tx['amount'])
+                # Get ML analysis
+                if pool_results is not None:
+                    fraud_prob = pool_results[index]['fraud_probability']
+                else:
+                    fraud_prob = ml.analyze_transaction(blockchain_tx)['fraud_probability']
                 
-                # Convert receiver address to checksum format
-                checksummed_receiver = Web3.to_checksum_address(tx['receiver'])
+                # Process the transaction based on ML probability
+                if fraud_prob > FLAG_THRESHOLD:
+                    log.warning("Suspicious transaction #%d: amount %s from %s to %s, %.2f probability of fraud",
+                                tx_id, blockchain_tx['amount'], blockchain_tx.get('sender'), blockchain_tx['receiver'],
+                                fraud_prob, extra=_transaction_fields(blockchain_tx, fraud_prob))
+                    suspicious_ids.append(tx_id)
+                    suspicious_probs.append(fraud_prob)
+                elif log.isEnabledFor(logging.DEBUG):
+                    log.debug("Transaction #%d: %.2f probability of fraud", tx_id, fraud_prob,
+                              extra=_transaction_fields(blockchain_tx, fraud_prob))
                 
-                try:
-                    # Add transaction to blockchain with better error handling
-                    tx_id = blockchain.add_transaction(checksummed_receiver, int_amount)
-                    print(f"FRAUDULENT TRANSACTION #{fraud_count}")
-                    print(f"CSV Index: {current_index}")
-                    print(f"Transaction ID: {tx_id}")
-                    print(f"Amount: {tx['amount']} to {tx['receiver']}")
-                    print(f"Original timestamp: {tx['timestamp']}")
-                    
-                    # Get ML analysis
-                    ml_prediction = ml.analyze_transaction({
-                        'sender': tx['sender'],
-                        'receiver': tx['receiver'],
-                        'amount': tx['amount'],
-                        'timestamp': tx['timestamp']  # Already a Unix timestamp, no need to convert
-                    })
-                    
-                    print(f"ML Analysis: {ml_prediction}")
-                    
-                    # Adjust this threshold to match the monitor mode threshold (0.4)
-                    fraud_prob = ml_prediction['fraud_probability']
-                    avg_fraud_score += fraud_prob
-                    if fraud_prob > 0.4:  # Changed from 0.5 to 0.4
-                        print(f"✓ ML AGREES: Transaction {tx_id} flagged as potentially fraudulent")
-                        ml_correct += 1
+                cycle_last_id = tx_id
+                cycle_last_block = max(cycle_last_block, blockchain_tx['block_number'])
+            
+            if suspicious_ids:
+                submit_flags(suspicious_ids, suspicious_probs)
+                metrics.inc('transactions_flagged', len(suspicious_ids))
+            metrics.inc('transactions_processed', len(new_transactions))
+            
+            # Every suspicious id of the cycle is now pending: commit it
+            last_checked_id, last_block = cycle_last_id, cycle_last_block
+            total_transactions += len(new_transactions)
+            fraud_count += len(suspicious_ids)
+            ml_correct += len(suspicious_ids)
+            
+            # Report flags that have been mined or have failed since the last pass
+            for flagged_id, future in list(pending_flags.items()):
+                if future.done():
+                    del pending_flags[flagged_id]
+                    del pending_confidences[flagged_id]
+                    if future.exception() is not None:
+                        metrics.inc('flag_failures')
+                        log.error("Flagging transaction %d failed: %s", flagged_id, future.exception(),
+                                  extra={'tx_id': flagged_id})
                     else:
-                        print(f"⚠️ ML DISAGREES: CSV says fraud, but ML gives only {fraud_prob:.2f} probability")
-                        print(f"   Features: Amount={tx['amount']}, Hour={datetime.datetime.fromtimestamp(tx['timestamp']).hour}")
-                        ml_missed += 1
-                    
-                except Exception as e:
-                    print(f"Error with blockchain transaction: {e}")
-                    traceback.print_exc(limit=1)
+                        metrics.inc('flags_confirmed')
+            metrics.set('flag_queue', len(pending_flags))
+            
+            # Display statistics
+            if new_transactions:
+                # The cycle is committed: persist the watermark before polling again
+                save_checkpoint()
+                metrics.observe('cycle', time.perf_counter() - cycle_start)
                 
-                print("-" * 60)
-                #time.sleep(1)  # Small delay between transactions
+                log.info("Processed %d transactions (%d suspicious, detection rate %.2f); "
+                         "%d flags awaiting confirmation",
+                         total_transactions, fraud_count, fraud_count / total_transactions, len(pending_flags),
+                         extra={'total_transactions': total_transactions, 'fraud_count': fraud_count,
+                                'flag_queue': len(pending_flags)})
             
-            except Exception as e:
-                print(f"Error processing transaction {i+1}: {e}")
-                continue
-        
-        # Calculate ML performance metrics
-        if fraud_count > 0:
-            avg_fraud_score = avg_fraud_score / fraud_count
-            recall = ml_correct / fraud_count if fraud_count > 0 else 0
+            time.sleep(poll_interval)  # Poll the filter about once per block
             
-            print("\n===== ML MODEL PERFORMANCE =====")
-            print(f"ML Detection Rate: {recall:.2f} ({ml_correct} detected out of {fraud_count} fraudulent transactions)")
-            print(f"Average fraud probability score: {avg_fraud_score:.2f}")
-            print(f"Missed frauds: {ml_missed}")
-            print("===============================\n")
+        except KeyboardInterrupt:
+            log.info("Monitoring stopped; waiting for %d flag transactions to confirm", len(pending_flags))
+            blockchain.close()
+            if pool is not None:
+                pool.close()
+            ml.save_profiles()
             
-        print(f"Summary: Found {fraud_count} fraudulent transactions in CSV of {total_transactions} total)")
+            # Keep only the flags that did not make it on chain
+            for flagged_id, future in pending_flags.items():
+                if future.exception() is None:
+                    del pending_confidences[flagged_id]
+            save_checkpoint()
+            break
+        except Exception as e:
+            metrics.inc('errors')
+            log.error("Monitor error: %s", e, exc_info=True)
+            # The node may have dropped the filter (e.g. after a restart); reinstall
+            # it and catch up from the last processed block on the next pass
+            event_filter = None
+            time.sleep(10)  # Wait longer in case of errors
+
+def _transaction_fields(blockchain_tx, fraud_prob):
+    # Structured fields of a transaction log line
+    return {
+        'tx_id': blockchain_tx['id'],
+        'block': blockchain_tx['block_number'],
+        'amount': blockchain_tx['amount'],
+        'sender': blockchain_tx.get('sender'),
+        'receiver': blockchain_tx['receiver'],
+        'timestamp': blockchain_tx['timestamp'],
+        'fraud_probability': round(fraud_prob, 4)
+    }
+
+def backfill_transactions(blockchain, ml, from_id=1, to_id=None, batch_size=1000, pool=None):
+    """Score a historical range of transaction ids in large batches, without
+    per-transaction output, flagging the suspicious ones"""
+    metrics = ml.metrics
+    transaction_count = blockchain.transaction_count()
+    to_id = min(to_id or transaction_count, transaction_count)
+    from_id = max(from_id, 1)
+    if from_id > to_id:
+        log.info("Nothing to backfill: the contract holds transactions 1-%d", transaction_count)
+        return
+    log.info("Backfilling transactions %d-%d in batches of %d", from_id, to_id, batch_size)
+    
+    scorer = pool if pool is not None else ml
+    processed = 0
+    suspicious_count = 0
+    flag_futures = []
+    next_id = from_id
+    start = time.time()
+    
+    try:
+        while next_id <= to_id:
+            batch_end = min(next_id + batch_size - 1, to_id)
+            metrics.set('backlog_transactions', to_id - next_id + 1)
             
-    elif mode == 'monitor':
-        print("Running in monitoring mode: continuously checking for new transactions")
-        
-        # Initialize counters for statistics
-        # Initialize last_checked_id to the current transaction count to avoid monitoring old transactions
-        last_checked_id = blockchain.contract.functions.transactionCount().call()
-        print(f"Starting monitoring from transaction ID: {last_checked_id}")
-        # last_checked_id = 0
-        fraud_count = 0
-        ml_correct = 0
-        ml_missed = 0
-        total_transactions = 0
-        
-        while True:
-            try:
-                # Get the latest transaction count
-                transaction_count = blockchain.contract.functions.transactionCount().call()
-                
-                # Check for new transactions
-                if transaction_count > last_checked_id:
-                    print(f"\nFound {transaction_count - last_checked_id} new transactions")
-                    
-                    # Analyze each new transaction
-                    for tx_id in range(last_checked_id + 1, transaction_count + 1):
-                        blockchain_tx = blockchain.get_transaction(tx_id)
-                        total_transactions += 1
-                        
-                        # Display detailed transaction information
-                        print("\n" + "="*60)
-                        print(f"TRANSACTION #{tx_id}")
-                        print("-"*60)
-                        print(f"Transaction ID: {tx_id}")
-                        print(f"Amount: {blockchain_tx['amount']}")
-                        print(f"Receiver: {blockchain_tx['receiver']}")
-                        print(f"Sender: {blockchain_tx.get('sender', 'N/A')}")
-                        
-                        # Convert timestamp to readable format
-                        timestamp = datetime.datetime.fromtimestamp(blockchain_tx['timestamp'])
-                        print(f"Timestamp: {timestamp.strftime('%Y-%m-%d %H:%M:%S')}")
-                        print(f"Hour of day: {timestamp.hour}")
-                        
-                        # Get ML analysis
-                        prediction = ml.analyze_transaction(blockchain_tx)
-                        print(f"ML Analysis: {prediction}")
-                        
-                        # Check fraud probability from ML
-                        fraud_prob = prediction['fraud_probability']
-                        
-                        # Process the transaction based on ML probability
-                        if fraud_prob > 0.4:
-                            print(f"⚠️ SUSPICIOUS TRANSACTION: ML gives {fraud_prob:.2f} probability of fraud")
-                            blockchain.flag_transaction(tx_id, fraud_prob)
-                            fraud_count += 1
-                            ml_correct += 1
-                        else:
-                            print(f"✓ NORMAL TRANSACTION: ML gives {fraud_prob:.2f} probability of fraud")
-                        
-                        print("="*60)
-                
-                # Update last checked transaction
-                last_checked_id = transaction_count
-                
-                # Display statistics
-                if total_transactions > 0:
-                    print("\n===== ML MODEL PERFORMANCE =====")
-                    print(f"Total transactions processed: {total_transactions}")
-                    print(f"Suspicious transactions detected: {fraud_count}")
-                    print(f"Detection rate: {fraud_count/total_transactions:.2f}")
-                    print("===============================\n")
-            
-                # Just print a dot to show the system is still running
-                print(".", end="", flush=True)
-                time.sleep(5)  # Check for new transactions every 5 seconds
-                
-            except KeyboardInterrupt:
-                print("\nMonitoring stopped")
-                break
-            except Exception as e:
-                print(f"\nError: {e}")
-                traceback.print_exc(limit=1)
-                time.sleep(10)  # Wait longer in case of errors
+            # One batched read, one vectorized scoring pass, one bulk flag
+            with metrics.time('read'):
+                transactions = blockchain.get_transactions(next_id, batch_end)
+            if pool is not None:
+                with metrics.time('pool_scoring'):
+                    results = pool.process_transactions_batch(transactions)
+            else:
+                results = ml.process_transactions_batch(transactions)
+            
+            suspicious = [
+                (result['transaction_id'], result['fraud_probability'])
+                for tx, result in zip(transactions, results)
+                if result['fraud_probability'] > FLAG_THRESHOLD and not tx['is_flagged']
+            ]
+            if suspicious:
+                ids, confidences = zip(*suspicious)
+                with metrics.time('flag_submit'):
+                    flag_futures.extend(blockchain.flag_transactions_async(ids, confidences))
+            
+            processed += len(transactions)
+            suspicious_count += len(suspicious)
+            metrics.inc('transactions_processed', len(transactions))
+            metrics.inc('transactions_flagged', len(suspicious))
+            metrics.set('flag_queue', sum(1 for future in set(flag_futures) if not future.done()))
+            next_id = batch_end + 1
+            
+            elapsed = time.time() - start
+            log.info("Processed up to #%d: %d transactions, %.0f tx/s, %d newly flagged",
+                     batch_end, processed, processed / elapsed, suspicious_count)
+    except KeyboardInterrupt:
+        log.info("Backfill interrupted; resume with --from %d", next_id)
+    
+    scoring_seconds = time.time() - start
+    log.info("Waiting for flag transactions to confirm...")
+    blockchain.close()
+    if pool is not None:
+        pool.close()
+    ml.save_profiles()
+    
+    failed = sum(1 for future in set(flag_futures) if future.exception() is not None)
+    total_seconds = time.time() - start
+    
+    log.info("Backfill finished: %d transactions processed, %d newly flagged as suspicious, %d failed flag "
+             "transactions; scoring %.0f tx/s, %.0f tx/s including flag confirmation",
+             processed, suspicious_count, failed, processed / scoring_seconds, processed / total_seconds,
+             extra={'processed': processed, 'flagged': suspicious_count, 'failed_flags': failed})
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Decentralized Fraud Detection System")
-    parser.add_argument('--mode', choices=['monitor', 'test'], default='monitor',
-                       help='Operating mode: monitor (continuous) or test (sample transactions)')
+    parser.add_argument('--mode', choices=['monitor', 'evaluate', 'test', 'backfill'], default='monitor',
+                       help='Operating mode: monitor (continuous), evaluate (score a labelled CSV offline), '
+                            'test (evaluate, then write its frauds on chain) or backfill (historical id range)')
+    parser.add_argument('--poll-interval', type=float, default=1.0,
+                       help='Seconds between event filter polls in monitor mode (default: 1.0)')
+    parser.add_argument('--workers', type=int, default=1,
+                       help='Worker processes scoring transactions in monitor and backfill mode (default: 1, in-process)')
+    parser.add_argument('--checkpoint', default='data/monitor_checkpoint.json',
+                       help='File the monitor saves its progress to and resumes from')
+    parser.add_argument('--reset-checkpoint', action='store_true',
+                       help='Discard the saved checkpoint and start monitoring from the chain head')
+    parser.add_argument('--from', dest='from_id', type=int, default=1,
+                       help='First transaction id to backfill (default: 1)')
+    parser.add_argument('--to', dest='to_id', type=int,
+                       help='Last transaction id to backfill (default: the latest)')
+    parser.add_argument('--batch-size', type=int, default=1000,
+                       help='Transactions read and scored per backfill batch (default: 1000)')
+    
+    parser.add_argument('--data', default='data/sample_transactions.csv',
+                       help='Labelled CSV or dataset directory (ml/dataset.py) scored by evaluate and test mode')
+    parser.add_argument('--threshold', type=float, default=FLAG_THRESHOLD,
+                       help=f'Fraud probability above which evaluate mode counts a flag (default: {FLAG_THRESHOLD})')
+    parser.add_argument('--write-chain', action='store_true',
+                       help='In evaluate mode, also add the CSV frauds on chain and flag the detected ones')
+    
+    parser.add_argument('--feature-cache', default=DEFAULT_CACHE_DIR,
+                       help=f'Feature cache evaluate mode shares with ml/train.py (default: {DEFAULT_CACHE_DIR})')
+    parser.add_argument('--no-feature-cache', action='store_true',
+                       help='In evaluate mode, always recompute features, without caching them')
+    
+    parser.add_argument('--chain', choices=CHAIN_BACKENDS, default='node',
+                       help='node: a running node and the deployed contract; eth-tester: a fresh in-process EVM; '
+                            'memory: an in-memory ledger without any EVM (default: node)')
+    parser.add_argument('--rpc-url', default=DEFAULT_NODE_URL,
+                       help=f'HTTP URL or IPC socket path of the node (default: {DEFAULT_NODE_URL})')
+    
+    parser.add_argument('--metrics-port', type=int,
+                       help='Serve monitor and backfill metrics (Prometheus text and JSON) on this local port')
+    parser.add_argument('--log-level', default='INFO', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'],
+                       help='Monitor log level; DEBUG logs every transaction (default: INFO)')
+    parser.add_argument('--log-format', default='text', choices=['text', 'json'],
+                       help='Monitor log lines as text or one JSON object each (default: text)')
     
     args = parser.parse_args()
-    main(args.mode)
\ No newline at end of file
+    configure_logging(args.log_level, args.log_format)
+    main(args.mode, args.poll_interval, args.workers, args.checkpoint, args.reset_checkpoint,
+         args.from_id, args.to_id, args.batch_size, args.data, args.threshold, args.write_chain,
+         None if args.no_feature_cache else args.feature_cache, args.metrics_port, args.chain, args.rpc_url)
\ No newline at end of file
@@ -0,0 +1,74 @@
+import os
+import sys
+import time
+import argparse
+from web3 import Web3
+
+# Run from the project root: python benchmarks/bench_batch_flagging.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from integration.blockchain_interface import BlockchainInterface
+
+def connect(rpc_url):
+    # Ganache/Hardhat node if given, otherwise an in-process eth-tester chain
+    if rpc_url:
+        return Web3(Web3.HTTPProvider(rpc_url))
+    from web3.providers.eth_tester import EthereumTesterProvider
+    return Web3(EthereumTesterProvider())
+
+def deploy(w3):
+    # Fresh contract per run, so flagging starts from unflagged transactions
+    return BlockchainInterface.deploy(w3)
+
+def add_transactions(blockchain, count):
+    futures = [
+        blockchain.add_transaction_async(blockchain.w3.eth.accounts[1], 100 + i)
+        for i in range(count)
+    ]
+    return [future.result() for future in futures]
+
+def main():
+    parser = argparse.ArgumentParser(description="Gas and wall-clock cost of per-id versus batched flagging")
+    parser.add_argument('--rpc', help='JSON-RPC URL of a dev node (default: in-process eth-tester chain)')
+    parser.add_argument('--count', type=int, default=200, help='Transactions flagged by each method')
+    args = parser.parse_args()
+
+    blockchain = deploy(connect(args.rpc))
+    if not blockchain.supports_batch_flagging():
+        print("The compiled ABI has no flagTransactions; run python blockchain/compile_contract.py "
+              "(or --solc-binary with a local solc 0.8.0) to rebuild "
+              "blockchain/contracts/compiled/FraudDetection.json, then rerun")
+        blockchain.close()
+        sys.exit(1)
+
+    ids = add_transactions(blockchain, 2 * args.count)
+    single_ids, batch_ids = ids[:args.count], ids[args.count:]
+    confidences = [0.9] * args.count
+
+    start = time.perf_counter()
+    receipts = [blockchain.flag_transaction(tx_id, confidence) for tx_id, confidence in zip(single_ids, confidences)]
+    single_s = time.perf_counter() - start
+    single_gas = sum(receipt.gasUsed for receipt in receipts)
+
+    start = time.perf_counter()
+    receipts = blockchain.flag_transactions(batch_ids, confidences)
+    batch_s = time.perf_counter() - start
+    batch_gas = sum(receipt.gasUsed for receipt in receipts)
+
+    # Both methods must leave the same on-chain state
+    flagged = blockchain.get_transactions(ids[0], ids[-1])
+    if not all(tx['is_flagged'] and tx['ml_confidence'] == '0.9' for tx in flagged):
+        print("Batch and per-id flagging disagree on chain state")
+        sys.exit(1)
+
+    print(f"Flagged {args.count} transactions per method ({len(receipts)} flagTransactions calls)\n")
+    print(f"{'method':>8} | {'transactions':>12} | {'total gas':>10} | {'gas per id':>10} | {'wall s':>7}")
+    print("-" * 60)
+    print(f"{'per-id':>8} | {args.count:>12} | {single_gas:>10} | {single_gas // args.count:>10} | {single_s:>7.2f}")
+    print(f"{'batch':>8} | {len(receipts):>12} | {batch_gas:>10} | {batch_gas // args.count:>10} | {batch_s:>7.2f}")
+    print(f"\nGas saved: {1 - batch_gas / single_gas:.1%}, speedup: {single_s / batch_s:.1f}x")
+
+    blockchain.close()
+
+if __name__ == "__main__":
+    main()
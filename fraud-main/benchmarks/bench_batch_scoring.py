@@ -0,0 +1,81 @@
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+# Run from the project root: python benchmarks/bench_batch_scoring.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from integration.ml_interface import MLInterface
+
+def generate_transactions(n, seed=42):
+    """Generate n synthetic chain transactions in the monitor's dict format"""
+    rng = np.random.default_rng(seed)
+    addresses = [f"0x{value:040x}" for value in rng.integers(0, 2**63, size=200)]
+    senders = rng.integers(0, len(addresses), size=n)
+    receivers = rng.integers(0, len(addresses), size=n)
+    amounts = rng.uniform(10, 10000, size=n)
+    # Chain order: timestamps never go backwards
+    timestamps = np.sort(int(time.time()) - rng.integers(0, 30 * 24 * 3600, size=n))
+    
+    return [
+        {
+            'id': i + 1,
+            'sender': addresses[senders[i]],
+            'receiver': addresses[receivers[i]],
+            'amount': int(amounts[i]),
+            'timestamp': int(timestamps[i])
+        }
+        for i in range(n)
+    ]
+
+def measure(fn, transactions, repeat):
+    # Best of `repeat` runs, as transactions per second
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(transactions)
+        best = min(best, time.perf_counter() - start)
+    return len(transactions) / best
+
+def score_one_by_one(ml, transactions):
+    return [ml.analyze_transaction(tx) for tx in transactions]
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark batch vs per-transaction scoring throughput")
+    parser.add_argument('--model', default='ml/saved_models/fraud_model.pkl', help='Path to the trained model')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 64, 1000, 100000], help='Batch sizes to measure')
+    parser.add_argument('--loop-limit', type=int, default=1000,
+                        help='Largest batch size to also time through the one-by-one path')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per measurement (best is reported)')
+    args = parser.parse_args()
+    
+    ml = MLInterface(args.model)
+    transactions = generate_transactions(max(args.sizes))
+    
+    # Both paths must agree before their speed is worth comparing. Scoring
+    # updates the address profiles, so each path starts from a fresh load.
+    sample = transactions[:min(2 * ml.REALTIME_BATCH_LIMIT, len(transactions))]
+    batch = MLInterface(args.model).process_transactions_batch(sample)
+    single = score_one_by_one(MLInterface(args.model), sample)
+    max_diff = max(abs(b['fraud_probability'] - s['fraud_probability']) for b, s in zip(batch, single))
+    print(f"Max probability difference batch vs one-by-one: {max_diff:.2e}")
+    
+    # Build the realtime tree lists outside the measurement
+    ml.analyze_transaction(transactions[0])
+    
+    print(f"\n{'batch size':>10} | {'batch tx/s':>12} | {'one-by-one tx/s':>15} | {'speedup':>7}")
+    print("-" * 54)
+    for size in args.sizes:
+        subset = transactions[:size]
+        batch_tps = measure(ml.process_transactions_batch, subset, args.repeat)
+        
+        if size <= args.loop_limit:
+            loop_tps = measure(lambda txs: score_one_by_one(ml, txs), subset, 1)
+            print(f"{size:>10} | {batch_tps:>12,.0f} | {loop_tps:>15,.0f} | {batch_tps / loop_tps:>6.1f}x")
+        else:
+            print(f"{size:>10} | {batch_tps:>12,.0f} | {'(skipped)':>15} | {'':>7}")
+
+if __name__ == "__main__":
+    main()
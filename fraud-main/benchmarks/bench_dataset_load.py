@@ -0,0 +1,109 @@
+import os
+import sys
+import time
+import argparse
+import subprocess
+import numpy as np
+import pandas as pd
+
+# Run from the project root: python benchmarks/bench_dataset_load.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ml.dataset import convert_csv, is_dataset
+
+# Child process: load a CSV or dataset directory and derive the columns the
+# model's features start from (epoch seconds, hour, day of week, amounts,
+# address hashes, labels); report seconds and peak RSS growth in MB (Linux only)
+WORKER = """
+import sys, time
+sys.path.insert(0, '.')
+import numpy as np
+import pandas as pd
+from ml.dataset import TransactionDataset
+path, kind = sys.argv[1], sys.argv[2]
+def peak_rss_mb():
+    # VmHWM belongs to this process image; ru_maxrss would carry over the
+    # parent's peak across exec
+    with open('/proc/self/status') as f:
+        return next(int(line.split()[1]) for line in f if line.startswith('VmHWM:')) / 1024
+baseline_mb = peak_rss_mb()
+start = time.perf_counter()
+if kind == 'csv':
+    df = pd.read_csv(path)
+    timestamps = pd.to_datetime(df['timestamp'])
+    hour, day_of_week = timestamps.dt.hour.to_numpy(), timestamps.dt.dayofweek.to_numpy()
+    seconds = (timestamps - pd.Timestamp(1970, 1, 1)).dt.total_seconds().to_numpy().astype(np.int64)
+    sender_hash = pd.util.hash_array(df['sender'].values) % 10_000_000
+    receiver_hash = pd.util.hash_array(df['receiver'].values) % 10_000_000
+    amount, labels = df['amount'].to_numpy(), df['is_fraud'].to_numpy()
+else:
+    dataset = TransactionDataset.load(path)
+    seconds = np.asarray(dataset.timestamp)
+    hour, day_of_week = seconds // 3600 % 24, (seconds // 86400 + 3) % 7
+    sender_hash = dataset.address_hash[dataset.sender]
+    receiver_hash = dataset.address_hash[dataset.receiver]
+    amount, labels = np.asarray(dataset.amount), np.asarray(dataset.is_fraud)
+# Reduce every column so none is left unread in the page cache
+checksum = float(hour.sum() + day_of_week.sum() + seconds.sum() + sender_hash.sum()
+                 + receiver_hash.sum() + amount.sum() + labels.sum())
+seconds_taken = time.perf_counter() - start
+print(f"{seconds_taken:.3f} {peak_rss_mb() - baseline_mb:.1f} {checksum!r}")
+"""
+
+def write_csv(path, rows, addresses=100_000, chunk_rows=1_000_000, seed=42):
+    """Write a labelled transactions CSV in the sample data's format, a chunk at a time"""
+    rng = np.random.default_rng(seed)
+    pool = np.array([f"0x{value:040x}" for value in rng.integers(0, 2**63, size=addresses)], dtype=object)
+    start = pd.Timestamp('2024-01-01').value // 10**9
+    seconds = np.sort(rng.integers(0, 365 * 24 * 3600, size=rows)) + start
+
+    for offset in range(0, rows, chunk_rows):
+        n = min(chunk_rows, rows - offset)
+        pd.DataFrame({
+            'sender': pool[rng.integers(0, addresses, size=n)],
+            'receiver': pool[rng.integers(0, addresses, size=n)],
+            'amount': rng.uniform(10, 10000, size=n),
+            'timestamp': pd.to_datetime(seconds[offset:offset + n], unit='s').strftime('%Y-%m-%d %H:%M:%S'),
+            'is_fraud': (rng.random(n) < 0.05).astype(int)
+        }).to_csv(path, mode='w' if offset == 0 else 'a', header=offset == 0, index=False)
+
+def disk_mb(path):
+    if os.path.isdir(path):
+        return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path)) / 1024 / 1024
+    return os.path.getsize(path) / 1024 / 1024
+
+def measure(path, kind):
+    output = subprocess.run([sys.executable, '-c', WORKER, path, kind],
+                            capture_output=True, text=True, check=True).stdout.split()
+    return float(output[0]), float(output[1]), output[2]
+
+def main():
+    parser = argparse.ArgumentParser(description="Load time and peak memory of CSV versus the columnar dataset format")
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000_000, 10_000_000], help='Dataset sizes to measure')
+    parser.add_argument('--dir', default='data/bench', help='Where the generated CSVs and datasets are kept')
+    args = parser.parse_args()
+
+    os.makedirs(args.dir, exist_ok=True)
+    print(f"{'rows':>10} | {'format':>7} | {'disk MB':>8} | {'load s':>7} | {'peak MB':>8}")
+    print("-" * 52)
+    for rows in args.rows:
+        csv_path = os.path.join(args.dir, f'transactions_{rows}.csv')
+        dataset_path = os.path.join(args.dir, f'transactions_{rows}')
+        # Generated and converted once; later runs reuse them
+        if not os.path.exists(csv_path):
+            write_csv(csv_path, rows)
+        if not is_dataset(dataset_path):
+            start = time.perf_counter()
+            convert_csv(csv_path, dataset_path)
+            print(f"(converted {rows} rows in {time.perf_counter() - start:.1f}s)")
+
+        checksums = set()
+        for kind, path in (('csv', csv_path), ('dataset', dataset_path)):
+            seconds, peak_mb, checksum = measure(path, kind)
+            checksums.add(checksum)
+            print(f"{rows:>10} | {kind:>7} | {disk_mb(path):>8.1f} | {seconds:>7.2f} | {peak_mb:>8.1f}")
+        if len(checksums) != 1:
+            print(f"WARNING: formats disagree on {rows} rows: {checksums}")
+
+if __name__ == "__main__":
+    main()
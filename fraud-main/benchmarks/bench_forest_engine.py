@@ -0,0 +1,54 @@
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+# Run from the project root: python benchmarks/bench_forest_engine.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ml.forest_engine import CompiledForest, load_forest
+
+def best_time(fn, X, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(X)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser(description="Parity and speed of the flattened forest engine against sklearn")
+    parser.add_argument('model_path', nargs='?', default='ml/saved_models/fraud_model.pkl',
+                        help='Saved FraudDetectionModel pickle (fraud_model.pkl or enhanced_fraud_model.pkl)')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 64, 512, 1000, 10000], help='Batch sizes to measure')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per measurement (best is reported)')
+    args = parser.parse_args()
+    
+    forest = load_forest(args.model_path)
+    start = time.perf_counter()
+    engine = CompiledForest.from_sklearn(forest)
+    export_ms = (time.perf_counter() - start) * 1000
+    engine32 = engine.astype(np.float32)
+    print(f"Exported {engine.n_trees} trees, {engine.n_nodes} nodes, max depth {engine.max_depth} in {export_ms:.1f} ms")
+    
+    # Scaled features are roughly standard normal
+    rng = np.random.default_rng(42)
+    X = rng.normal(size=(max(args.sizes), forest.n_features_in_))
+    
+    print(f"\n{'rows':>6} | {'sklearn ms':>10} | {'engine ms':>9} | {'float32 ms':>10} | {'max diff f64':>12} | {'max diff f32':>12} | {'f32 flips @0.4':>14}")
+    print("-" * 92)
+    for size in args.sizes:
+        subset = X[:size]
+        sklearn_s, expected = best_time(lambda rows: forest.predict_proba(rows)[:, 1], subset, args.repeat)
+        engine_s, proba64 = best_time(engine.predict_fraud_proba, subset, args.repeat)
+        engine32_s, proba32 = best_time(engine32.predict_fraud_proba, subset, args.repeat)
+        
+        diff64 = np.abs(proba64 - expected).max()
+        diff32 = np.abs(proba32 - expected).max()
+        flips = int(((proba32 > 0.4) != (expected > 0.4)).sum())
+        print(f"{size:>6} | {sklearn_s * 1000:>10.2f} | {engine_s * 1000:>9.2f} | {engine32_s * 1000:>10.2f} | "
+              f"{diff64:>12.2e} | {diff32:>12.2e} | {flips:>14}")
+
+if __name__ == "__main__":
+    main()
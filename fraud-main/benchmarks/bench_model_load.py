@@ -0,0 +1,66 @@
+import os
+import sys
+import argparse
+import subprocess
+
+# Run from the project root: python benchmarks/bench_model_load.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ml.model import FraudDetectionModel
+
+# Child process: load the model, score once so the forest is touched, report
+# load time and proportional memory, then wait to be released by the parent
+WORKER = """
+import sys, time
+sys.path.insert(0, '.')
+from ml.model import FraudDetectionModel
+start = time.perf_counter()
+model = FraudDetectionModel()
+model.load_model(sys.argv[1])
+load_ms = (time.perf_counter() - start) * 1000
+model.predict_batch([{'sender': 'a', 'receiver': 'b', 'amount': 100.0, 'timestamp': '2024-01-01T12:00:00'}] * 64)
+print(f"{load_ms:.2f}", flush=True)
+sys.stdin.read()
+"""
+
+def proportional_memory_mb(pid):
+    # PSS splits shared pages between the processes mapping them (Linux only)
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            if line.startswith('Pss:'):
+                return int(line.split()[1]) / 1024
+    return float('nan')
+
+def run_workers(model_path, workers):
+    processes = [
+        subprocess.Popen([sys.executable, '-c', WORKER, model_path],
+                         stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+        for _ in range(workers)
+    ]
+    load_ms = [float(process.stdout.readline()) for process in processes]
+    memory_mb = sum(proportional_memory_mb(process.pid) for process in processes)
+    for process in processes:
+        process.communicate('')
+    return sum(load_ms) / len(load_ms), memory_mb
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold load time and shared memory of pickled versus mapped models")
+    parser.add_argument('--pickle', default='ml/saved_models/fraud_model.pkl', help='Pickled model')
+    parser.add_argument('--artifact', default='ml/saved_models/fraud_model', help='Artifact directory')
+    parser.add_argument('--workers', type=int, default=4, help='Processes loading the model at once')
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.artifact):
+        model = FraudDetectionModel()
+        model.load_model(args.pickle)
+        model.save_artifact(args.artifact)
+        print(f"Exported {args.pickle} to {args.artifact}")
+
+    print(f"\n{'format':>8} | {'load ms':>8} | {f'PSS of {args.workers} workers MB':>24}")
+    print("-" * 48)
+    for name, path in (('pickle', args.pickle), ('artifact', args.artifact)):
+        load_ms, memory_mb = run_workers(path, args.workers)
+        print(f"{name:>8} | {load_ms:>8.2f} | {memory_mb:>24.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+import os
+import sys
+import time
+import argparse
+import threading
+import subprocess
+import json
+import numpy as np
+
+# Run from the project root: python benchmarks/bench_prediction_server.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ml.model import FraudDetectionModel
+from ml.server import MicroBatcher, create_server
+from ml.client import PredictionClient
+from benchmarks.bench_batch_scoring import generate_transactions
+
+def start_server(model_path, max_batch, max_wait_ms, unix_socket):
+    model = FraudDetectionModel()
+    model.load_model(model_path)
+    model.warm_up()
+    server = create_server(MicroBatcher(model, max_batch, max_wait_ms), port=0, unix_socket=unix_socket)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"unix://{unix_socket}" if unix_socket else f"http://127.0.0.1:{server.server_address[1]}"
+    return server, url
+
+def as_requests(transactions):
+    return [
+        {'sender': tx['sender'], 'receiver': tx['receiver'], 'amount': tx['amount'], 'timestamp': tx['timestamp']}
+        for tx in transactions
+    ]
+
+def run_clients(url, transactions, concurrency):
+    # Each client thread sends its share one request at a time
+    latencies = [[] for _ in range(concurrency)]
+
+    def worker(index):
+        client = PredictionClient(url)
+        for tx in transactions[index::concurrency]:
+            start = time.perf_counter()
+            client.predict(tx)
+            latencies[index].append(time.perf_counter() - start)
+        client.close()
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return elapsed, np.concatenate([np.array(l) for l in latencies]) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency and throughput of ml/server.py against the per-call CLI")
+    parser.add_argument('--model', default='ml/saved_models/fraud_model.pkl', help='Saved FraudDetectionModel pickle')
+    parser.add_argument('--requests', type=int, default=2000, help='Requests sent per concurrency level')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32], help='Client threads to measure')
+    parser.add_argument('--max-batch', type=int, default=256, help='Server micro-batch size')
+    parser.add_argument('--max-wait-ms', type=float, default=0.0, help='Server micro-batch wait window')
+    parser.add_argument('--unix-socket', help='Serve on this Unix socket instead of TCP')
+    args = parser.parse_args()
+
+    transactions = as_requests(generate_transactions(args.requests, seed=7))
+
+    # Baseline: one process, import and unpickle per prediction
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, 'ml/predict.py', json.dumps(transactions[0])],
+        check=True, capture_output=True, cwd=os.getcwd()
+    )
+    cli_ms = (time.perf_counter() - start) * 1000
+    print(f"ml/predict.py per call: {cli_ms:.0f} ms")
+
+    # One client sending in order scores exactly like predict_realtime in order
+    server, url = start_server(args.model, args.max_batch, args.max_wait_ms, args.unix_socket)
+    reference = FraudDetectionModel()
+    reference.load_model(args.model)
+    client = PredictionClient(url)
+    sample = transactions[:200]
+    served = [client.predict(tx)['fraud_probability'] for tx in sample]
+    expected = [reference.predict_realtime(tx)['fraud_probability'] for tx in sample]
+    print(f"Parity over {len(sample)} sequential requests: max diff {np.abs(np.array(served) - expected).max():.2e}")
+    client.close()
+
+    print(f"\n{'clients':>7} | {'req/s':>8} | {'p50 ms':>7} | {'p99 ms':>7}")
+    print("-" * 38)
+    for concurrency in args.concurrency:
+        elapsed, latencies_ms = run_clients(url, transactions, concurrency)
+        print(f"{concurrency:>7} | {len(transactions) / elapsed:>8.0f} | "
+              f"{np.percentile(latencies_ms, 50):>7.2f} | {np.percentile(latencies_ms, 99):>7.2f}")
+
+    server.shutdown()
+    server.server_close()
+    server.batcher.close()
+
+if __name__ == "__main__":
+    main()
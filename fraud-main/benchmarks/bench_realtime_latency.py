@@ -0,0 +1,67 @@
+import os
+import sys
+import time
+import argparse
+import datetime
+import numpy as np
+
+# Run from the project root: python benchmarks/bench_realtime_latency.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ml.model import FraudDetectionModel
+from bench_batch_scoring import generate_transactions
+
+# Targets documented on FraudDetectionModel.predict_realtime
+P50_TARGET_MS = 0.5
+P99_TARGET_MS = 2.0
+
+def latencies_ms(fn, transactions):
+    samples = []
+    for tx in transactions:
+        start = time.perf_counter()
+        fn(tx)
+        samples.append((time.perf_counter() - start) * 1000)
+    return np.array(samples)
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure single-transaction scoring latency")
+    parser.add_argument('--model', default='ml/saved_models/fraud_model.pkl', help='Path to the trained model')
+    parser.add_argument('--count', type=int, default=5000, help='Transactions to score through predict_realtime')
+    parser.add_argument('--baseline-count', type=int, default=200, help='Transactions to score through predict()')
+    args = parser.parse_args()
+    
+    model = FraudDetectionModel()
+    model.load_model(args.model)
+    
+    # MLInterface hands the model local datetimes
+    transactions = [
+        dict(tx, timestamp=datetime.datetime.fromtimestamp(tx['timestamp']))
+        for tx in generate_transactions(args.count)
+    ]
+    
+    # Parity against the pandas path. Scoring updates the address profiles,
+    # so the two paths run on separate copies of the model.
+    reference = FraudDetectionModel()
+    reference.load_model(args.model)
+    max_diff = max(
+        abs(model.predict_realtime(tx)['fraud_probability'] - reference.predict(tx)['fraud_probability'])
+        for tx in transactions[:args.baseline_count]
+    )
+    print(f"Max probability difference realtime vs predict(): {max_diff:.2e}")
+    
+    realtime = latencies_ms(model.predict_realtime, transactions)
+    baseline = latencies_ms(reference.predict, transactions[:args.baseline_count])
+    
+    print(f"\n{'path':>18} | {'p50 ms':>8} | {'p99 ms':>8}")
+    print("-" * 40)
+    print(f"{'predict()':>18} | {np.percentile(baseline, 50):>8.3f} | {np.percentile(baseline, 99):>8.3f}")
+    print(f"{'predict_realtime()':>18} | {np.percentile(realtime, 50):>8.3f} | {np.percentile(realtime, 99):>8.3f}")
+    
+    p50, p99 = np.percentile(realtime, 50), np.percentile(realtime, 99)
+    if p50 > P50_TARGET_MS or p99 > P99_TARGET_MS:
+        print(f"\n❌ Target missed: p50 <= {P50_TARGET_MS} ms, p99 <= {P99_TARGET_MS} ms")
+        sys.exit(1)
+    print(f"\n✅ Target met: p50 <= {P50_TARGET_MS} ms, p99 <= {P99_TARGET_MS} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+import os
+import sys
+import time
+import argparse
+
+# Run from the project root: python benchmarks/bench_scoring_pool.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from integration.ml_interface import MLInterface
+from integration.scoring_pool import ScoringPool
+from benchmarks.bench_batch_scoring import generate_transactions
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput of the monitor's multi-process scoring pool")
+    parser.add_argument('--model', default='ml/saved_models/fraud_model', help='Model the workers load')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4], help='Pool sizes to measure')
+    parser.add_argument('--batch', type=int, default=2000, help='Transactions per polling cycle')
+    parser.add_argument('--cycles', type=int, default=5, help='Cycles measured per pool size')
+    args = parser.parse_args()
+    
+    transactions = generate_transactions(args.batch * (args.cycles + 1))
+    print(f"{os.cpu_count()} CPUs; {args.cycles} cycles of {args.batch} transactions\n")
+    print(f"{'workers':>7} | {'tx/s':>8} | {'speedup':>7}")
+    print("-" * 29)
+    
+    baseline = None
+    for workers in args.workers:
+        ml = MLInterface(args.model)
+        pool = ScoringPool(ml, workers, args.model)
+        
+        # The first cycle starts the worker processes
+        pool.process_transactions_batch(transactions[:args.batch])
+        start = time.perf_counter()
+        for cycle in range(1, args.cycles + 1):
+            pool.process_transactions_batch(transactions[cycle * args.batch:(cycle + 1) * args.batch])
+        rate = args.batch * args.cycles / (time.perf_counter() - start)
+        pool.close()
+        
+        baseline = baseline or rate
+        print(f"{workers:>7} | {rate:>8.0f} | {rate / baseline:>6.2f}x")
+
+if __name__ == "__main__":
+    main()
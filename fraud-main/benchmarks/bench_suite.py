@@ -0,0 +1,243 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import datetime
+import platform
+import tempfile
+import logging
+import subprocess
+import numpy as np
+import pandas as pd
+import sklearn
+
+# Run from the project root: python benchmarks/bench_suite.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ml.model import FraudDetectionModel
+from integration.ml_interface import MLInterface
+from integration.checkpoint import MonitorCheckpoint
+from bench_batch_scoring import generate_transactions
+from bench_dataset_load import write_csv
+from bench_batch_flagging import connect, deploy, add_transactions
+import app
+
+RESULTS_VERSION = 1
+
+def summarize(case, size, samples_ms, rows_per_sample):
+    # One result record: latency percentiles of the samples and rows per second at p50
+    samples_ms = np.asarray(samples_ms)
+    p50, p95, p99 = np.percentile(samples_ms, [50, 95, 99])
+    return {
+        'case': case,
+        'size': size,
+        'samples': len(samples_ms),
+        'p50_ms': float(p50),
+        'p95_ms': float(p95),
+        'p99_ms': float(p99),
+        'mean_ms': float(samples_ms.mean()),
+        'rows_per_s': float(rows_per_sample / p50 * 1000) if p50 > 0 else None
+    }
+
+def time_calls(fn, repeat, setup=None):
+    # Wall time of repeat calls in ms; setup runs untimed before each call
+    samples = []
+    for _ in range(repeat):
+        argument = setup() if setup is not None else None
+        start = time.perf_counter()
+        fn(argument)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+def reset_profiles(model):
+    # Every timed run starts from the same (empty) address history
+    model.reset_history()
+
+def bench_csv_load(csv_path, size, repeat):
+    return summarize('csv_load', size, time_calls(lambda _: pd.read_csv(csv_path), repeat), size)
+
+def bench_preprocess(model, df, repeat):
+    def setup():
+        reset_profiles(model)
+        return df.copy()
+    samples = time_calls(lambda frame: model.preprocess(frame, training=False), repeat, setup)
+    return summarize('preprocess', len(df), samples, len(df))
+
+def bench_predict_single(model, transactions, case):
+    # Per-transaction latency, one sample per call
+    reset_profiles(model)
+    predict = model.predict_realtime if case == 'predict_realtime' else model.predict
+    samples = []
+    for tx in transactions:
+        start = time.perf_counter()
+        predict(tx)
+        samples.append((time.perf_counter() - start) * 1000)
+    return summarize(case, len(transactions), samples, 1)
+
+def bench_predict_batch(model, records, repeat):
+    samples = time_calls(lambda _: model.predict_batch(records), repeat, lambda: reset_profiles(model))
+    return summarize('predict_batch', len(records), samples, len(records))
+
+def bench_process_batch(ml, transactions, repeat):
+    samples = time_calls(lambda _: ml.process_transactions_batch(transactions), repeat,
+                         lambda: reset_profiles(ml.model))
+    return summarize('process_transactions_batch', len(transactions), samples, len(transactions))
+
+class StopWhenCaughtUp(MonitorCheckpoint):
+    """Checkpoint stand-in for the monitor benchmark: resumes from before the
+    first transaction and stops the monitor, as Ctrl+C would, once it has
+    committed the last one"""
+
+    def __init__(self, count):
+        self.path = '(benchmark)'
+        self.count = count
+        self.finished = None
+
+    def load(self, contract_address):
+        return {
+            'last_checked_id': 0, 'last_block': 0, 'pending_flags': {}, 'saved_at': 'start',
+            'stats': {'total_transactions': 0, 'fraud_count': 0, 'ml_correct': 0, 'ml_missed': 0}
+        }
+
+    def save(self, contract_address, last_checked_id, last_block, stats, pending_flags):
+        if self.finished is None and last_checked_id >= self.count:
+            self.finished = time.perf_counter()
+            raise KeyboardInterrupt
+
+def bench_monitor(model_path, count, repeat):
+    # End to end: event catch-up, scoring, bulk flagging and checkpointing of
+    # count transactions by app.monitor_transactions on an in-process chain.
+    # The model is copied because the monitor saves its profiles on exit.
+    samples = []
+    # Keep the per-transaction log lines out of the timings
+    app.log.setLevel(logging.ERROR)
+    with tempfile.TemporaryDirectory() as directory:
+        local_model = os.path.join(directory, os.path.basename(os.path.normpath(model_path)))
+        if os.path.isdir(model_path):
+            shutil.copytree(model_path, local_model)
+        else:
+            shutil.copy(model_path, local_model)
+        if os.path.exists(FraudDetectionModel.profiles_path(model_path)):
+            shutil.copy(FraudDetectionModel.profiles_path(model_path), FraudDetectionModel.profiles_path(local_model))
+        for _ in range(repeat):
+            blockchain = deploy(connect(None))
+            add_transactions(blockchain, count)
+            ml = MLInterface(local_model)
+            checkpoint = StopWhenCaughtUp(count)
+
+            start = time.perf_counter()
+            app.monitor_transactions(blockchain, ml, poll_interval=0, checkpoint=checkpoint)
+            samples.append((checkpoint.finished - start) * 1000)
+    return summarize('monitor', count, samples, count)
+
+def environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = None
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'sklearn': sklearn.__version__,
+        'commit': commit or None
+    }
+
+def compare(results, baseline, tolerance):
+    # p50 of every case also in the baseline; returns the regressed ones
+    previous = {(r['case'], r['size']): r for r in baseline['results']}
+    regressions = []
+    print(f"\n{'case':>26} | {'size':>7} | {'p50 ms':>9} | {'baseline':>9} | {'change':>7}")
+    print("-" * 70)
+    for result in results:
+        before = previous.get((result['case'], result['size']))
+        if before is None:
+            continue
+        change = result['p50_ms'] / before['p50_ms'] - 1 if before['p50_ms'] > 0 else 0.0
+        regressed = change > tolerance
+        if regressed:
+            regressions.append(result)
+        print(f"{result['case']:>26} | {result['size']:>7} | {result['p50_ms']:>9.3f} | {before['p50_ms']:>9.3f} | "
+              f"{change:>+7.1%}{' ❌' if regressed else ''}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark suite: features, inference and the monitor loop")
+    parser.add_argument('--model', default='ml/saved_models/fraud_model.pkl', help='Path to the trained model')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000],
+                        help='Rows per CSV load, preprocess and batch scoring case')
+    parser.add_argument('--single-count', type=int, default=2000, help='Transactions scored one at a time')
+    parser.add_argument('--monitor-sizes', type=int, nargs='+', default=[200],
+                        help='Transactions the monitor catches up on (0 to skip; needs eth-tester)')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed runs per batch case')
+    parser.add_argument('--monitor-repeat', type=int, default=3, help='Timed runs per monitor case')
+    parser.add_argument('--output', default='benchmarks/results/latest.json', help='JSON results file')
+    parser.add_argument('--baseline', default='benchmarks/results/baseline.json', help='Results to compare against')
+    parser.add_argument('--save-baseline', action='store_true', help='Also store these results as the baseline')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='p50 slowdown counted as a regression')
+    args = parser.parse_args()
+
+    model = FraudDetectionModel()
+    model.load_model(args.model)
+    model.warm_up()
+    ml = MLInterface(args.model)
+    results = []
+
+    def record(result):
+        results.append(result)
+        print(f"{result['case']:>26} | {result['size']:>7} | p50 {result['p50_ms']:>9.3f} ms | "
+              f"p95 {result['p95_ms']:>9.3f} ms | p99 {result['p99_ms']:>9.3f} ms", flush=True)
+
+    # Synthetic data from fixed seeds, so every run measures the same rows
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            csv_path = os.path.join(directory, f'transactions_{size}.csv')
+            write_csv(csv_path, size, addresses=max(100, size // 10))
+            df = pd.read_csv(csv_path).drop(columns=['is_fraud'])
+            record(bench_csv_load(csv_path, size, args.repeat))
+            record(bench_preprocess(model, df, args.repeat))
+            record(bench_predict_batch(model, df.to_dict('records'), args.repeat))
+            record(bench_process_batch(ml, generate_transactions(size), args.repeat))
+
+    # MLInterface hands the model local datetimes
+    single = [
+        dict(tx, timestamp=datetime.datetime.fromtimestamp(tx['timestamp']))
+        for tx in generate_transactions(args.single_count)
+    ]
+    record(bench_predict_single(model, single, 'predict_realtime'))
+    record(bench_predict_single(model, single[:min(200, len(single))], 'predict'))
+
+    for count in args.monitor_sizes:
+        if count > 0:
+            record(bench_monitor(args.model, count, args.monitor_repeat))
+
+    report = {
+        'version': RESULTS_VERSION,
+        'created_at': datetime.datetime.now().isoformat(timespec='seconds'),
+        'environment': environment(),
+        'results': results
+    }
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    regressions = []
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, 'r') as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline) or '.', exist_ok=True)
+        shutil.copy(args.output, args.baseline)
+        print(f"Baseline stored in {args.baseline}")
+
+    if regressions:
+        print(f"\n❌ {len(regressions)} cases slower than the baseline by more than {args.tolerance:.0%}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
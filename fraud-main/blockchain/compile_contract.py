@@ -1,19 +1,47 @@
 from solcx import compile_standard, install_solc
+import subprocess
+import argparse
+import hashlib
 import json
+import re
+import sys
 import os
 
-def compile_contract():
-    print("Installing solc...")
-    # Install specific solc version
-    install_solc("0.8.0")
-    
+# Compiler the committed artifact is built with; bumping it changes the bytecode
+SOLC_VERSION = '0.8.0'
+
+SOURCE_PATH = 'blockchain/contracts/FraudDetection.sol'
+COMPILED_PATH = 'blockchain/contracts/compiled/FraudDetection.json'
+
+def source_digest(contract_source):
+    # Recorded in the artifact, so a stale one can be told from a current one
+    return hashlib.sha256(contract_source.encode()).hexdigest()
+
+def local_solc_version(solc_binary):
+    # Version a local solc reports, e.g. '0.8.0' from '0.8.0+commit.c7dfd78e'
+    output = subprocess.run([solc_binary, '--version'], capture_output=True, text=True, check=True).stdout
+    match = re.search(r'Version: (\d+\.\d+\.\d+)', output)
+    return match.group(1) if match else None
+
+def compile_contract(solc_binary=None):
+    if solc_binary is not None:
+        # Another version builds different bytecode under the same label
+        version = local_solc_version(solc_binary)
+        if version != SOLC_VERSION:
+            sys.exit(f"{solc_binary} is solc {version}, not {SOLC_VERSION}")
+    else:
+        print(f"Installing solc {SOLC_VERSION}...")
+        # Install specific solc version
+        install_solc(SOLC_VERSION)
+
     print("Reading contract source...")
     # Read the Solidity contract
-    with open('blockchain/contracts/FraudDetection.sol', 'r') as file:
+    with open(SOURCE_PATH, 'r') as file:
         contract_source = file.read()
-    
+
     print("Compiling contract...")
-    # Compile the contract
+    # Compile the contract; optimizer settings are spelled out so every build
+    # of the same source gives the same bytecode
     compiled_sol = compile_standard({
         "language": "Solidity",
         "sources": {
@@ -22,34 +50,62 @@ def compile_contract():
             }
         },
         "settings": {
+            "optimizer": {"enabled": False, "runs": 200},
             "outputSelection": {
                 "*": {
                     "*": ["abi", "metadata", "evm.bytecode", "evm.sourceMap"]
                 }
             }
         }
-    }, solc_version="0.8.0")
-    
+    }, solc_version=SOLC_VERSION if solc_binary is None else None, solc_binary=solc_binary)
+
     # Create the output directory if it doesn't exist
-    os.makedirs('blockchain/contracts/compiled', exist_ok=True)
-    
+    os.makedirs(os.path.dirname(COMPILED_PATH), exist_ok=True)
+
     # Extract the contract data
     contract_data = compiled_sol['contracts']['FraudDetection.sol']['FraudDetection']
     abi = contract_data['abi']
     bytecode = contract_data['evm']['bytecode']['object']
-    
+
     # Format for deploy_contract.py
     output = {
         'abi': abi,
-        'bytecode': bytecode
+        'bytecode': bytecode,
+        'compiler': f'solc-{SOLC_VERSION}',
+        'source_sha256': source_digest(contract_source)
     }
-    
+
     print("Saving compiled contract...")
     # Save to file
-    with open('blockchain/contracts/compiled/FraudDetection.json', 'w') as file:
+    with open(COMPILED_PATH, 'w') as file:
         json.dump(output, file)
-    
+
     print("Contract compiled successfully")
 
+def check_compiled():
+    # True if the committed artifact was built from the current source
+    with open(SOURCE_PATH, 'r') as file:
+        digest = source_digest(file.read())
+    with open(COMPILED_PATH, 'r') as file:
+        compiled = json.load(file)
+    if compiled.get('source_sha256') != digest:
+        print(f"{COMPILED_PATH} was not built from the current {SOURCE_PATH}; "
+              f"run python blockchain/compile_contract.py")
+        return False
+    print(f"{COMPILED_PATH} is up to date ({compiled.get('compiler')})")
+    return True
+
+def main():
+    parser = argparse.ArgumentParser(description=f"Compile FraudDetection.sol with solc {SOLC_VERSION}")
+    parser.add_argument('--solc-binary', default=os.environ.get('SOLC_BINARY'),
+                        help=f'Local solc {SOLC_VERSION} to use instead of downloading one (default: $SOLC_BINARY)')
+    parser.add_argument('--check', action='store_true',
+                        help='Only check that the compiled artifact matches the source (exit 1 if not)')
+    args = parser.parse_args()
+
+    if args.check:
+        sys.exit(0 if check_compiled() else 1)
+    compile_contract(args.solc_binary)
+
 if __name__ == '__main__':
-    compile_contract()
\ No newline at end of file
+    main()
@@ -59,6 +59,20 @@ contract FraudDetection {
         emit TransactionFlagged(_id, _confidence);
     }
     
+    // Flag several transactions in one call; emits one TransactionFlagged per id
+    function flagTransactions(uint256[] calldata _ids, string[] calldata _confidences) external {
+        require(_ids.length == _confidences.length, "Each id needs a confidence");
+        
+        for (uint256 i = 0; i < _ids.length; i++) {
+            require(_ids[i] <= transactionCount, "Transaction does not exist");
+            
+            transactions[_ids[i]].isFlagged = true;
+            transactions[_ids[i]].mlConfidence = _confidences[i];
+            
+            emit TransactionFlagged(_ids[i], _confidences[i]);
+        }
+    }
+    
     // Report fraud for a transaction
     function reportFraud(uint256 _transactionId, string memory _reason) public {
         require(_transactionId <= transactionCount, "Transaction does not exist");
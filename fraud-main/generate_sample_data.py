@@ -1,61 +1,224 @@
+from concurrent.futures import ProcessPoolExecutor
+from ml.dataset import DatasetWriter
+import multiprocessing
+import collections
 import pandas as pd
 import numpy as np
-import random
-import datetime
+import argparse
+import time
 import os
 
-def generate_sample_transactions(n_samples=1000):
-    # Create random addresses
-    addresses = [
-        f"0x{random.randint(0, 2**160):040x}" for _ in range(100)
-    ]
-    
-    # Generate data
-    data = {
-        'sender': [random.choice(addresses) for _ in range(n_samples)],
-        'receiver': [random.choice(addresses) for _ in range(n_samples)],
-        'amount': [random.uniform(10, 10000) for _ in range(n_samples)],
-        'timestamp': [
-            (datetime.datetime.now() - datetime.timedelta(days=random.randint(0, 30))).strftime('%Y-%m-%d %H:%M:%S') 
-            for _ in range(n_samples)
-        ]
+CSV_COLUMNS = ['sender', 'receiver', 'amount', 'timestamp', 'is_fraud']
+
+# Generated transactions span DAYS days up to END_DATE, so a seed always
+# produces the same rows
+END_DATE = '2025-05-01'
+DAYS = 30
+
+_HEX_DIGITS = np.frombuffer(b'0123456789abcdef', dtype=np.uint8)
+
+# Set in each worker by _init_worker(): the generation parameters and the
+# address pool, activity distribution and mule accounts derived from them
+_state = None
+
+def address_pool(count, rng):
+    # count random 0x-prefixed addresses as bytes; hex digits are filled in
+    # with array lookups rather than formatted one address at a time
+    raw = rng.integers(0, 256, size=(count, 20), dtype=np.uint8)
+    digits = np.empty((count, 42), dtype=np.uint8)
+    digits[:, 0], digits[:, 1] = ord('0'), ord('x')
+    digits[:, 2::2] = _HEX_DIGITS[raw >> 4]
+    digits[:, 3::2] = _HEX_DIGITS[raw & 15]
+    return digits.view('S42').ravel()
+
+def activity_cdf(count, skew, rng):
+    # Heavy-tailed activity: the address of rank r sends and receives in
+    # proportion to r^-skew, with ranks shuffled across the pool
+    weights = np.arange(1, count + 1, dtype=np.float64) ** -skew
+    cdf = np.cumsum(weights[rng.permutation(count)])
+    return cdf / cdf[-1]
+
+def _init_worker(params):
+    # Every process derives the same pool from the seed instead of being sent it
+    global _state
+    rng = np.random.default_rng([params['seed'], 0])
+    addresses = address_pool(params['addresses'], rng)
+    _state = {
+        'params': params,
+        'addresses': addresses,
+        'cdf': activity_cdf(len(addresses), params['activity_skew'], rng),
+        # Fraud bursts pay out to a small set of mule accounts
+        'mules': rng.choice(len(addresses), size=max(1, len(addresses) // 1000), replace=False)
+    }
+    return _state
+
+def _sample_addresses(rng, count):
+    return np.minimum(np.searchsorted(_state['cdf'], rng.random(count)), len(_state['cdf']) - 1).astype(np.int32)
+
+def generate_chunk(index, start_row, rows):
+    """(fraud count, rows) for rows start_row..start_row + rows, covering that
+    share of the time span in order: CSV text, or columns with sender and
+    receiver as ids into the address pool"""
+    params = _state['params']
+    rng = np.random.default_rng([params['seed'], 1, index])
+    span = params['end'] - params['start']
+    window_start = params['start'] + span * start_row // params['rows']
+    window_end = params['start'] + span * (start_row + rows) // params['rows']
+
+    # Fraud bursts: a compromised sender pays mules in quick succession
+    burst_rows = rng.binomial(rows, params['burst_fraction'])
+    sizes = rng.geometric(1 / params['burst_size'], size=burst_rows + 1)
+    sizes = sizes[:np.searchsorted(np.cumsum(sizes), burst_rows) + 1]
+    sizes[-1] -= sizes.sum() - burst_rows
+    sizes = sizes[sizes > 0]
+    burst = np.repeat(np.arange(len(sizes)), sizes)
+    # Seconds since each burst began: running gap totals, restarted per burst
+    gaps = rng.exponential(params['burst_gap'], size=burst_rows)
+    first = np.cumsum(sizes) - sizes
+    elapsed = np.cumsum(gaps)
+    elapsed -= np.repeat(elapsed[first] - gaps[first], sizes)
+    burst_start = rng.uniform(window_start, window_end, size=len(sizes))
+
+    normal_rows = rows - burst_rows
+    sender = np.concatenate([
+        _sample_addresses(rng, normal_rows),
+        rng.integers(0, len(_state['cdf']), size=len(sizes), dtype=np.int32)[burst]
+    ])
+    receiver = np.concatenate([
+        _sample_addresses(rng, normal_rows),
+        _state['mules'][rng.integers(0, len(_state['mules']), size=burst_rows)].astype(np.int32)
+    ])
+    # Whole cents, once, before labelling: the CSV and dataset outputs then
+    # hold the same amounts, and labels see the amounts they are stored with
+    amount = np.round(np.concatenate([
+        rng.uniform(10, 10000, size=normal_rows), rng.uniform(8000, 10000, size=burst_rows)
+    ]), 2)
+    timestamp = np.concatenate([
+        rng.uniform(window_start, window_end, size=normal_rows),
+        np.minimum(burst_start[burst] + elapsed, window_end - 1)
+    ]).astype(np.int64)
+    in_burst = np.arange(rows) >= normal_rows
+
+    # Label with the sample data's criteria: high amounts and hours outside
+    # 9-17 raise the fraud probability, and so does being part of a burst
+    hour = timestamp // 3600 % 24
+    fraud_prob = 0.4 * (amount > 8000) + 0.3 * ((hour < 9) | (hour > 17)) + 0.5 * in_burst
+    fraud_prob = np.clip(fraud_prob + rng.uniform(-0.1, 0.1, size=rows), 0.01, 0.99)
+    is_fraud = (rng.random(rows) < fraud_prob).astype(np.int8)
+
+    # Ensure at least min_fraud_rate of each chunk is fraudulent for balanced training
+    missing = int(params['min_fraud_rate'] * rows) - int(is_fraud.sum())
+    if missing > 0:
+        is_fraud[rng.choice(np.flatnonzero(is_fraud == 0), missing, replace=False)] = 1
+
+    order = np.argsort(timestamp, kind='stable')
+    chunk = {
+        'timestamp': timestamp[order], 'amount': amount[order],
+        'sender': sender[order], 'receiver': receiver[order], 'is_fraud': is_fraud[order]
+    }
+    if params['output_format'] == 'csv':
+        return int(is_fraud.sum()), format_csv(chunk)
+    return int(is_fraud.sum()), chunk
+
+def format_csv(chunk):
+    # The chunk as CSV text in the sample data's format
+    addresses = _state['addresses']
+    # 'YYYY-MM-DDTHH:MM:SS' with the T swapped for a space, as whole arrays
+    text = np.datetime_as_string(chunk['timestamp'].astype('datetime64[s]'))
+    codes = text.view(np.uint32).reshape(len(text), -1).copy()
+    codes[:, 10] = ord(' ')
+    df = pd.DataFrame({
+        'sender': addresses[chunk['sender']].astype(str),
+        'receiver': addresses[chunk['receiver']].astype(str),
+        'amount': chunk['amount'],
+        'timestamp': codes.view(text.dtype).ravel(),
+        'is_fraud': chunk['is_fraud']
+    })
+    return df.to_csv(index=False, header=False, float_format='%.2f')
+
+def generate_transactions(output_path, rows, seed=42, chunk_rows=1_000_000, workers=1, output_format='csv',
+                          addresses=None, activity_skew=0.8, burst_fraction=0.02, burst_size=8, burst_gap=60,
+                          min_fraud_rate=0.1, end_date=END_DATE, days=DAYS):
+    """Write rows labelled transactions to a CSV or a dataset directory
+    (ml/dataset.py), chunk_rows at a time across workers processes; memory
+    stays at a few chunks whatever rows is"""
+    end = int(pd.Timestamp(end_date).timestamp())
+    params = {
+        'seed': seed, 'rows': rows, 'output_format': output_format,
+        'addresses': addresses or int(np.clip(rows // 10, 100, 1_000_000)),
+        'activity_skew': activity_skew, 'burst_fraction': burst_fraction, 'burst_size': burst_size,
+        'burst_gap': burst_gap, 'min_fraud_rate': min_fraud_rate,
+        'start': end - days * 86400, 'end': end
     }
-    
-    # Create DataFrame
-    df = pd.DataFrame(data)
-    
-    # Add fraud labels
-    # Transactions with very high amounts have higher chance of being fraudulent
-    high_amount = df['amount'] > 8000
-    unusual_time = [int(ts.split()[1].split(':')[0]) not in range(9, 18) for ts in df['timestamp']]
-    
-    # Combine features to determine fraud probability
-    fraud_prob = np.zeros(n_samples)
-    fraud_prob = np.where(high_amount, fraud_prob + 0.4, fraud_prob)
-    fraud_prob = np.where(unusual_time, fraud_prob + 0.3, fraud_prob)
-    
-    # Add some randomness
-    fraud_prob += np.random.uniform(-0.1, 0.1, n_samples)
-    fraud_prob = np.clip(fraud_prob, 0.01, 0.99)
-    
-    # Generate binary labels
-    df['is_fraud'] = np.random.binomial(1, fraud_prob)
-    
-    # Ensure at least 10% of transactions are fraudulent for balanced training
-    if df['is_fraud'].mean() < 0.1:
-        idx = np.random.choice(df[df['is_fraud'] == 0].index, 
-                              int(0.1 * n_samples) - df['is_fraud'].sum(),
-                              replace=False)
-        df.loc[idx, 'is_fraud'] = 1
-    
-    # Save to CSV
-    os.makedirs('data', exist_ok=True)
-    df.to_csv('data/sample_transactions.csv', index=False)
-    
-    print(f"Created sample data with {n_samples} transactions")
-    print(f"Fraud rate: {df['is_fraud'].mean():.2%}")
-    
-    return df
+    chunks = [(index, start, min(chunk_rows, rows - start)) for index, start in enumerate(range(0, rows, chunk_rows))]
+
+    state = _init_worker(params)
+    if output_format == 'csv':
+        os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+        output = open(output_path, 'w', newline='')
+        output.write(','.join(CSV_COLUMNS) + '\n')
+    else:
+        output = DatasetWriter(output_path, rows, state['addresses'].astype(str))
+
+    fraud = 0
+    def record(result):
+        # Chunks arrive in row order
+        nonlocal fraud
+        chunk_fraud, chunk = result
+        output.write(chunk)
+        fraud += chunk_fraud
+
+    try:
+        if workers <= 1:
+            for index, start, count in chunks:
+                record(generate_chunk(index, start, count))
+        else:
+            # Spawn, as the other process pools do. Only a window of chunks is
+            # in flight, so finished ones never pile up in memory.
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                                     initializer=_init_worker, initargs=(params,)) as executor:
+                pending = collections.deque()
+                for index, start, count in chunks:
+                    pending.append(executor.submit(generate_chunk, index, start, count))
+                    if len(pending) >= 2 * workers:
+                        record(pending.popleft().result())
+                for future in pending:
+                    record(future.result())
+    finally:
+        output.close()
+    return fraud
+
+def generate_sample_transactions(n_samples=1000, output_path='data/sample_transactions.csv', **options):
+    start = time.time()
+    fraud = generate_transactions(output_path, n_samples, **options)
+
+    print(f"Created sample data with {n_samples} transactions in {output_path} ({time.time() - start:.1f}s)")
+    print(f"Fraud rate: {fraud / n_samples:.2%}")
+    return fraud
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate labelled synthetic transactions")
+    parser.add_argument('--rows', type=int, default=1000, help='Transactions to generate (default: 1000)')
+    parser.add_argument('--output', default='data/sample_transactions.csv',
+                        help='CSV file, or dataset directory with --format npy')
+    parser.add_argument('--format', choices=['csv', 'npy'], default='csv',
+                        help='CSV, or the columnar .npy dataset of ml/dataset.py')
+    parser.add_argument('--seed', type=int, default=42, help='Seed; the same seed and options give the same rows')
+    parser.add_argument('--chunk-rows', type=int, default=1_000_000, help='Rows generated per task')
+    parser.add_argument('--workers', type=int, default=1, help='Worker processes generating chunks')
+    parser.add_argument('--addresses', type=int, help='Address pool size (default: rows / 10, 100 to 1M)')
+    parser.add_argument('--activity-skew', type=float, default=0.8,
+                        help='Zipf exponent of per-address activity; higher concentrates it on fewer addresses')
+    parser.add_argument('--burst-fraction', type=float, default=0.02,
+                        help='Share of rows that belong to fraud bursts')
+    parser.add_argument('--burst-size', type=float, default=8, help='Mean transactions per fraud burst')
+    args = parser.parse_args()
+
+    generate_sample_transactions(
+        args.rows, args.output, seed=args.seed, chunk_rows=args.chunk_rows, workers=args.workers,
+        output_format=args.format, addresses=args.addresses, activity_skew=args.activity_skew,
+        burst_fraction=args.burst_fraction, burst_size=args.burst_size
+    )
 
 if __name__ == "__main__":
-    generate_sample_transactions()
\ No newline at end of file
+    main()
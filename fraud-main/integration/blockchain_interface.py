@@ -1,14 +1,56 @@
+from integration.transaction_submitter import TransactionSubmitter
+from concurrent.futures import Future
 from web3 import Web3
+from hexbytes import HexBytes
+import functools
+import threading
+import requests
+import hashlib
+import logging
 import json
 import os
 
+log = logging.getLogger('fraud_monitor.chain')
+
+@functools.lru_cache(maxsize=None)
+def load_compiled_contract(compiled_path='blockchain/contracts/compiled/FraudDetection.json'):
+    # Compiled ABI and bytecode, read and parsed once per process
+    with open(compiled_path, 'r') as file:
+        return json.load(file)
+
+@functools.lru_cache(maxsize=None)
+def compiled_contract_is_current(compiled_path='blockchain/contracts/compiled/FraudDetection.json'):
+    # Whether blockchain/compile_contract.py built the artifact from the
+    # FraudDetection.sol next to it as it is now; True if there is no source
+    source_path = os.path.join(os.path.dirname(os.path.dirname(compiled_path)), 'FraudDetection.sol')
+    if not os.path.exists(source_path):
+        return True
+    with open(source_path, 'r') as file:
+        digest = hashlib.sha256(file.read().encode()).hexdigest()
+    return load_compiled_contract(compiled_path).get('source_sha256') == digest
+
 class BlockchainInterface:
-    def __init__(self, contract_address=None, contract_abi=None):
+    # Upper bound on the block span of a single eth_getLogs request; most
+    # nodes reject or truncate very wide ranges
+    MAX_LOG_BLOCK_RANGE = 2000
+    
+    # Default number of getTransaction calls packed into one JSON-RPC batch
+    RPC_BATCH_SIZE = 100
+    
+    # Most ids sent in one flagTransactions call, keeping each call well under
+    # the block gas limit
+    FLAG_BATCH_SIZE = 100
+    
+    # Default cap on transactions the submitter keeps unconfirmed at once
+    MAX_IN_FLIGHT = 64
+    
+    def __init__(self, contract_address=None, contract_abi=None, w3=None):
         # Connect to Ethereum node
-        self.w3 = Web3(Web3.HTTPProvider('http://127.0.0.1:8545'))  # Use your Ethereum node or Infura URL
+        self.w3 = w3 or Web3(Web3.HTTPProvider('http://127.0.0.1:8545'))  # Use your Ethereum node or Infura URL
         
-        # Set default account
-        self.w3.eth.default_account = self.w3.eth.accounts[0]
+        # Set default account, unless the caller's w3 already has one
+        if not self.w3.eth.default_account:
+            self.w3.eth.default_account = self.w3.eth.accounts[0]
         
         # Load contract information
         if contract_address is None or contract_abi is None:
@@ -16,6 +58,42 @@ class BlockchainInterface:
         
         # Initialize contract
         self.contract = self.w3.eth.contract(address=contract_address, abi=contract_abi)
+        
+        # Keep-alive session for batched JSON-RPC reads; the provider's own
+        # connection pool when it has one
+        self.rpc_session = getattr(self.w3.provider, 'session', None) or requests.Session()
+        
+        # Background sender for the *_async methods, started on first use
+        self._submitter = None
+        self.max_in_flight = self.MAX_IN_FLIGHT
+        self._submitter_lock = threading.Lock()
+        
+        # Contracts deployed before flagTransactions existed only flag one id per call
+        self._batch_flagging = any(item.get('name') == 'flagTransactions' for item in self.contract.abi)
+    
+    @classmethod
+    def deploy(cls, w3, compiled_path='blockchain/contracts/compiled/FraudDetection.json'):
+        # Deploy a fresh FraudDetection contract from the first account and
+        # return an interface to it, without touching contract_address.txt
+        compiled_contract = load_compiled_contract(compiled_path)
+        if not compiled_contract_is_current(compiled_path):
+            log.warning("%s was not compiled from the current FraudDetection.sol; functions added since "
+                        "(such as flagTransactions) are missing until python blockchain/compile_contract.py "
+                        "is run", compiled_path)
+        
+        if not w3.eth.default_account:
+            w3.eth.default_account = w3.eth.accounts[0]
+        FraudDetection = w3.eth.contract(abi=compiled_contract['abi'], bytecode=compiled_contract['bytecode'])
+        receipt = w3.eth.wait_for_transaction_receipt(FraudDetection.constructor().transact())
+        return cls(receipt.contractAddress, compiled_contract['abi'], w3=w3)
+    
+    @property
+    def contract_address(self):
+        return self.contract.address
+    
+    def transaction_count(self):
+        # Number of transactions the contract holds; ids run 1..count
+        return self.contract.functions.transactionCount().call()
     
     def _load_contract_info(self):
         # Load contract address
@@ -23,9 +101,7 @@ class BlockchainInterface:
             contract_address = file.read().strip()
         
         # Load contract ABI
-        with open('blockchain/contracts/compiled/FraudDetection.json', 'r') as file:
-            compiled_contract = json.load(file)
-            contract_abi = compiled_contract['abi']
+        contract_abi = load_compiled_contract()['abi']
         
         return contract_address, contract_abi
     
@@ -34,6 +110,9 @@ class BlockchainInterface:
         tx_hash = self.contract.functions.addTransaction(receiver, amount).transact()
         receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash)
         
+        return self._transaction_id_from_receipt(receipt)
+    
+    def _transaction_id_from_receipt(self, receipt):
         # Get transaction ID from event logs
         logs = self.contract.events.TransactionAdded().process_receipt(receipt)
         transaction_id = logs[0]['args']['id']
@@ -50,16 +129,170 @@ class BlockchainInterface:
         receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash)
         return receipt
     
+    def supports_batch_flagging(self):
+        return self._batch_flagging
+    
+    def flag_transactions(self, transaction_ids, confidences):
+        # Flag many transactions with one flagTransactions call per FLAG_BATCH_SIZE
+        # ids; returns one receipt per call
+        if not self.supports_batch_flagging():
+            return [
+                self.flag_transaction(transaction_id, confidence)
+                for transaction_id, confidence in zip(transaction_ids, confidences)
+            ]
+        
+        receipts = []
+        for ids, confidence_strings in self._flag_batches(transaction_ids, confidences):
+            tx_hash = self.contract.functions.flagTransactions(ids, confidence_strings).transact()
+            receipts.append(self.w3.eth.wait_for_transaction_receipt(tx_hash))
+        return receipts
+    
+    def _flag_batches(self, transaction_ids, confidences):
+        transaction_ids = list(transaction_ids)
+        confidences = [str(confidence) for confidence in confidences]
+        for start in range(0, len(transaction_ids), self.FLAG_BATCH_SIZE):
+            yield (
+                transaction_ids[start:start + self.FLAG_BATCH_SIZE],
+                confidences[start:start + self.FLAG_BATCH_SIZE]
+            )
+    
     def report_fraud(self, transaction_id, reason):
         # Report fraud for a transaction
         tx_hash = self.contract.functions.reportFraud(transaction_id, reason).transact()
         receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash)
         return receipt
     
+    @property
+    def submitter(self):
+        # One sender per interface, however many threads submit through it
+        with self._submitter_lock:
+            if self._submitter is None:
+                self._submitter = TransactionSubmitter(self.w3, max_in_flight=self.max_in_flight)
+            return self._submitter
+    
+    def reserve_in_flight(self, count):
+        # Let the submitter keep at least count transactions unconfirmed. A
+        # running one with a smaller cap is drained and closed first (holding
+        # the lock, so no second sender races it for nonces) and the next
+        # *_async call starts one with the new cap.
+        with self._submitter_lock:
+            self.max_in_flight = max(self.max_in_flight, count)
+            if self._submitter is not None and self._submitter.max_in_flight < self.max_in_flight:
+                self._submitter.close(wait=True)
+                self._submitter = None
+    
+    def add_transaction_async(self, receiver, amount):
+        # Like add_transaction, but returns at once with a Future for the new ID
+        receipt_future = self.submitter.submit(self.contract.functions.addTransaction(receiver, amount))
+        id_future = Future()
+        
+        def resolve(done):
+            try:
+                id_future.set_result(self._transaction_id_from_receipt(done.result()))
+            except Exception as e:
+                id_future.set_exception(e)
+        
+        receipt_future.add_done_callback(resolve)
+        return id_future
+    
+    def flag_transaction_async(self, transaction_id, confidence):
+        # Like flag_transaction, but returns at once with a Future for the receipt
+        return self.submitter.submit(
+            self.contract.functions.flagTransaction(transaction_id, str(confidence))
+        )
+    
+    def flag_transactions_async(self, transaction_ids, confidences):
+        # Like flag_transactions, but returns at once with one Future per id;
+        # ids sent in the same flagTransactions call share a Future
+        if not self.supports_batch_flagging():
+            return [
+                self.flag_transaction_async(transaction_id, confidence)
+                for transaction_id, confidence in zip(transaction_ids, confidences)
+            ]
+        
+        futures = []
+        for ids, confidence_strings in self._flag_batches(transaction_ids, confidences):
+            future = self.submitter.submit(self.contract.functions.flagTransactions(ids, confidence_strings))
+            futures.extend([future] * len(ids))
+        return futures
+    
+    def report_fraud_async(self, transaction_id, reason):
+        # Like report_fraud, but returns at once with a Future for the receipt
+        return self.submitter.submit(self.contract.functions.reportFraud(transaction_id, reason))
+    
+    def close(self, wait=True):
+        # Stop the background sender, by default after everything in flight
+        # confirms; the next *_async call starts a new one
+        with self._submitter_lock:
+            submitter, self._submitter = self._submitter, None
+        if submitter is not None:
+            submitter.close(wait=wait)
+    
     def get_transaction(self, transaction_id):
         # Get transaction details from blockchain
         tx_data = self.contract.functions.getTransaction(transaction_id).call()
         
+        return self._format_transaction(tx_data)
+    
+    def get_transactions(self, start, end, chunk_size=None):
+        # Get transactions start..end (inclusive), packing chunk_size
+        # getTransaction calls into each JSON-RPC batch request
+        chunk_size = chunk_size or self.RPC_BATCH_SIZE
+        
+        if not isinstance(self.w3.provider, Web3.HTTPProvider):
+            # Batching needs raw HTTP access; other providers read one id at a time
+            return [self.get_transaction(tx_id) for tx_id in range(start, end + 1)]
+        
+        endpoint = self.w3.provider.endpoint_uri
+        
+        output_types = [
+            output['type'] for output in self.contract.get_function_by_name('getTransaction').abi['outputs']
+        ]
+        request_kwargs = dict(self.w3.provider.get_request_kwargs())
+        transactions = []
+        
+        for chunk_start in range(start, end + 1, chunk_size):
+            ids = range(chunk_start, min(chunk_start + chunk_size - 1, end) + 1)
+            
+            # One eth_call per id, all sent in a single HTTP round trip
+            batch = [
+                {
+                    'jsonrpc': '2.0',
+                    'id': tx_id,
+                    'method': 'eth_call',
+                    'params': [
+                        {
+                            'to': self.contract.address,
+                            'data': self.contract.encodeABI(fn_name='getTransaction', args=[tx_id])
+                        },
+                        'latest'
+                    ]
+                }
+                for tx_id in ids
+            ]
+            response = self.rpc_session.post(endpoint, json=batch, **request_kwargs)
+            response.raise_for_status()
+            
+            # Batch responses may come back in any order
+            results = {item.get('id'): item for item in response.json()}
+            for tx_id in ids:
+                item = results.get(tx_id)
+                if item is None or 'error' in item:
+                    error = item['error'] if item else 'missing from batch response'
+                    raise ValueError(f"getTransaction({tx_id}) failed: {error}")
+                
+                tx_data = self.w3.codec.decode(output_types, HexBytes(item['result']))
+                
+                # The raw codec returns lowercase addresses; match contract.call()
+                tx_data = [
+                    Web3.to_checksum_address(value) if output_type == 'address' else value
+                    for output_type, value in zip(output_types, tx_data)
+                ]
+                transactions.append(self._format_transaction(tx_data))
+        
+        return transactions
+    
+    def _format_transaction(self, tx_data):
         # Format transaction data
         transaction = {
             'id': tx_data[0],
@@ -71,4 +304,57 @@ class BlockchainInterface:
             'ml_confidence': tx_data[6]
         }
         
-        return transaction
\ No newline at end of file
+        return transaction
+    
+    def get_block_number(self):
+        # Latest block number seen by the node
+        return self.w3.eth.block_number
+    
+    def get_transaction_events(self, from_block, to_block):
+        # Read TransactionAdded events for an inclusive block range with
+        # eth_getLogs, split into spans the node will accept
+        transactions = []
+        block_timestamps = {}
+        
+        for start in range(from_block, to_block + 1, self.MAX_LOG_BLOCK_RANGE):
+            end = min(start + self.MAX_LOG_BLOCK_RANGE - 1, to_block)
+            logs = self.contract.events.TransactionAdded().get_logs(fromBlock=start, toBlock=end)
+            
+            for entry in logs:
+                transactions.append(self._decode_transaction_event(entry, block_timestamps))
+        
+        return transactions
+    
+    def create_transaction_filter(self, from_block='latest'):
+        # Install a log filter so new TransactionAdded events can be pulled
+        # with a single eth_getFilterChanges call per poll
+        return self.contract.events.TransactionAdded.create_filter(fromBlock=from_block)
+    
+    def get_new_transaction_events(self, event_filter):
+        # Decode the events that arrived since the filter was last polled
+        block_timestamps = {}
+        return [
+            self._decode_transaction_event(entry, block_timestamps)
+            for entry in event_filter.get_new_entries()
+        ]
+    
+    def _decode_transaction_event(self, entry, block_timestamps):
+        # The event carries id, sender, receiver and amount; the contract
+        # stores block.timestamp, so one block lookup covers every event in it
+        block_number = entry['blockNumber']
+        if block_number not in block_timestamps:
+            block_timestamps[block_number] = self.w3.eth.get_block(block_number)['timestamp']
+        
+        args = entry['args']
+        transaction = {
+            'id': args['id'],
+            'sender': args['sender'],
+            'receiver': args['receiver'],
+            'amount': args['amount'],
+            'timestamp': block_timestamps[block_number],
+            'is_flagged': False,
+            'ml_confidence': '0.0',
+            'block_number': block_number
+        }
+        
+        return transaction
@@ -0,0 +1,237 @@
+from integration.blockchain_interface import BlockchainInterface
+from concurrent.futures import Future
+from web3 import Web3
+from web3.datastructures import AttributeDict
+from requests.adapters import HTTPAdapter
+import requests
+import threading
+import bisect
+import time
+import os
+
+# Backends connect_chain() accepts
+CHAIN_BACKENDS = ('node', 'eth-tester', 'memory')
+
+# Ganache's default endpoint
+DEFAULT_NODE_URL = 'http://127.0.0.1:8545'
+
+# Keep-alive connections a node client holds open, enough for the monitor,
+# its submitter threads and a load generator's senders at once
+DEFAULT_POOL_SIZE = 32
+
+# Sender of every transaction added to an InMemoryLedger (eth-tester's first account)
+MEMORY_SENDER = '0x7E5F4552091A69125d5DfCb7b8C2659029395Bdf'
+
+class PooledHTTPProvider(Web3.HTTPProvider):
+    """HTTPProvider sending the requests of every thread through one keep-alive
+    session, with a connection pool sized for all of them; web3 otherwise opens
+    a default-sized session per thread"""
+
+    def __init__(self, endpoint_uri, pool_size=DEFAULT_POOL_SIZE, request_kwargs=None):
+        super().__init__(endpoint_uri, dict({'timeout': 10}, **(request_kwargs or {})))
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def make_request(self, method, params):
+        response = self.session.post(
+            self.endpoint_uri, data=self.encode_rpc_request(method, params), **self.get_request_kwargs()
+        )
+        response.raise_for_status()
+        return self.decode_rpc_response(response.content)
+
+class LockedWebsocketProvider(Web3.WebsocketProvider):
+    """WebsocketProvider safe to share between threads: replies are read back
+    in request order on the one connection, so requests go one at a time"""
+
+    def __init__(self, endpoint_uri, websocket_timeout=10):
+        super().__init__(endpoint_uri, websocket_timeout=websocket_timeout)
+        self._request_lock = threading.Lock()
+
+    def make_request(self, method, params):
+        with self._request_lock:
+            return super().make_request(method, params)
+
+def node_provider(url=DEFAULT_NODE_URL, pool_size=DEFAULT_POOL_SIZE):
+    # Provider for a node URL: http(s):// pooled HTTP, ws(s):// WebSocket,
+    # anything else an IPC socket path (IPCProvider serializes requests itself)
+    if url.startswith(('http://', 'https://')):
+        return PooledHTTPProvider(url, pool_size)
+    if url.startswith(('ws://', 'wss://')):
+        return LockedWebsocketProvider(url)
+    return Web3.IPCProvider(url)
+
+def connect_chain(backend='node', url=DEFAULT_NODE_URL):
+    """Chain client for the backend: 'node' talks to a running node over HTTP,
+    WebSocket or IPC (by URL) and the deployed contract; 'eth-tester' deploys
+    the compiled contract on a fresh in-process EVM; 'memory' is an
+    InMemoryLedger with no EVM at all"""
+    if backend == 'node':
+        return BlockchainInterface(w3=Web3(node_provider(url or DEFAULT_NODE_URL)))
+    if backend == 'eth-tester':
+        # Optional dependency: pip install "web3[tester]"
+        from web3.providers.eth_tester import EthereumTesterProvider
+        return BlockchainInterface.deploy(Web3(EthereumTesterProvider()))
+    if backend == 'memory':
+        return InMemoryLedger()
+    raise ValueError(f"Unknown chain backend {backend!r}; expected one of {', '.join(CHAIN_BACKENDS)}")
+
+# Clients handed out by shared_chain(), by (backend, url)
+_shared_clients = {}
+_shared_lock = threading.Lock()
+
+def shared_chain(backend='node', url=DEFAULT_NODE_URL):
+    """Process-wide client for the backend, connected on first use and returned
+    to every later caller; its provider, contract and submitter are safe to
+    share between threads, so repeated calls cost nothing"""
+    key = (backend, url or DEFAULT_NODE_URL)
+    with _shared_lock:
+        client = _shared_clients.get(key)
+        if client is None:
+            client = _shared_clients[key] = connect_chain(backend, url)
+    return client
+
+class _LedgerFilter:
+    # Read position of a create_transaction_filter() in the ledger's event list
+
+    def __init__(self, position):
+        self.position = position
+
+class InMemoryLedger:
+    """The FraudDetection contract as plain Python objects, with the methods of
+    BlockchainInterface. Every write is mined at once in a block of its own and
+    *_async methods return already resolved Futures, so runs against it measure
+    the ML pipeline without any chain overhead."""
+
+    def __init__(self, sender=MEMORY_SENDER):
+        self.sender = sender
+        # A fresh address per ledger, so monitor checkpoints of earlier runs never match
+        self.contract_address = Web3.to_checksum_address(os.urandom(20).hex())
+        self.transactions = [None]  # index = transaction id; ids start at 1
+        self.fraud_reports = {}
+        self.block_number = 0
+        # TransactionAdded events in block order, and the block of each
+        self.events = []
+        self.event_blocks = []
+        self._lock = threading.Lock()
+
+    def _mine(self):
+        # Caller holds the lock; a receipt for the block the write landed in
+        self.block_number += 1
+        return AttributeDict({'blockNumber': self.block_number, 'status': 1, 'gasUsed': 0})
+
+    def _require(self, transaction_id):
+        # The contract's require(_id <= transactionCount)
+        if not 0 < transaction_id < len(self.transactions):
+            raise ValueError(f"Transaction does not exist: {transaction_id}")
+
+    def transaction_count(self):
+        return len(self.transactions) - 1
+
+    def add_transaction(self, receiver, amount):
+        with self._lock:
+            receipt = self._mine()
+            transaction_id = len(self.transactions)
+            self.transactions.append({
+                'id': transaction_id,
+                'sender': self.sender,
+                'receiver': receiver,
+                'amount': int(amount),
+                'timestamp': int(time.time()),
+                'is_flagged': False,
+                'ml_confidence': '0.0'
+            })
+            self.events.append(dict(self.transactions[transaction_id], block_number=receipt.blockNumber))
+            self.event_blocks.append(receipt.blockNumber)
+        return transaction_id
+
+    def flag_transaction(self, transaction_id, confidence):
+        return self.flag_transactions([transaction_id], [confidence])[0]
+
+    def supports_batch_flagging(self):
+        return True
+
+    def flag_transactions(self, transaction_ids, confidences):
+        # All ids in one block, like a single flagTransactions call; nothing is
+        # flagged if any id does not exist
+        transaction_ids = list(transaction_ids)
+        with self._lock:
+            for transaction_id in transaction_ids:
+                self._require(transaction_id)
+            for transaction_id, confidence in zip(transaction_ids, confidences):
+                self.transactions[transaction_id]['is_flagged'] = True
+                self.transactions[transaction_id]['ml_confidence'] = str(confidence)
+            return [self._mine()]
+
+    def report_fraud(self, transaction_id, reason):
+        with self._lock:
+            self._require(transaction_id)
+            self.fraud_reports.setdefault(transaction_id, []).append({
+                'reporter': self.sender, 'reason': reason, 'timestamp': int(time.time()), 'resolved': False
+            })
+            return self._mine()
+
+    def _resolved(self, call, *args):
+        # Run a write now and hand back its outcome as a finished Future
+        future = Future()
+        try:
+            future.set_result(call(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def add_transaction_async(self, receiver, amount):
+        return self._resolved(self.add_transaction, receiver, amount)
+
+    def flag_transaction_async(self, transaction_id, confidence):
+        return self._resolved(self.flag_transaction, transaction_id, confidence)
+
+    def flag_transactions_async(self, transaction_ids, confidences):
+        future = self._resolved(lambda: self.flag_transactions(transaction_ids, confidences)[0])
+        return [future] * len(transaction_ids)
+
+    def report_fraud_async(self, transaction_id, reason):
+        return self._resolved(self.report_fraud, transaction_id, reason)
+
+    def reserve_in_flight(self, count):
+        # Nothing is ever in flight
+        pass
+
+    def close(self, wait=True):
+        # Nothing is ever in flight
+        pass
+
+    def get_transaction(self, transaction_id):
+        with self._lock:
+            self._require(transaction_id)
+            return dict(self.transactions[transaction_id])
+
+    def get_transactions(self, start, end, chunk_size=None):
+        if start > end:
+            return []
+        with self._lock:
+            self._require(start)
+            self._require(end)
+            return [dict(transaction) for transaction in self.transactions[start:end + 1]]
+
+    def get_block_number(self):
+        return self.block_number
+
+    def get_transaction_events(self, from_block, to_block):
+        with self._lock:
+            first = bisect.bisect_left(self.event_blocks, from_block)
+            last = bisect.bisect_right(self.event_blocks, to_block)
+            return [dict(event) for event in self.events[first:last]]
+
+    def create_transaction_filter(self, from_block='latest'):
+        with self._lock:
+            if from_block == 'latest':
+                return _LedgerFilter(len(self.events))
+            return _LedgerFilter(bisect.bisect_left(self.event_blocks, from_block))
+
+    def get_new_transaction_events(self, event_filter):
+        with self._lock:
+            events = self.events[event_filter.position:]
+            event_filter.position = len(self.events)
+        return [dict(event) for event in events]
@@ -0,0 +1,51 @@
+import datetime
+import json
+import os
+
+class MonitorCheckpoint:
+    """Monitor progress (watermark, statistics, unconfirmed flags) kept in a
+    JSON file that is replaced atomically, so a crash leaves either the previous
+    or the new state on disk, never a torn one"""
+
+    def __init__(self, path='data/monitor_checkpoint.json'):
+        self.path = path
+
+    def load(self, contract_address):
+        # Saved state for this contract, or None to start from the chain head
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path, 'r') as f:
+            state = json.load(f)
+        if state.get('contract_address') != contract_address:
+            print(f"Ignoring checkpoint {self.path}: it belongs to contract {state.get('contract_address')}")
+            return None
+        # JSON object keys are strings
+        state['pending_flags'] = {int(tx_id): prob for tx_id, prob in state.get('pending_flags', {}).items()}
+        return state
+
+    def save(self, contract_address, last_checked_id, last_block, stats, pending_flags):
+        state = {
+            'contract_address': contract_address,
+            'last_checked_id': last_checked_id,
+            'last_block': last_block,
+            'stats': stats,
+            'pending_flags': pending_flags,
+            'saved_at': datetime.datetime.now().isoformat(timespec='seconds')
+        }
+
+        # Write a sibling file, flush it to disk, then rename it over the old one
+        directory = os.path.dirname(self.path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump(state, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+
+        # Make the rename itself durable
+        directory_fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(directory_fd)
+        finally:
+            os.close(directory_fd)
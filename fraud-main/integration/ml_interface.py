@@ -1,12 +1,27 @@
 from ml.model import FraudDetectionModel
+from integration.telemetry import Metrics
+from dateutil import tz
 import pandas as pd
 import datetime
 import time
 
 class MLInterface:
-    def __init__(self, model_path='ml/saved_models/fraud_model.pkl'):
+    # Below this size a batch is cheaper to score one transaction at a time
+    # through predict_realtime than with one dispatched forest call
+    REALTIME_BATCH_LIMIT = 128
+    
+    def __init__(self, model_path='ml/saved_models/fraud_model.pkl', metrics=None):
+        self.model_path = model_path
         self.model = FraudDetectionModel()
         self.model.load_model(model_path)
+        # Scoring time is split into 'features' and 'inference' stages
+        self.metrics = metrics if metrics is not None else Metrics()
+    
+    def save_profiles(self):
+        # Persist the address history accumulated while scoring, so the next
+        # run starts from it instead of from the training data alone; merged
+        # with what other processes serving the model saved meanwhile
+        self.model.merge_profiles(self.model.profiles_path(self.model_path))
     
     def analyze_transaction(self, transaction):
         # Convert blockchain transaction to format suitable for ML model
@@ -17,18 +32,67 @@ class MLInterface:
             'timestamp': datetime.datetime.fromtimestamp(transaction['timestamp'])
         }
         
-        # Get prediction
-        prediction = self.model.predict(ml_transaction)
+        # Get prediction through the low-latency single-transaction path
+        with self.metrics.time('features'):
+            x = self.model.realtime_features(ml_transaction)
+        with self.metrics.time('inference'):
+            prediction = self.model.realtime_predict(x)
         
         return prediction
     
     def process_transactions_batch(self, transactions):
+        if not transactions:
+            return []
+        
+        if len(transactions) < self.REALTIME_BATCH_LIMIT:
+            results = []
+            for tx in transactions:
+                result = self.analyze_transaction(tx)
+                results.append({
+                    'transaction_id': tx['id'],
+                    'is_fraud': result['is_fraud'],
+                    'fraud_probability': result['fraud_probability']
+                })
+            return results
+        
+        # One vectorized forest call for every transaction in the batch
+        return self.score_transactions(transactions)
+    
+    def observe_profiles(self, transactions):
+        # Record chain transactions in the address profiles, in order, without
+        # scoring them; score_transactions() takes the returned features
+        return self.model.observe_profiles(self._transactions_frame(transactions))
+    
+    def score_transactions(self, transactions, profile_features=None):
+        # Batch-score chain transactions; with profile_features from
+        # observe_profiles() this process's profiles are left untouched
+        with self.metrics.time('features'):
+            X, _ = self.model.preprocess(self._transactions_frame(transactions), training=False,
+                                         profile_features=profile_features)
+        with self.metrics.time('inference'):
+            result = self.model.predict_scaled(X)
+        
         results = []
-        for tx in transactions:
-            result = self.analyze_transaction(tx)
+        for tx, is_fraud, fraud_prob in zip(transactions, result['is_fraud'], result['fraud_probability']):
             results.append({
                 'transaction_id': tx['id'],
-                'is_fraud': result['is_fraud'],
-                'fraud_probability': result['fraud_probability']
+                'is_fraud': bool(is_fraud),
+                'fraud_probability': float(fraud_prob)
             })
-        return results
\ No newline at end of file
+        return results
+    
+    def _transactions_frame(self, transactions):
+        # Build one frame for the whole batch; timestamps are converted to local
+        # time like datetime.fromtimestamp() does in analyze_transaction
+        df = pd.DataFrame({
+            'sender': [tx['sender'] for tx in transactions],
+            'receiver': [tx['receiver'] for tx in transactions],
+            'amount': [tx['amount'] for tx in transactions],
+            'timestamp': [tx['timestamp'] for tx in transactions]
+        })
+        df['timestamp'] = (
+            pd.to_datetime(df['timestamp'], unit='s', utc=True)
+            .dt.tz_convert(tz.tzlocal())
+            .dt.tz_localize(None)
+        )
+        return df
\ No newline at end of file
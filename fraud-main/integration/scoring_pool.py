@@ -0,0 +1,60 @@
+from integration.ml_interface import MLInterface
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import math
+
+# The worker process's own MLInterface, loaded once by _init_worker
+_worker_ml = None
+
+def _init_worker(model_path):
+    global _worker_ml
+    _worker_ml = MLInterface(model_path)
+
+def _score_shard(transactions, profile_features):
+    return _worker_ml.score_transactions(transactions, profile_features)
+
+class ScoringPool:
+    """Scores batches of chain transactions across worker processes, each with
+    its own copy of the model, returning results in the order given"""
+
+    # Smaller shards cost more in pickling and dispatch than they save
+    MIN_SHARD_SIZE = 64
+
+    def __init__(self, ml, workers, model_path=None):
+        # ml is the monitor's MLInterface; its profile stores stay the single
+        # source of per-address history, so sharding cannot split an address's
+        # history between processes. Workers load model_path (default: ml's);
+        # an artifact directory is memory-mapped and shared between them.
+        self.ml = ml
+        self.workers = workers
+        # Spawn rather than fork: the parent already runs the transaction submitter threads
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(model_path or ml.model_path,)
+        )
+
+    def process_transactions_batch(self, transactions):
+        # Same results as MLInterface.process_transactions_batch, in order
+        if len(transactions) < 2 * self.MIN_SHARD_SIZE:
+            return self.ml.process_transactions_batch(transactions)
+
+        # Record the whole batch in id order here, then hand each worker a
+        # contiguous id range together with its precomputed profile features
+        profile_features = self.ml.observe_profiles(transactions)
+        shard_size = max(self.MIN_SHARD_SIZE, math.ceil(len(transactions) / self.workers))
+
+        futures = []
+        for start in range(0, len(transactions), shard_size):
+            end = start + shard_size
+            shard_profiles = {feature: values[start:end] for feature, values in profile_features.items()}
+            futures.append(self.executor.submit(_score_shard, transactions[start:end], shard_profiles))
+
+        results = []
+        for future in futures:
+            results.extend(future.result())
+        return results
+
+    def close(self):
+        self.executor.shutdown(wait=True)
@@ -0,0 +1,201 @@
+from web3.exceptions import TransactionNotFound
+from web3 import Web3
+from concurrent.futures import Future
+import threading
+import logging
+import queue
+import time
+
+log = logging.getLogger('fraud_monitor.submitter')
+
+class TransactionReverted(Exception):
+    """A submitted transaction was mined but reverted (receipt status 0)"""
+
+    def __init__(self, receipt):
+        super().__init__(
+            f"Transaction {Web3.to_hex(receipt['transactionHash'])} reverted in block {receipt['blockNumber']}"
+        )
+        self.receipt = receipt
+
+class TransactionSubmitter:
+    """Sends contract transactions from one account with locally assigned nonces,
+    confirming, retrying and replacing them in the background; submit() returns
+    a Future for the receipt, which fails with TransactionReverted if the
+    transaction was mined but reverted"""
+
+    def __init__(self, w3, account=None, max_in_flight=64, poll_interval=0.5,
+                 stuck_after=30.0, max_replacements=3, fee_bump=1.125, timeout=300.0):
+        self.w3 = w3
+        self.account = account or w3.eth.default_account
+        self.poll_interval = poll_interval
+        self.stuck_after = stuck_after
+        self.max_replacements = max_replacements
+        self.fee_bump = fee_bump
+        self.timeout = timeout
+        self.max_in_flight = max_in_flight
+
+        self._nonce_lock = threading.Lock()
+        self._next_nonce = None
+        self._in_flight = threading.BoundedSemaphore(max_in_flight)
+        self._queue = queue.Queue()
+        self._pending = {}  # nonce -> pending transaction state
+        self._pending_lock = threading.Lock()
+        self._outstanding = 0  # submitted and not yet resolved
+        self._closed = threading.Event()
+
+        self._sender = threading.Thread(target=self._send_loop, name='tx-sender', daemon=True)
+        self._confirmer = threading.Thread(target=self._confirm_loop, name='tx-confirmer', daemon=True)
+        self._sender.start()
+        self._confirmer.start()
+
+    @property
+    def pending_count(self):
+        # Transactions submitted whose Future has not resolved yet
+        with self._pending_lock:
+            return self._outstanding
+
+    def submit(self, contract_function, transaction=None):
+        # Queue a contract call (e.g. contract.functions.flagTransaction(...)) and
+        # return a Future for its receipt
+        if self._closed.is_set():
+            raise RuntimeError("TransactionSubmitter is closed")
+        future = Future()
+        with self._pending_lock:
+            self._outstanding += 1
+        self._queue.put((contract_function, dict(transaction or {}), future))
+        return future
+
+    def close(self, wait=True):
+        # Stop accepting work; optionally wait for everything in flight to confirm
+        if wait:
+            while self.pending_count:
+                time.sleep(self.poll_interval)
+        self._closed.set()
+        self._queue.put(None)
+        self._sender.join()
+        self._confirmer.join()
+
+    def _allocate_nonce(self):
+        with self._nonce_lock:
+            if self._next_nonce is None:
+                self._next_nonce = self.w3.eth.get_transaction_count(self.account, 'pending')
+            nonce = self._next_nonce
+            self._next_nonce += 1
+            return nonce
+
+    def _resync_nonce(self):
+        # After a failed send the local counter may be ahead of the node
+        with self._nonce_lock:
+            self._next_nonce = None
+
+    def _send_loop(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            contract_function, transaction, future = item
+
+            # Bound the number of unconfirmed transactions
+            self._in_flight.acquire()
+            try:
+                transaction.update({'from': self.account, 'nonce': self._allocate_nonce()})
+                tx = contract_function.build_transaction(transaction)
+                tx_hash = self.w3.eth.send_transaction(tx)
+            except Exception as e:
+                self._resync_nonce()
+                self._in_flight.release()
+                with self._pending_lock:
+                    self._outstanding -= 1
+                future.set_exception(e)
+                continue
+
+            now = time.monotonic()
+            with self._pending_lock:
+                self._pending[tx['nonce']] = {
+                    'tx': tx,
+                    'hashes': [tx_hash],
+                    'first_sent': now,
+                    'last_sent': now,
+                    'replacements': 0,
+                    'future': future
+                }
+
+    def _confirm_loop(self):
+        last_block = None
+        while not self._closed.is_set():
+            time.sleep(self.poll_interval)
+            try:
+                # Receipts only change when a block is mined
+                block = self.w3.eth.block_number
+                if block != last_block:
+                    last_block = block
+                    self._collect_receipts()
+                self._replace_stuck()
+            except Exception as e:
+                # Keep confirming; a transient RPC error must not strand the futures
+                log.warning("Transaction confirmer error: %s", e)
+
+    def _collect_receipts(self):
+        with self._pending_lock:
+            pending = list(self._pending.items())
+
+        for nonce, state in pending:
+            receipt = None
+            # Any of the hashes sent for this nonce may be the one that got mined
+            for tx_hash in reversed(state['hashes']):
+                try:
+                    receipt = self.w3.eth.get_transaction_receipt(tx_hash)
+                    break
+                except TransactionNotFound:
+                    continue
+
+            if receipt is None:
+                continue
+            # Mined is not the same as succeeded: a reverted call changed nothing
+            if receipt.get('status', 1) == 0:
+                self._finish(nonce, state, error=TransactionReverted(receipt))
+            else:
+                self._finish(nonce, state, result=receipt)
+
+    def _replace_stuck(self):
+        now = time.monotonic()
+        with self._pending_lock:
+            pending = list(self._pending.items())
+
+        for nonce, state in pending:
+            if now - state['first_sent'] > self.timeout:
+                self._finish(nonce, state, error=TimeoutError(
+                    f"Transaction with nonce {nonce} not mined after {self.timeout:.0f}s"
+                ))
+            elif now - state['last_sent'] > self.stuck_after and state['replacements'] < self.max_replacements:
+                # Same nonce, higher fees: whichever copy is mined first wins
+                tx = self._bump_fees(state['tx'])
+                try:
+                    tx_hash = self.w3.eth.send_transaction(tx)
+                except Exception as e:
+                    # Usually "nonce too low": an earlier copy was just mined
+                    log.warning("Replacing transaction with nonce %d failed: %s", nonce, e)
+                    state['last_sent'] = now
+                    continue
+                state['tx'] = tx
+                state['hashes'].append(tx_hash)
+                state['last_sent'] = now
+                state['replacements'] += 1
+
+    def _bump_fees(self, tx):
+        tx = dict(tx)
+        for field in ('gasPrice', 'maxFeePerGas', 'maxPriorityFeePerGas'):
+            if field in tx:
+                tx[field] = int(tx[field] * self.fee_bump) + 1
+        return tx
+
+    def _finish(self, nonce, state, result=None, error=None):
+        with self._pending_lock:
+            if self._pending.pop(nonce, None) is None:
+                return
+            self._outstanding -= 1
+        self._in_flight.release()
+        if error is not None:
+            state['future'].set_exception(error)
+        else:
+            state['future'].set_result(result)
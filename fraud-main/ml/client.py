@@ -0,0 +1,84 @@
+import http.client
+import threading
+import datetime
+import socket
+import json
+from urllib.parse import urlparse
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTPConnection over a Unix domain socket"""
+
+    def __init__(self, path, timeout=None):
+        super().__init__('localhost', timeout=timeout)
+        self.path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if self.timeout is not None:
+            self.sock.settimeout(self.timeout)
+        self.sock.connect(self.path)
+
+class PredictionClient:
+    """Client for ml/server.py; keeps one keep-alive connection per thread, so a
+    prediction costs one round trip plus inference"""
+
+    def __init__(self, url='http://127.0.0.1:8600', timeout=10.0):
+        # url is http://host:port or unix:///path/to/socket
+        self.url = urlparse(url)
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def predict(self, transaction):
+        # Score one transaction dict (sender, receiver, amount, timestamp)
+        return self._post('/predict', self._encode(transaction))
+
+    def predict_many(self, transactions):
+        # Score a list of transactions in one request; results keep their order
+        return self._post('/predict', [self._encode(tx) for tx in transactions])
+
+    def health(self):
+        return self._request('GET', '/health')
+
+    def close(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    def _encode(self, transaction):
+        transaction = dict(transaction)
+        if isinstance(transaction.get('timestamp'), datetime.datetime):
+            transaction['timestamp'] = transaction['timestamp'].isoformat()
+        return transaction
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            if self.url.scheme == 'unix':
+                connection = UnixHTTPConnection(self.url.path, timeout=self.timeout)
+            else:
+                connection = http.client.HTTPConnection(self.url.hostname, self.url.port or 80, timeout=self.timeout)
+            self._local.connection = connection
+        return connection
+
+    def _post(self, path, payload):
+        return self._request('POST', path, json.dumps(payload).encode())
+
+    def _request(self, method, path, body=None):
+        headers = {'Content-Type': 'application/json'} if body is not None else {}
+        for attempt in range(2):
+            connection = self._connection()
+            try:
+                connection.request(method, path, body=body, headers=headers)
+                response = connection.getresponse()
+                payload = json.loads(response.read())
+                break
+            except (ConnectionError, http.client.HTTPException):
+                # The server may have dropped an idle keep-alive connection; retry once
+                self.close()
+                if attempt:
+                    raise
+
+        if response.status != 200:
+            raise RuntimeError(f"Prediction server returned {response.status}: {payload.get('error')}")
+        return payload
@@ -0,0 +1,200 @@
+from sklearn.model_selection import train_test_split
+import numpy as np
+import argparse
+import csv
+import sys
+
+try:
+    from ml.model import FraudDetectionModel
+    from ml.feature_cache import FeatureCache
+    from ml.evaluation import classification_metrics, roc_auc
+    from ml.sweep import measure_serving, latency_transactions
+except ImportError:
+    # Imported as a top-level module by the scripts in ml/
+    from model import FraudDetectionModel
+    from feature_cache import FeatureCache
+    from evaluation import classification_metrics, roc_auc
+    from sweep import measure_serving, latency_transactions
+
+# Fractions of the forest's trees tried as compacted sizes
+TREE_FRACTIONS = (0.05, 0.1, 0.2, 0.3, 0.5)
+
+# Most selection rows the greedy search scores; its cost is trees^2 x rows,
+# so larger holdouts are sampled down (stratified) to this many
+SELECTION_ROWS = 20_000
+
+# Score bins of the candidates' AUC in greedy_tree_order: one counting pass
+# per candidate instead of a sort, within about 1e-3 of the exact AUC
+AUC_BINS = 4096
+
+# Candidates scored at once, bounding the (candidates, rows) work arrays
+CANDIDATE_BLOCK = 64
+
+def _auc_rows(scores, labels, bins=AUC_BINS):
+    # Approximate ROC AUC of every row of scores (all in [0, 1]) at once from
+    # per-bin class counts; pairs sharing a bin count as ties
+    candidates = len(scores)
+    binned = np.minimum((scores * bins).astype(np.int64), bins - 1)
+    binned += (np.arange(candidates) * bins)[:, None]
+    positives = np.bincount(binned[:, labels].ravel(), minlength=candidates * bins).reshape(candidates, bins)
+    negatives = np.bincount(binned[:, ~labels].ravel(), minlength=candidates * bins).reshape(candidates, bins)
+    below = np.cumsum(negatives, axis=1) - negatives
+    pairs = (positives * (below + negatives / 2)).sum(axis=1)
+    return pairs / (labels.sum() * (~labels).sum())
+
+def greedy_tree_order(tree_proba, labels, count):
+    # Forward selection: repeatedly add the tree that most raises the AUC of
+    # the trees' mean, so trees that repeat what is already chosen come last.
+    # tree_proba is (trees, rows); returns count tree indices in order chosen.
+    # The chosen trees' sum is kept as it grows, so each step only scores
+    # the candidates against it.
+    labels = np.asarray(labels, dtype=bool)
+    total = np.zeros(tree_proba.shape[1])
+    remaining = np.arange(len(tree_proba))
+    order = []
+    for step in range(count):
+        auc = np.concatenate([
+            _auc_rows((total + tree_proba[remaining[start:start + CANDIDATE_BLOCK]]) / (step + 1), labels)
+            for start in range(0, len(remaining), CANDIDATE_BLOCK)
+        ])
+        best = int(np.argmax(auc))
+        order.append(int(remaining[best]))
+        total += tree_proba[remaining[best]]
+        remaining = np.delete(remaining, best)
+    return order
+
+def holdout_halves(model, data_path, cache=None):
+    # train()'s holdout rows, scaled with the model's own scaler and split in
+    # two: one half chooses the trees, the other reports on the result
+    featurizer = FraudDetectionModel()
+    featurizer.features = list(model.features)
+    X, y = featurizer.feature_matrix(data_path, cache)
+    X = model.scaler.transform(X)
+    _, X_test, _, y_test = train_test_split(X, y.to_numpy(), test_size=0.2, random_state=42, stratify=y)
+    X_select, X_report, y_select, y_report = train_test_split(
+        X_test, y_test, test_size=0.5, random_state=42, stratify=y_test
+    )
+    return X_select, y_select.astype(bool), X_report, y_report.astype(bool)
+
+def compaction_candidates(engine, X_select, y_select, depths, max_trees=None):
+    # (forest, trees, depth) for each depth in depths: every tree cut to that
+    # depth, then subsets of TREE_FRACTIONS of the trees (and max_trees),
+    # picked greedily on the selection half
+    counts = {max(1, round(engine.n_trees * fraction)) for fraction in TREE_FRACTIONS}
+    if max_trees is not None:
+        counts = {count for count in counts if count < max_trees} | {min(max_trees, engine.n_trees)}
+    counts = sorted(counts)
+
+    if len(y_select) > SELECTION_ROWS:
+        X_select, _, y_select, _ = train_test_split(
+            X_select, y_select, train_size=SELECTION_ROWS, random_state=42, stratify=y_select
+        )
+
+    candidates = []
+    for depth in depths:
+        cut = engine.compact(max_depth=depth)
+        if cut.max_depth < engine.max_depth and (max_trees is None or engine.n_trees <= max_trees):
+            candidates.append((cut, engine.n_trees, cut.max_depth))
+        tree_proba = cut.value[cut.apply(X_select)].T
+        order = greedy_tree_order(tree_proba, y_select, max(counts))
+        for count in counts:
+            candidates.append((cut.compact(order[:count]), count, cut.max_depth))
+    return candidates
+
+def compact_model(model, data_path, max_trees=None, latency_budget_ms=None, depths=None,
+                  auc_tolerance=0.01, recall_tolerance=0.02, threshold=0.4, cache=None):
+    """Rows of the compaction report, the full forest first; each row says
+    whether it keeps ROC AUC and recall within tolerance and fits the budget"""
+    engine = model.engine
+    depths = sorted({min(depth, engine.max_depth) for depth in (depths or [engine.max_depth, 12, 10, 8, 6])},
+                    reverse=True)
+    X_select, y_select, X_report, y_report = holdout_halves(model, data_path, cache)
+    transactions = latency_transactions(data_path, 1000)
+
+    rows = []
+    candidates = [(engine, engine.n_trees, engine.max_depth)]
+    candidates += compaction_candidates(engine, X_select, y_select, depths, max_trees)
+    for forest, trees, depth in candidates:
+        fraud_proba = forest.predict_fraud_proba(X_report)
+        row = {
+            'trees': trees, 'max_depth': depth,
+            'auc': roc_auc(y_report, fraud_proba),
+            'recall': float(classification_metrics(y_report, fraud_proba, [threshold])['recall'][0])
+        }
+        row.update(measure_serving(forest, model.scaler, transactions, batch_size=1000, batch_repeat=5))
+        rows.append((forest, row))
+
+    baseline = rows[0][1]
+    for _, row in rows:
+        row['auc_change'] = (row['auc'] or 0.0) - (baseline['auc'] or 0.0)
+        row['recall_change'] = row['recall'] - baseline['recall']
+        row['ms_saved_per_tx'] = baseline['single_p50_ms'] - row['single_p50_ms']
+        row['within_tolerance'] = row['auc_change'] >= -auc_tolerance and row['recall_change'] >= -recall_tolerance
+        row['within_budget'] = (max_trees is None or row['trees'] <= max_trees) and \
+            (latency_budget_ms is None or row['single_p50_ms'] <= latency_budget_ms)
+    return rows
+
+def print_report(rows, chosen):
+    print(f"\n{'':1} {'trees':>5} {'depth':>5} | {'AUC':>6} {'change':>7} | {'recall':>6} {'change':>7} | "
+          f"{'size MB':>7} | {'1-row p50':>9} | {'saved/tx':>8} | {'batch p50':>9}")
+    print("-" * 96)
+    for i, (_, r) in enumerate(rows):
+        mark = '>' if i == chosen else ('' if r['within_tolerance'] and r['within_budget'] else 'x')
+        auc = f"{r['auc']:.4f}" if r['auc'] is not None else 'n/a'
+        print(f"{mark:1} {r['trees']:>5} {r['max_depth']:>5} | {auc:>6} {r['auc_change']:>+7.4f} | "
+              f"{r['recall']:>6.4f} {r['recall_change']:>+7.4f} | {r['size_mb']:>7.2f} | "
+              f"{r['single_p50_ms']:>7.3f}ms | {r['ms_saved_per_tx']:>6.3f}ms | {r['batch_p50_ms']:>7.1f}ms")
+    print("> written   x outside tolerance or budget   (first row: the full forest)")
+
+def write_report(rows, path):
+    fields = ['trees', 'max_depth', 'auc', 'auc_change', 'recall', 'recall_change', 'size_mb',
+              'single_p50_ms', 'single_p99_ms', 'ms_saved_per_tx', 'batch_p50_ms', 'within_tolerance', 'within_budget']
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fields, extrasaction='ignore')
+        writer.writeheader()
+        for _, row in rows:
+            writer.writerow(row)
+
+def main():
+    parser = argparse.ArgumentParser(description="Compact a trained forest to a tree-count or latency budget")
+    parser.add_argument('--model', default='ml/saved_models/fraud_model.pkl', help='Trained model (pickle or artifact)')
+    parser.add_argument('--data', default='data/sample_transactions.csv',
+                        help='Labelled data the model was trained on; its holdout rows measure accuracy')
+    parser.add_argument('--max-trees', type=int, help='Most trees the compacted forest may keep')
+    parser.add_argument('--latency-budget-ms', type=float, help='Highest p50 predict_realtime latency allowed')
+    parser.add_argument('--depths', type=int, nargs='+', help='Depth limits to try (default: current, 12, 10, 8, 6)')
+    parser.add_argument('--auc-tolerance', type=float, default=0.01, help='Largest ROC AUC drop accepted')
+    parser.add_argument('--recall-tolerance', type=float, default=0.02, help='Largest recall drop accepted')
+    parser.add_argument('--threshold', type=float, default=0.4, help='Flag threshold recall is measured at')
+    parser.add_argument('--output', default='ml/saved_models/fraud_model_compact', help='Artifact directory written')
+    parser.add_argument('--report', help='CSV report path (default: <output>_report.csv)')
+    parser.add_argument('--no-cache', action='store_true', help='Recompute features instead of using the feature cache')
+    args = parser.parse_args()
+
+    model = FraudDetectionModel()
+    model.load_model(args.model)
+    cache = None if args.no_cache else FeatureCache()
+    rows = compact_model(model, args.data, args.max_trees, args.latency_budget_ms, args.depths,
+                         args.auc_tolerance, args.recall_tolerance, args.threshold, cache)
+
+    # The fastest forest meeting the tolerance and budget
+    eligible = [i for i, (_, row) in enumerate(rows) if row['within_tolerance'] and row['within_budget']]
+    chosen = min(eligible, key=lambda i: (rows[i][1]['single_p50_ms'], rows[i][1]['size_mb'])) if eligible else None
+    print_report(rows, chosen)
+    report_path = args.report or args.output.rstrip('/') + '_report.csv'
+    write_report(rows, report_path)
+    print(f"Report written to {report_path}")
+
+    if chosen is None:
+        print("❌ No compacted forest stays within tolerance and budget; nothing written")
+        sys.exit(1)
+
+    forest, row = rows[chosen]
+    model.set_forest(forest)
+    model.save_artifact(args.output)
+    print(f"✅ Wrote {row['trees']} trees of depth {row['max_depth']} to {args.output} "
+          f"(AUC {row['auc_change']:+.4f}, recall {row['recall_change']:+.4f}, "
+          f"{row['ms_saved_per_tx']:.3f} ms saved per transaction)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+import pandas as pd
+import numpy as np
+import argparse
+import json
+import os
+
+# Version of the directory layout written by TransactionDataset.save()
+DATASET_VERSION = 1
+
+_EPOCH = pd.Timestamp(1970, 1, 1)
+
+class TransactionDataset:
+    """Transactions stored column by column as .npy files: int64 epoch seconds,
+    float64 amounts, int32 ids into one address dictionary, the dictionary's
+    precomputed address hashes and optional int8 labels. Loading maps the
+    files instead of parsing text, so there is no timestamp parsing or
+    address hashing left to do."""
+
+    COLUMNS = ('timestamp', 'amount', 'sender', 'receiver', 'is_fraud')
+
+    def __init__(self, timestamp, amount, sender, receiver, addresses, address_hash, is_fraud=None):
+        # timestamp: epoch seconds, naive CSV times read as UTC like preprocess() does
+        self.timestamp = timestamp
+        self.amount = amount
+        self.sender = sender
+        self.receiver = receiver
+        self.addresses = addresses
+        self.address_hash = address_hash
+        self.is_fraud = is_fraud
+        self._address_objects = None
+
+    def __len__(self):
+        return len(self.timestamp)
+
+    @classmethod
+    def load(cls, path, mmap_mode='r'):
+        with open(os.path.join(path, 'metadata.json'), 'r') as f:
+            metadata = json.load(f)
+        if metadata['version'] != DATASET_VERSION:
+            raise ValueError(f"{path} has dataset version {metadata['version']}, expected {DATASET_VERSION}")
+
+        def column(name):
+            return np.load(os.path.join(path, f'{name}.npy'), mmap_mode=mmap_mode)
+
+        return cls(
+            column('timestamp'), column('amount'), column('sender'), column('receiver'),
+            column('addresses'), column('address_hash'),
+            column('is_fraud') if metadata['labelled'] else None
+        )
+
+    def save(self, path):
+        os.makedirs(path, exist_ok=True)
+        columns = {
+            'timestamp': self.timestamp, 'amount': self.amount,
+            'sender': self.sender, 'receiver': self.receiver,
+            'addresses': self.addresses, 'address_hash': self.address_hash
+        }
+        if self.is_fraud is not None:
+            columns['is_fraud'] = self.is_fraud
+        for name, values in columns.items():
+            np.save(os.path.join(path, f'{name}.npy'), values)
+
+        # Written last, so a directory with metadata.json is complete
+        with open(os.path.join(path, 'metadata.json'), 'w') as f:
+            json.dump({
+                'version': DATASET_VERSION,
+                'rows': len(self),
+                'addresses': len(self.addresses),
+                'labelled': self.is_fraud is not None
+            }, f, indent=2)
+
+    def slice(self, start, stop):
+        # Rows start..stop as views sharing this dataset's address dictionary
+        dataset = TransactionDataset(
+            self.timestamp[start:stop], self.amount[start:stop],
+            self.sender[start:stop], self.receiver[start:stop],
+            self.addresses, self.address_hash,
+            self.is_fraud[start:stop] if self.is_fraud is not None else None
+        )
+        dataset._address_objects = self._address_objects
+        return dataset
+
+    def address_objects(self):
+        # The dictionary as Python strings, the keys the profile stores use
+        if self._address_objects is None:
+            self._address_objects = np.array(self.addresses.tolist(), dtype=object)
+        return self._address_objects
+
+    def to_frame(self):
+        # The CSV's columns, for code that wants a DataFrame
+        addresses = self.address_objects()
+        df = pd.DataFrame({
+            'sender': addresses[self.sender],
+            'receiver': addresses[self.receiver],
+            'amount': np.asarray(self.amount),
+            'timestamp': _EPOCH + pd.to_timedelta(np.asarray(self.timestamp), unit='s')
+        })
+        if self.is_fraud is not None:
+            df['is_fraud'] = np.asarray(self.is_fraud)
+        return df
+
+class DatasetWriter:
+    """Writes a dataset of a known row count chunk by chunk: each row column is
+    a .npy header for all rows followed by the chunks appended in row order,
+    so memory stays at one chunk"""
+
+    def __init__(self, path, rows, addresses, labelled=True):
+        # addresses: the full address dictionary the chunks' ids index into
+        self.path = path
+        self.rows = rows
+        self.written = 0
+        self.labelled = labelled
+        # Lowercased, as FraudDetectionModel matches addresses
+        self.addresses = np.char.lower(np.asarray(addresses).astype(str))
+        os.makedirs(path, exist_ok=True)
+        self.dtypes = {'timestamp': np.int64, 'amount': np.float64, 'sender': np.int32, 'receiver': np.int32}
+        if labelled:
+            self.dtypes['is_fraud'] = np.int8
+        self.files = {}
+        for name, dtype in self.dtypes.items():
+            self.files[name] = open(os.path.join(path, f'{name}.npy'), 'wb')
+            np.lib.format.write_array_header_1_0(self.files[name], {
+                'descr': np.lib.format.dtype_to_descr(np.dtype(dtype)), 'fortran_order': False, 'shape': (rows,)
+            })
+
+    def write(self, chunk):
+        # chunk: a dict of row columns, the rows after those already written
+        for name, dtype in self.dtypes.items():
+            self.files[name].write(np.ascontiguousarray(chunk[name], dtype=dtype).tobytes())
+        self.written += len(chunk['timestamp'])
+
+    def close(self):
+        for f in self.files.values():
+            f.close()
+        self.files = {}
+        if self.written != self.rows:
+            raise ValueError(f"{self.path}: wrote {self.written} rows, expected {self.rows}")
+        addresses = self.addresses.astype(object)
+        np.save(os.path.join(self.path, 'addresses.npy'), self.addresses)
+        # Same value preprocess() computes per row from the address string
+        np.save(os.path.join(self.path, 'address_hash.npy'), (pd.util.hash_array(addresses) % 10_000_000).astype(np.int64))
+
+        # Written last, so a directory with metadata.json is complete
+        with open(os.path.join(self.path, 'metadata.json'), 'w') as f:
+            json.dump({
+                'version': DATASET_VERSION,
+                'rows': self.rows,
+                'addresses': len(self.addresses),
+                'labelled': self.labelled
+            }, f, indent=2)
+
+def is_dataset(path):
+    return os.path.isfile(os.path.join(path, 'metadata.json')) and os.path.isfile(os.path.join(path, 'timestamp.npy'))
+
+def convert_csv(csv_path, output_path, chunk_rows=1_000_000):
+    # Convert a transactions CSV in chunks through a DatasetWriter, so memory
+    # is one chunk plus the address dictionary. A first pass over the address
+    # columns counts the rows and interns the addresses the writer needs
+    # up front; lowercased, as FraudDetectionModel matches addresses
+    address_ids = {}
+    rows = 0
+    for chunk in pd.read_csv(csv_path, usecols=['sender', 'receiver'], chunksize=chunk_rows):
+        rows += len(chunk)
+        for name in ('sender', 'receiver'):
+            for address in pd.unique(chunk[name].astype(str).str.lower()):
+                address_ids.setdefault(address, len(address_ids))
+
+    labelled = 'is_fraud' in pd.read_csv(csv_path, nrows=0).columns
+    writer = DatasetWriter(output_path, rows, np.array(list(address_ids), dtype=object), labelled=labelled)
+    for chunk in pd.read_csv(csv_path, chunksize=chunk_rows):
+        timestamps = pd.to_datetime(chunk['timestamp'])
+        if timestamps.dt.tz is not None:
+            timestamps = timestamps.dt.tz_convert('UTC').dt.tz_localize(None)
+        columns = {
+            'timestamp': (timestamps - _EPOCH).dt.total_seconds().to_numpy().astype(np.int64),
+            'amount': chunk['amount'].to_numpy(dtype=np.float64)
+        }
+        for name in ('sender', 'receiver'):
+            # Factorize the chunk, then map its distinct addresses to global ids
+            codes, uniques = pd.factorize(chunk[name].astype(str).str.lower())
+            ids = np.array([address_ids[address] for address in uniques], dtype=np.int32)
+            columns[name] = ids[codes]
+        if labelled:
+            columns['is_fraud'] = chunk['is_fraud'].to_numpy(dtype=np.int8)
+        writer.write(columns)
+    writer.close()
+
+    return TransactionDataset.load(output_path)
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert a transactions CSV to the columnar .npy dataset format")
+    parser.add_argument('csv_path', nargs='?', default='data/sample_transactions.csv', help='Transactions CSV')
+    parser.add_argument('--output', help='Dataset directory (default: the CSV path without .csv)')
+    parser.add_argument('--chunk-rows', type=int, default=1_000_000, help='CSV rows converted at a time')
+    args = parser.parse_args()
+
+    output_path = args.output or os.path.splitext(args.csv_path)[0]
+    dataset = convert_csv(args.csv_path, output_path, args.chunk_rows)
+    print(f"Converted {len(dataset)} transactions ({len(dataset.addresses)} addresses) to {output_path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+import numpy as np
+from sklearn.metrics import roc_auc_score
+
+# Thresholds reported by the sweep unless others are given
+SWEEP_THRESHOLDS = np.round(np.arange(0.1, 1.0, 0.1), 2)
+
+def confusion_counts(labels, fraud_proba, thresholds):
+    # Confusion matrix at every threshold in one broadcast comparison;
+    # returns arrays (tp, fp, tn, fn), one entry per threshold
+    labels = np.asarray(labels, dtype=bool)
+    predicted = np.asarray(fraud_proba)[None, :] > np.asarray(thresholds, dtype=np.float64)[:, None]
+
+    tp = (predicted & labels).sum(axis=1)
+    fp = (predicted & ~labels).sum(axis=1)
+    fn = labels.sum() - tp
+    tn = (~labels).sum() - fp
+    return tp, fp, tn, fn
+
+def classification_metrics(labels, fraud_proba, thresholds):
+    # Precision, recall, F1 and accuracy per threshold; 0 where undefined
+    tp, fp, tn, fn = confusion_counts(labels, fraud_proba, thresholds)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        precision = np.where(tp + fp > 0, tp / (tp + fp), 0.0)
+        recall = np.where(tp + fn > 0, tp / (tp + fn), 0.0)
+        f1 = np.where(precision + recall > 0, 2 * precision * recall / (precision + recall), 0.0)
+    accuracy = (tp + tn) / len(labels)
+
+    return {
+        'threshold': np.asarray(thresholds, dtype=np.float64),
+        'tp': tp, 'fp': fp, 'tn': tn, 'fn': fn,
+        'precision': precision, 'recall': recall, 'f1': f1, 'accuracy': accuracy
+    }
+
+def roc_auc(labels, fraud_proba):
+    # None when only one class is present and the AUC is undefined
+    labels = np.asarray(labels, dtype=bool)
+    if labels.all() or not labels.any():
+        return None
+    return float(roc_auc_score(labels, fraud_proba))
@@ -0,0 +1,21 @@
+from model import FraudDetectionModel
+import argparse
+import os
+
+def export_artifact(model_path, artifact_dir):
+    # Convert a pickled model into the memory-mappable artifact directory
+    model = FraudDetectionModel()
+    model.load_model(model_path)
+    model.save_artifact(artifact_dir)
+    return model
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert a saved model pickle into a memory-mappable artifact directory")
+    parser.add_argument('model_path', nargs='?', default='ml/saved_models/fraud_model.pkl', help='Saved FraudDetectionModel pickle')
+    parser.add_argument('--output', help='Artifact directory (default: the model path without .pkl)')
+    args = parser.parse_args()
+    
+    artifact_dir = args.output or os.path.splitext(args.model_path)[0]
+    model = export_artifact(args.model_path, artifact_dir)
+    
+    print(f"Exported {model.engine.n_trees} trees and {len(model.features)} features to {artifact_dir}")
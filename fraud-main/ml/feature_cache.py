@@ -0,0 +1,127 @@
+import numpy as np
+import hashlib
+import shutil
+import json
+import time
+import os
+
+# Outside the source tree, so cached matrices never end up in the repository
+DEFAULT_CACHE_DIR = os.path.join(
+    os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'), 'fraud-detection', 'features'
+)
+
+class FeatureCache:
+    """Unscaled feature matrices and labels computed from transaction files,
+    stored under a key made of the file contents' SHA-256, the feature list, the
+    model's FEATURE_VERSION and its history settings (profile store and graph
+    sizes, which change the features once they fill up). Each entry also holds the profile stores as they
+    were after the file was streamed through them, so a hit restores exactly the
+    state featurization would have left. Least recently used entries are
+    evicted once the cache grows past max_bytes."""
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=4 * 1024**3):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def key(data_path, features, feature_version, settings=None):
+        digest = hashlib.sha256()
+        digest.update(json.dumps({'features': features, 'version': feature_version, 'settings': settings},
+                                 sort_keys=True).encode())
+
+        # A dataset directory is hashed file by file, in name order
+        if os.path.isdir(data_path):
+            paths = [os.path.join(data_path, name) for name in sorted(os.listdir(data_path))]
+        else:
+            paths = [data_path]
+        for path in paths:
+            digest.update(os.path.basename(path).encode())
+            with open(path, 'rb') as f:
+                for block in iter(lambda: f.read(1024 * 1024), b''):
+                    digest.update(block)
+        return digest.hexdigest()
+
+    def get(self, key):
+        # {'X', 'y', 'profiles_path'} with X and y memory-mapped, or None
+        path = os.path.join(self.directory, key)
+        if not os.path.isfile(os.path.join(path, 'metadata.json')):
+            return None
+        with open(os.path.join(path, 'metadata.json'), 'r') as f:
+            metadata = json.load(f)
+
+        # The entry's modification time is its last use, for eviction
+        os.utime(path)
+        rows, n_features = metadata['rows'], len(metadata['features'])
+        return {
+            'X': np.memmap(os.path.join(path, 'X.bin'), dtype=np.float64, mode='r', shape=(rows, n_features)),
+            'y': np.memmap(os.path.join(path, 'y.bin'), dtype=np.int8, mode='r', shape=(rows,)),
+            'profiles_path': os.path.join(path, 'profiles.npz')
+        }
+
+    def create(self, key, features):
+        # Writer for a new entry; rows are appended a chunk at a time
+        return FeatureCacheWriter(self, key, features)
+
+    def put(self, key, X, y, model):
+        writer = self.create(key, list(X.columns))
+        writer.append(X, y)
+        writer.commit(model)
+
+    def evict(self, keep=None):
+        # Remove least recently used entries (other than keep) until the cache fits
+        entries = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name.endswith('.tmp') or not os.path.isdir(path):
+                continue
+            size = sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+            entries.append((os.path.getmtime(path), name, size))
+
+        total = sum(size for _, _, size in entries)
+        for _, name, size in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if name == keep:
+                continue
+            shutil.rmtree(os.path.join(self.directory, name), ignore_errors=True)
+            total -= size
+            print(f"Evicted feature cache entry {name[:12]} ({size / 1024 / 1024:.1f} MB)")
+
+class FeatureCacheWriter:
+    """Builds one cache entry in a temporary directory that commit() renames
+    into place, so readers never see a partial entry"""
+
+    def __init__(self, cache, key, features):
+        self.cache = cache
+        self.key = key
+        self.features = features
+        self.rows = 0
+
+        # Left over if an earlier run for the same data was interrupted
+        self.temp_path = os.path.join(cache.directory, key + '.tmp')
+        shutil.rmtree(self.temp_path, ignore_errors=True)
+        os.makedirs(self.temp_path)
+        self.X_file = open(os.path.join(self.temp_path, 'X.bin'), 'wb')
+        self.y_file = open(os.path.join(self.temp_path, 'y.bin'), 'wb')
+
+    def append(self, X, y):
+        self.X_file.write(np.ascontiguousarray(X, dtype=np.float64).tobytes())
+        self.y_file.write(np.ascontiguousarray(y, dtype=np.int8).tobytes())
+        self.rows += len(y)
+
+    def commit(self, model):
+        # model's profile stores must be in their end-of-file state
+        self.X_file.close()
+        self.y_file.close()
+        model.save_profiles(os.path.join(self.temp_path, 'profiles.npz'))
+        with open(os.path.join(self.temp_path, 'metadata.json'), 'w') as f:
+            json.dump({
+                'rows': self.rows,
+                'features': self.features,
+                'created_at': time.strftime('%Y-%m-%dT%H:%M:%S')
+            }, f, indent=2)
+
+        path = os.path.join(self.cache.directory, self.key)
+        shutil.rmtree(path, ignore_errors=True)
+        os.replace(self.temp_path, path)
+        self.cache.evict(keep=self.key)
@@ -0,0 +1,239 @@
+import numpy as np
+import argparse
+import pickle
+import os
+
+class CompiledForest:
+    """A random forest flattened into contiguous NumPy node arrays, scored by
+    walking every tree at once instead of dispatching per estimator"""
+
+    # Rows traversed together; bounds the (trees x rows) index working set
+    CHUNK_ROWS = 256
+    
+    # Node arrays, stored one .npy file each by save_arrays()
+    ARRAYS = ('feature', 'threshold', 'children', 'value', 'roots')
+
+    def __init__(self, feature, threshold, children, value, roots, max_depth, dtype=np.float64):
+        # feature[n], threshold[n]: split of node n (leaves: feature 0, threshold +inf)
+        # children[2n], children[2n + 1]: left and right child; leaves point to themselves
+        # value[n]: fraud probability at node n
+        # roots[t]: index of the root node of tree t
+        self.dtype = np.dtype(dtype)
+        self.feature = np.ascontiguousarray(feature, dtype=np.int32)
+        self.threshold = np.ascontiguousarray(threshold, dtype=self.dtype)
+        self.children = np.ascontiguousarray(children, dtype=np.int32)
+        self.value = np.ascontiguousarray(value, dtype=self.dtype)
+        self.roots = np.ascontiguousarray(roots, dtype=np.int32)
+        self.max_depth = int(max_depth)
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @property
+    def n_nodes(self):
+        return len(self.feature)
+
+    @classmethod
+    def from_sklearn(cls, forest, dtype=np.float64):
+        # Flatten all estimators of a fitted RandomForestClassifier
+        fraud_class = list(forest.classes_).index(1)
+        features, thresholds, children, values, roots = [], [], [], [], []
+        offset = 0
+        max_depth = 0
+
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            n = tree.node_count
+            nodes = np.arange(n)
+            is_leaf = tree.children_left == -1
+
+            left = np.where(is_leaf, nodes, tree.children_left) + offset
+            right = np.where(is_leaf, nodes, tree.children_right) + offset
+            value = tree.value[:, 0, :]
+
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(np.where(is_leaf, np.inf, tree.threshold))
+            children.append(np.column_stack([left, right]).ravel())
+            values.append(value[:, fraud_class] / value.sum(axis=1))
+            roots.append(offset)
+
+            offset += n
+            max_depth = max(max_depth, tree.max_depth)
+
+        return cls(
+            np.concatenate(features), np.concatenate(thresholds), np.concatenate(children),
+            np.concatenate(values), np.array(roots), max_depth, dtype=dtype
+        )
+
+    def astype(self, dtype):
+        # Same forest with thresholds and leaf values stored as dtype
+        return CompiledForest(
+            self.feature, self.threshold, self.children, self.value,
+            self.roots, self.max_depth, dtype=dtype
+        )
+
+    def compact(self, trees=None, max_depth=None):
+        # Forest of the given trees (distinct indices, kept in that order), each
+        # cut off at max_depth: nodes at that depth become leaves predicting
+        # their own fraud probability. Nodes no longer reachable are dropped.
+        trees = np.arange(self.n_trees) if trees is None else np.asarray(trees, dtype=np.int64)
+        if len(np.unique(trees)) != len(trees):
+            raise ValueError("compact() needs distinct tree indices")
+        max_depth = self.max_depth if max_depth is None else min(max_depth, self.max_depth)
+        left, right = self.children[0::2], self.children[1::2]
+
+        # Breadth-first from the roots a level at a time, noting each node's tree
+        levels, owners = [self.roots[trees]], [np.arange(len(trees))]
+        while len(levels) <= max_depth:
+            split = left[levels[-1]] != levels[-1]
+            if not split.any():
+                break
+            levels.append(np.column_stack([left[levels[-1][split]], right[levels[-1][split]]]).ravel())
+            owners.append(np.repeat(owners[-1][split], 2))
+        depth = len(levels) - 1
+
+        # Each tree's nodes together, breadth-first within it, as tree_lists() expects
+        owners = np.concatenate(owners)
+        order = np.argsort(owners, kind='stable')
+        nodes, owners = np.concatenate(levels)[order], owners[order]
+        new_id = np.full(self.n_nodes, -1, dtype=np.int64)
+        new_id[nodes] = np.arange(len(nodes))
+
+        # Leaves already point to themselves; nodes whose children were cut
+        # off become leaves the same way
+        own = np.arange(len(nodes))
+        new_left, new_right = new_id[left[nodes]], new_id[right[nodes]]
+        cut = new_left < 0
+        new_left = np.where(cut, own, new_left)
+        new_right = np.where(cut, own, new_right)
+
+        return CompiledForest(
+            np.where(cut, 0, self.feature[nodes]),
+            np.where(cut, np.inf, self.threshold[nodes]),
+            np.column_stack([new_left, new_right]).ravel(),
+            self.value[nodes],
+            np.searchsorted(owners, np.arange(len(trees))),
+            depth, dtype=self.dtype
+        )
+
+    def apply(self, X):
+        # Leaf index reached in every tree, shape (rows, trees)
+        X = self._check_input(X)
+        leaves = np.empty((len(X), self.n_trees), dtype=np.int32)
+        for start in range(0, len(X), self.CHUNK_ROWS):
+            leaves[start:start + self.CHUNK_ROWS] = self._traverse(X[start:start + self.CHUNK_ROWS]).T
+        return leaves
+
+    def predict_fraud_proba(self, X):
+        # Mean leaf probability across trees, summed in tree order like sklearn
+        X = self._check_input(X)
+        fraud_proba = np.empty(len(X), dtype=np.float64)
+
+        for start in range(0, len(X), self.CHUNK_ROWS):
+            leaf_values = self.value[self._traverse(X[start:start + self.CHUNK_ROWS])]
+            total = np.zeros(leaf_values.shape[1], dtype=self.dtype)
+            for tree_values in leaf_values:
+                total += tree_values
+            fraud_proba[start:start + self.CHUNK_ROWS] = total / self.n_trees
+
+        return fraud_proba
+
+    def predict_proba(self, X):
+        # Drop-in for RandomForestClassifier.predict_proba on binary labels
+        fraud_proba = self.predict_fraud_proba(X)
+        return np.column_stack([1.0 - fraud_proba, fraud_proba])
+
+    def tree_lists(self):
+        # Per-tree plain lists (feature, threshold, left, right, value) with
+        # tree-local node ids and left = -1 at leaves, as in sklearn's trees;
+        # the fastest layout for walking one row at a time from Python
+        ends = np.append(self.roots[1:], self.n_nodes)
+        trees = []
+        for root, end in zip(self.roots.tolist(), ends.tolist()):
+            nodes = np.arange(end - root)
+            left = self.children[2 * root:2 * end:2] - root
+            right = self.children[2 * root + 1:2 * end:2] - root
+            trees.append((
+                self.feature[root:end].tolist(),
+                self.threshold[root:end].tolist(),
+                np.where(left == nodes, -1, left).tolist(),
+                right.tolist(),
+                self.value[root:end].tolist()
+            ))
+        return trees
+
+    def save(self, path):
+        np.savez(
+            path, feature=self.feature, threshold=self.threshold, children=self.children,
+            value=self.value, roots=self.roots, max_depth=np.array(self.max_depth)
+        )
+
+    @classmethod
+    def load(cls, path, dtype=None):
+        with np.load(path) as arrays:
+            return cls(
+                arrays['feature'], arrays['threshold'], arrays['children'], arrays['value'],
+                arrays['roots'], arrays['max_depth'], dtype=dtype or arrays['threshold'].dtype
+            )
+    
+    def save_arrays(self, directory):
+        # One plain .npy file per node array; unlike .npz these can be memory-mapped
+        os.makedirs(directory, exist_ok=True)
+        for name in self.ARRAYS:
+            np.save(os.path.join(directory, f'{name}.npy'), getattr(self, name))
+    
+    @classmethod
+    def load_arrays(cls, directory, max_depth, mmap_mode='r'):
+        # Map the node arrays read-only instead of reading them into private
+        # memory; processes loading the same files share the page cache
+        arrays = [np.load(os.path.join(directory, f'{name}.npy'), mmap_mode=mmap_mode) for name in cls.ARRAYS]
+        return cls(*arrays[:4], arrays[4], max_depth, dtype=arrays[1].dtype)
+
+    def _check_input(self, X):
+        # sklearn trees compare float32 inputs against their thresholds
+        return np.ascontiguousarray(X, dtype=np.float32)
+
+    def _traverse(self, X):
+        # Leaf index per (tree, row). Tree-major, so consecutive lookups stay
+        # inside one small tree instead of hopping across the whole forest.
+        rows, n_features = X.shape
+        flat_X = X.ravel()
+        if self.dtype != np.float32:
+            flat_X = flat_X.astype(self.dtype)
+
+        # Position of each row's first feature in flat_X
+        row_offsets = np.arange(rows, dtype=np.int32)[None, :] * n_features
+        nodes = np.repeat(self.roots[:, None], rows, axis=1)
+
+        # Leaves point to themselves, so every row can take max_depth steps
+        for _ in range(self.max_depth):
+            go_right = flat_X[row_offsets + self.feature[nodes]] > self.threshold[nodes]
+            nodes = self.children[2 * nodes + go_right]
+
+        return nodes
+
+def load_forest(model_path):
+    # Fitted forest from a saved FraudDetectionModel pickle, old or new layout
+    with open(model_path, 'rb') as f:
+        saved = pickle.load(f)
+    return saved[0]
+
+def main():
+    parser = argparse.ArgumentParser(description="Export a trained forest to contiguous node arrays")
+    parser.add_argument('model_path', nargs='?', default='ml/saved_models/fraud_model.pkl',
+                        help='Saved FraudDetectionModel pickle (fraud_model.pkl or enhanced_fraud_model.pkl)')
+    parser.add_argument('--output', help='Output .npz path (default: next to the model, *_forest.npz)')
+    parser.add_argument('--float32', action='store_true', help='Store thresholds and leaf values as float32')
+    args = parser.parse_args()
+
+    output = args.output or os.path.splitext(args.model_path)[0] + '_forest.npz'
+    forest = CompiledForest.from_sklearn(load_forest(args.model_path))
+    if args.float32:
+        forest = forest.astype(np.float32)
+    forest.save(output)
+
+    print(f"Exported {forest.n_trees} trees ({forest.n_nodes} nodes, max depth {forest.max_depth}) to {output}")
+
+if __name__ == "__main__":
+    main()
@@ -3,10 +3,114 @@ import numpy as np
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.preprocessing import StandardScaler
 from sklearn.model_selection import train_test_split
+from functools import lru_cache
+import datetime
 import pickle
+import json
+import math
 import os
 
+try:
+    from ml.profile_store import AddressProfileStore
+    from ml.transaction_graph import TransactionGraph
+    from ml.forest_engine import CompiledForest
+    from ml.reservoir import ReservoirSample, StratifiedReservoir
+    from ml.dataset import TransactionDataset, is_dataset
+except ImportError:
+    # Imported as a top-level module by the scripts in ml/
+    from profile_store import AddressProfileStore
+    from transaction_graph import TransactionGraph
+    from forest_engine import CompiledForest
+    from reservoir import ReservoirSample, StratifiedReservoir
+    from dataset import TransactionDataset, is_dataset
+
+# Feature list of models saved before the profile store features existed
+LEGACY_FEATURES = [
+    'amount', 'amount_log', 'is_high_amount', 
+    'hour', 'is_unusual_hour', 'day_of_week',
+    'sender_frequency', 'receiver_frequency',
+    'amount_hour_interaction',
+    'sender_hash', 'receiver_hash'
+]
+
+# Features read from the per-address profile stores
+PROFILE_FEATURES = [
+    'sender_frequency', 'receiver_frequency',
+    'sender_amount_zscore', 'sender_seconds_since_last'
+]
+
+# Features read from the sender -> receiver transaction graph
+GRAPH_FEATURES = [
+    'sender_fan_out', 'receiver_fan_in',
+    'sender_recent_receivers', 'receiver_recent_senders',
+    'cycle_length'
+]
+
+# Everything _observe_profiles() returns, in order
+HISTORY_FEATURES = PROFILE_FEATURES + GRAPH_FEATURES
+
+# Version of the directory layout written by save_artifact()
+ARTIFACT_VERSION = 1
+
+# Bump whenever feature engineering changes, so cached feature matrices
+# computed by the old definitions are no longer used
+FEATURE_VERSION = 3
+
+_EPOCH = datetime.datetime(1970, 1, 1)
+
+def normalize_addresses(df):
+    # Addresses are matched case-insensitively: CSVs hold lowercase hex while
+    # the chain returns EIP-55 checksummed addresses. Every path lowercases
+    # them here (realtime_features() per transaction) before they reach the
+    # profile stores, the graph or the address hashes.
+    for column in ('sender', 'receiver'):
+        df[column] = df[column].astype(str).str.lower()
+    return df
+
+@lru_cache(maxsize=100_000)
+def _address_hash(address):
+    # Same value preprocess() gives a (lowercased) address; cached because
+    # addresses repeat
+    return int(pd.util.hash_array(np.array([address], dtype=object))[0] % 10_000_000)
+
+def _to_datetime(timestamp):
+    # Real-time path timestamps: datetime, ISO string, or UNIX seconds (local time,
+    # as MLInterface converts chain timestamps)
+    if isinstance(timestamp, datetime.datetime):
+        return timestamp
+    if isinstance(timestamp, str):
+        return datetime.datetime.fromisoformat(timestamp)
+    return datetime.datetime.fromtimestamp(timestamp)
+
+def _epoch_seconds(timestamp):
+    # Naive datetimes are read as UTC, matching what preprocess() gets from pandas
+    if timestamp.tzinfo is not None:
+        return timestamp.timestamp()
+    return (timestamp - _EPOCH).total_seconds()
+
 class FraudDetectionModel:
+    # Batches up to this size are scored faster by the flattened engine than by
+    # sklearn's per-estimator dispatch; larger ones by sklearn's compiled loops
+    ENGINE_BATCH_LIMIT = 512
+    
+    # Approximate memory per row for train_streaming (measured): a CSV chunk
+    # row with its address strings and feature columns, and a sampled row
+    # with sklearn's float32 copy and its share of the grown trees
+    CHUNK_ROW_BYTES = 650
+    SAMPLE_ROW_BYTES = 300
+    
+    # Approximate memory of the address history (measured), which grows with
+    # the addresses seen rather than with the chunk: a graph edge with its
+    # dict entry, endpoint arrays and adjacency slots; a graph address with its
+    # string and node entry; a profile store slot with its string
+    GRAPH_EDGE_BYTES = 220
+    GRAPH_ADDRESS_BYTES = 200
+    PROFILE_SLOT_BYTES = 250
+    
+    # Forest settings train() and train_streaming() fit with; ml/train.py
+    # --sweep measures the accuracy and serving cost of alternatives
+    FOREST_PARAMS = {'n_estimators': 500, 'max_depth': 15, 'min_samples_split': 10, 'min_samples_leaf': 4}
+    
     def __init__(self):
         self.model = None
         self.scaler = StandardScaler()
@@ -14,26 +118,94 @@ class FraudDetectionModel:
             'amount', 'amount_log', 'is_high_amount', 
             'hour', 'is_unusual_hour', 'day_of_week',
             'sender_frequency', 'receiver_frequency',
+            'sender_amount_zscore', 'sender_seconds_since_last',
+            'sender_fan_out', 'receiver_fan_in',
+            'sender_recent_receivers', 'receiver_recent_senders',
+            'cycle_length',
             'amount_hour_interaction',
             'sender_hash', 'receiver_hash'
         ]
         
-    def preprocess(self, df, training=True):
+        # Per-address history, updated in O(1) per transaction by training and
+        # serving alike
+        self.sender_profiles = AddressProfileStore()
+        self.receiver_profiles = AddressProfileStore()
+        # Who paid whom, for the fan-in/fan-out and cycle features
+        self.graph = TransactionGraph()
+        
+        # Flattened forest and its per-tree lists for predict_realtime, built on first use
+        self._engine = None
+        self._realtime_trees = None
+        
+    def preprocess(self, df, training=True, profile_features=None):
+        # Training rebuilds the profile stores from scratch; scoring keeps
+        # adding to them
+        if training:
+            self.reset_history()
+        
         # Feature engineering
-        if 'timestamp' in df.columns:
-            df['hour'] = pd.to_datetime(df['timestamp']).dt.hour
-            df['day_of_week'] = pd.to_datetime(df['timestamp']).dt.dayofweek
+        X = self._feature_frame(df, profile_features)
+        y = df['is_fraud'] if 'is_fraud' in df.columns else None
+        
+        # Scale features
+        if training:
+            X_scaled = self.scaler.fit_transform(X)
         else:
-            df['hour'] = 0
-            df['day_of_week'] = 0
+            X_scaled = self.scaler.transform(X)
+        
+        return X_scaled, y
+    
+    def _feature_frame(self, df, profile_features=None):
+        # Unscaled self.features columns for the rows of df
+        normalize_addresses(df)
+        seconds = self._time_features(df)
         
-        # Calculate transaction frequency
-        sender_counts = df.groupby('sender').size().reset_index(name='sender_frequency')
-        receiver_counts = df.groupby('receiver').size().reset_index(name='receiver_frequency')
+        # Per-address history features, streamed through the profile stores in
+        # time order so each row sees only what came before it. Callers that
+        # already streamed the rows pass their profile_features.
+        if profile_features is None:
+            profile_features = self._stream_profiles(
+                df['sender'].to_numpy(), df['receiver'].to_numpy(),
+                df['amount'].to_numpy(dtype=np.float64), seconds
+            )
+        for feature, values in profile_features.items():
+            df[feature] = values
         
-        df = pd.merge(df, sender_counts, on='sender', how='left')
-        df = pd.merge(df, receiver_counts, on='receiver', how='left')
+        # Convert addresses to numerical features (hash)
+        df['sender_hash'] = pd.util.hash_array(df['sender'].values) % 10_000_000
+        df['receiver_hash'] = pd.util.hash_array(df['receiver'].values) % 10_000_000
         
+        return self._derived_features(df)
+    
+    def _dataset_feature_frame(self, dataset):
+        # Unscaled self.features columns for a TransactionDataset. Hour and day
+        # of week come from integer arithmetic on the epoch seconds and the
+        # address hashes from the dataset's dictionary, so no timestamps are
+        # parsed and no addresses hashed.
+        timestamps = np.asarray(dataset.timestamp)
+        sender = np.asarray(dataset.sender)
+        receiver = np.asarray(dataset.receiver)
+        df = pd.DataFrame({
+            'amount': np.asarray(dataset.amount, dtype=np.float64),
+            'hour': timestamps // 3600 % 24,
+            # 1970-01-01 was a Thursday; Monday is 0 as in pandas
+            'day_of_week': (timestamps // 86400 + 3) % 7
+        })
+        
+        addresses = dataset.address_objects()
+        profile_features = self._stream_profiles(
+            addresses[sender], addresses[receiver],
+            df['amount'].to_numpy(), timestamps.astype(np.float64)
+        )
+        for feature, values in profile_features.items():
+            df[feature] = values
+        
+        df['sender_hash'] = dataset.address_hash[sender]
+        df['receiver_hash'] = dataset.address_hash[receiver]
+        
+        return self._derived_features(df)
+    
+    def _derived_features(self, df):
         # Add new features to better capture fraud patterns
         df['amount_log'] = np.log1p(df['amount'])  # Log transformation of amount
         df['is_high_amount'] = (df['amount'] > 8000).astype(int)  # Binary flag for high amounts
@@ -42,51 +214,176 @@ class FraudDetectionModel:
         # Add interaction features
         df['amount_hour_interaction'] = df['amount'] * df['hour']
         
-        # Convert addresses to numerical features (hash)
-        df['sender_hash'] = pd.util.hash_array(df['sender'].values) % 10_000_000
-        df['receiver_hash'] = pd.util.hash_array(df['receiver'].values) % 10_000_000
-        
         # Select features
-        X = df[self.features]
-        y = df['is_fraud'] if 'is_fraud' in df.columns else None
-        
-        # Scale features
-        if training:
-            X_scaled = self.scaler.fit_transform(X)
-        else:
-            X_scaled = self.scaler.transform(X)
+        return df[self.features]
+    
+    def _time_features(self, df):
+        # Adds hour and day_of_week to df; returns each row's epoch seconds
+        if 'timestamp' in df.columns:
+            timestamps = pd.to_datetime(df['timestamp'])
+            df['hour'] = timestamps.dt.hour
+            df['day_of_week'] = timestamps.dt.dayofweek
+            if timestamps.dt.tz is not None:
+                timestamps = timestamps.dt.tz_convert('UTC').dt.tz_localize(None)
+            return (timestamps - _EPOCH).dt.total_seconds().to_numpy()
         
-        return X_scaled, y
+        df['hour'] = 0
+        df['day_of_week'] = 0
+        return np.zeros(len(df))
     
-    def train(self, data_path):
-        # Load data
-        df = pd.read_csv(data_path)
+    def feature_matrix(self, data_path, cache=None):
+        # Unscaled self.features matrix and labels for a CSV or dataset
+        # directory, streamed through freshly reset profile stores. With a
+        # FeatureCache, a matrix and end-of-file profile state computed earlier
+        # from the same contents are reused instead.
+        if cache is not None:
+            key = cache.key(data_path, self.features, FEATURE_VERSION, self.history_settings())
+            entry = cache.get(key)
+            if entry is not None:
+                print(f"Using cached features {key[:12]} for {data_path}")
+                self.load_profiles(entry['profiles_path'])
+                return pd.DataFrame(entry['X'], columns=self.features), pd.Series(entry['y'], name='is_fraud')
         
-        # Preprocess
-        X, y = self.preprocess(df, training=True)
+        self.reset_history()
+        if is_dataset(data_path):
+            dataset = TransactionDataset.load(data_path)
+            X = self._dataset_feature_frame(dataset)
+            y = pd.Series(dataset.is_fraud, name='is_fraud')
+        else:
+            df = pd.read_csv(data_path)
+            X = self._feature_frame(df)
+            y = df['is_fraud']
         
-        # Get feature names - this is the missing part
-        features = [
-            'amount', 'amount_log', 'is_high_amount', 
-            'hour', 'is_unusual_hour', 'day_of_week',
-            'sender_frequency', 'receiver_frequency',
-            'amount_hour_interaction',
-            'sender_hash', 'receiver_hash'
-        ]
+        if cache is not None:
+            cache.put(key, X, y, self)
+        return X, y
+    
+    def train(self, data_path, cache=None):
+        # data_path is a CSV or a dataset directory written by ml/dataset.py
+        X, y = self.feature_matrix(data_path, cache)
+        X = self.scaler.fit_transform(X)
         
         # Split data
         X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
         
-        # Train model with improved parameters
-        self.model = RandomForestClassifier(
-            n_estimators=500, 
-            max_depth=15,
-            min_samples_split=10,
-            min_samples_leaf=4,
+        self._fit_forest(X_train, y_train, X_test, y_test)
+    
+    def train_streaming(self, data_path, chunk_rows=100_000, sample_rows=1_000_000, test_fraction=0.2, seed=42,
+                        cache=None):
+        # Out-of-core training: one pass over the CSV in chunks of chunk_rows,
+        # streaming the profile stores and the scaler statistics over every
+        # row, while the forest is fit on a class-stratified reservoir sample
+        # of at most sample_rows rows. Memory depends on chunk_rows and
+        # sample_rows, not on the size of the file. Profiles see rows in file
+        # order across chunks, so the file should be sorted by timestamp, as
+        # chain exports are. data_path may also be a dataset directory; with a
+        # FeatureCache, chunks come from (or are written to) the cache.
+        rng = np.random.default_rng(seed)
+        self.reset_history()
+        self.scaler = StandardScaler()
+        
+        # Training rows are sampled per class; the holdout is a plain uniform
+        # sample, so its metrics reflect the real class balance
+        train_sample = StratifiedReservoir(sample_rows // 2, len(self.features), rng)
+        test_sample = ReservoirSample(max(1, int(sample_rows * test_fraction)), len(self.features), rng)
+        
+        rows = 0
+        for X_chunk, y in self._training_chunks(data_path, chunk_rows, cache):
+            self.scaler.partial_fit(X_chunk)
+            
+            X = X_chunk.to_numpy(dtype=np.float64)
+            holdout = rng.random(len(y)) < test_fraction
+            test_sample.add(X[holdout], y[holdout])
+            train_sample.add(X[~holdout], y[~holdout])
+            
+            rows += len(y)
+            print(f"Streamed {rows} rows", end="\r", flush=True)
+        
+        print(f"Streamed {rows} rows; training sample per class (seen, kept): {train_sample.counts()}")
+        
+        # Scale the samples with statistics from every row
+        X_train, y_train = train_sample.sample()
+        X_test, y_test = test_sample.sample()
+        self._fit_forest(
+            self.scaler.transform(pd.DataFrame(X_train, columns=self.features)), y_train,
+            self.scaler.transform(pd.DataFrame(X_test, columns=self.features)), y_test
+        )
+    
+    def _training_chunks(self, data_path, chunk_rows, cache=None):
+        # (unscaled feature frame, int8 labels) per chunk_rows rows, in order
+        writer = None
+        if cache is not None:
+            key = cache.key(data_path, self.features, FEATURE_VERSION, self.history_settings())
+            entry = cache.get(key)
+            if entry is not None:
+                print(f"Using cached features {key[:12]} for {data_path}")
+                self.load_profiles(entry['profiles_path'])
+                for start in range(0, len(entry['y']), chunk_rows):
+                    X = pd.DataFrame(entry['X'][start:start + chunk_rows], columns=self.features)
+                    yield X, np.asarray(entry['y'][start:start + chunk_rows])
+                return
+            writer = cache.create(key, self.features)
+        
+        if is_dataset(data_path):
+            dataset = TransactionDataset.load(data_path)
+            chunks = (dataset.slice(start, start + chunk_rows) for start in range(0, len(dataset), chunk_rows))
+            chunks = ((self._dataset_feature_frame(chunk), np.asarray(chunk.is_fraud, dtype=np.int8)) for chunk in chunks)
+        else:
+            chunks = (
+                (self._feature_frame(chunk), chunk['is_fraud'].to_numpy(dtype=np.int8))
+                for chunk in pd.read_csv(data_path, chunksize=chunk_rows)
+            )
+        
+        for X, y in chunks:
+            if writer is not None:
+                writer.append(X, y)
+            yield X, y
+        
+        # The profile stores have now seen every row
+        if writer is not None:
+            writer.commit(self)
+    
+    @classmethod
+    def streaming_limits(cls, memory_mb):
+        # chunk_rows, sample_rows and graph_edges (the graph's max_edges) for
+        # train_streaming that keep its data within memory_mb, on top of what
+        # the interpreter and libraries use. The two profile stores are fixed
+        # in size; the graph gets at most a quarter of the budget, every edge
+        # counted with the two addresses it may bring in; chunks and the
+        # sample share what is left.
+        budget = memory_mb * 1024 * 1024
+        profiles = 2 * AddressProfileStore.CAPACITY * cls.PROFILE_SLOT_BYTES
+        edge_bytes = cls.GRAPH_EDGE_BYTES + 2 * cls.GRAPH_ADDRESS_BYTES
+        graph_edges = max(1000, min(TransactionGraph.MAX_EDGES, int(0.25 * budget / edge_bytes)))
+        rows = max(0, budget - profiles - graph_edges * edge_bytes)
+        return {
+            'chunk_rows': max(1000, int(0.4 * rows / cls.CHUNK_ROW_BYTES)),
+            'sample_rows': max(1000, int(0.6 * rows / cls.SAMPLE_ROW_BYTES)),
+            'graph_edges': graph_edges
+        }
+    
+    def history_settings(self):
+        # Sizes of the profile stores and graph; once full they evict or prune,
+        # which changes the history features, so cached features depend on them
+        return {
+            'profile_capacity': [self.sender_profiles.capacity, self.receiver_profiles.capacity],
+            'graph_max_edges': self.graph.max_edges,
+            'graph_window_seconds': self.graph.window_seconds
+        }
+    
+    @classmethod
+    def new_forest(cls, n_jobs=-1, **params):
+        # Unfitted forest with FOREST_PARAMS, overridden by params
+        return RandomForestClassifier(
+            **{**cls.FOREST_PARAMS, **params},
             class_weight='balanced',
             random_state=42,
-            n_jobs=-1
+            n_jobs=n_jobs
         )
+    
+    def _fit_forest(self, X_train, y_train, X_test, y_test):
+        # Train model with improved parameters
+        self.model = self.new_forest()
         self.model.fit(X_train, y_train)
         
         # Evaluate with more metrics
@@ -103,19 +400,192 @@ class FraudDetectionModel:
         
         # Calculate feature importance - fixed here
         importances = self.model.feature_importances_
-        feature_importance = sorted(zip(features, importances), key=lambda x: x[1], reverse=True)
+        feature_importance = sorted(zip(self.features, importances), key=lambda x: x[1], reverse=True)
         print("\n===== FEATURE IMPORTANCE =====")
         for feature, importance in feature_importance:
             print(f"{feature}: {importance:.4f}")
         
         # Save model
-        os.makedirs('ml/saved_models', exist_ok=True)
-        with open('ml/saved_models/fraud_model.pkl', 'wb') as f:
-            pickle.dump((self.model, self.scaler), f)
+        self._engine = None
+        self._realtime_trees = None
+        self.save_model('ml/saved_models/fraud_model.pkl')
+        self.save_artifact('ml/saved_models/fraud_model')
+    
+    def save_model(self, model_path='ml/saved_models/fraud_model.pkl'):
+        os.makedirs(os.path.dirname(model_path) or '.', exist_ok=True)
+        with open(model_path, 'wb') as f:
+            pickle.dump((self.model, self.scaler, self.features), f)
+        self.save_profiles(self.profiles_path(model_path))
+    
+    def save_artifact(self, artifact_dir='ml/saved_models/fraud_model'):
+        # Pickle-free model directory: the flattened forest as raw .npy arrays
+        # plus metadata.json with the features and scaler. load_model() maps it
+        # in milliseconds and processes loading it share one copy in memory.
+        self.engine.save_arrays(artifact_dir)
+        metadata = {
+            'version': ARTIFACT_VERSION,
+            'features': self.features,
+            'scaler_mean': self.scaler.mean_.tolist(),
+            'scaler_scale': self.scaler.scale_.tolist(),
+            'scaler_var': self.scaler.var_.tolist(),
+            'scaler_samples_seen': int(self.scaler.n_samples_seen_),
+            'n_trees': self.engine.n_trees,
+            'max_depth': self.engine.max_depth
+        }
+        # Written last, so a directory with metadata.json is complete
+        with open(os.path.join(artifact_dir, 'metadata.json'), 'w') as f:
+            json.dump(metadata, f, indent=2)
+        self.save_profiles(self.profiles_path(artifact_dir))
+    
+    def _load_artifact(self, artifact_dir):
+        with open(os.path.join(artifact_dir, 'metadata.json'), 'r') as f:
+            metadata = json.load(f)
+        if metadata['version'] != ARTIFACT_VERSION:
+            raise ValueError(
+                f"{artifact_dir} has artifact version {metadata['version']}, expected {ARTIFACT_VERSION}"
+            )
+        
+        self.features = metadata['features']
+        self.scaler = StandardScaler()
+        self.scaler.mean_ = np.array(metadata['scaler_mean'])
+        self.scaler.scale_ = np.array(metadata['scaler_scale'])
+        self.scaler.var_ = np.array(metadata['scaler_var'])
+        self.scaler.n_samples_seen_ = metadata['scaler_samples_seen']
+        self.scaler.n_features_in_ = len(self.features)
+        self.scaler.feature_names_in_ = np.array(self.features, dtype=object)
+        
+        # The compiled forest stands in for the sklearn one everywhere
+        self.set_forest(CompiledForest.load_arrays(artifact_dir, metadata['max_depth']))
+        
+        if len(self.scaler.mean_) != len(self.features) or self._engine.feature.max() >= len(self.features):
+            raise ValueError(f"{artifact_dir} does not match its {len(self.features)} features")
     
     def load_model(self, model_path='ml/saved_models/fraud_model.pkl'):
+        # model_path is a pickle from save_model() or a directory from save_artifact()
+        if os.path.isdir(model_path):
+            self._load_artifact(model_path)
+            self._load_saved_profiles(model_path)
+            return
+        
         with open(model_path, 'rb') as f:
-            self.model, self.scaler = pickle.load(f)
+            saved = pickle.load(f)
+        
+        # Older models were saved as (model, scaler) with the original features
+        if len(saved) == 2:
+            self.model, self.scaler = saved
+            self.features = list(LEGACY_FEATURES)
+        else:
+            self.model, self.scaler, self.features = saved
+        self._engine = None
+        self._realtime_trees = None
+        
+        if self.model.n_features_in_ != len(self.features):
+            raise ValueError(
+                f"{model_path} expects {self.model.n_features_in_} features but "
+                f"{len(self.features)} are defined; retrain it with ml/train.py"
+            )
+        
+        self._load_saved_profiles(model_path)
+    
+    def _load_saved_profiles(self, model_path):
+        # Pick up the address history the model was trained or last served with
+        profiles_path = self.profiles_path(model_path)
+        if os.path.exists(profiles_path):
+            self.load_profiles(profiles_path)
+        else:
+            self.reset_history()
+    
+    @staticmethod
+    def profiles_path(model_path):
+        # Profile stores live next to the model they were built with
+        return os.path.splitext(os.path.normpath(model_path))[0] + '_profiles.npz'
+    
+    def reset_history(self):
+        # Forget every address: profile stores and transaction graph
+        self.sender_profiles.reset()
+        self.receiver_profiles.reset()
+        self.graph.reset()
+    
+    def save_profiles(self, path):
+        state = {}
+        for prefix, store in (('sender_', self.sender_profiles), ('receiver_', self.receiver_profiles),
+                              ('graph_', self.graph)):
+            for name, values in store.state().items():
+                state[prefix + name] = values
+        # Written beside path and renamed over it, so readers never see a torn file
+        temp_path = path + '.tmp'
+        with open(temp_path, 'wb') as f:
+            np.savez(f, **state)
+        os.replace(temp_path, path)
+    
+    def merge_profiles(self, path):
+        # save_profiles() for the file every process serving the model shares
+        # (monitor, backfill, prediction server). Under an exclusive lock, the
+        # history the file holds and this process's are merged address by
+        # address, the more recently seen one winning, so whichever process
+        # exits last no longer discards what the others saw.
+        import fcntl
+        with open(path + '.lock', 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            if os.path.exists(path):
+                saved = FraudDetectionModel()
+                saved.load_profiles(path)
+                self.sender_profiles = AddressProfileStore.merged(saved.sender_profiles, self.sender_profiles)
+                self.receiver_profiles = AddressProfileStore.merged(saved.receiver_profiles, self.receiver_profiles)
+                self.graph = TransactionGraph.merged(saved.graph, self.graph)
+            self.save_profiles(path)
+    
+    def load_profiles(self, path):
+        with np.load(path) as state:
+            for prefix, attribute in (('sender_', 'sender_profiles'), ('receiver_', 'receiver_profiles')):
+                store_state = {
+                    name[len(prefix):]: state[name] for name in state.files if name.startswith(prefix)
+                }
+                setattr(self, attribute, AddressProfileStore.from_state(store_state))
+            # Profiles saved before the graph existed start it empty
+            if 'graph_config' in state.files:
+                self.graph = TransactionGraph.from_state({
+                    name[len('graph_'):]: state[name] for name in state.files if name.startswith('graph_')
+                })
+            else:
+                self.graph = TransactionGraph()
+    
+    def _observe_profiles(self, sender, receiver, amount, seconds):
+        # Record one transaction in both stores and the graph and return its
+        # HISTORY_FEATURES
+        sender_frequency, sender_amount_zscore, sender_seconds_since_last = \
+            self.sender_profiles.observe(sender, amount, seconds)
+        receiver_frequency, _, _ = self.receiver_profiles.observe(receiver, amount, seconds)
+        return (sender_frequency, receiver_frequency, sender_amount_zscore, sender_seconds_since_last) + \
+            self.graph.observe(sender, receiver, seconds)
+    
+    def observe_profiles(self, transaction_data):
+        # Record transactions in the profile stores and graph and return their
+        # HISTORY_FEATURES, for scoring them later with predict_batch()
+        df = normalize_addresses(pd.DataFrame(transaction_data))
+        return self._stream_profiles(
+            df['sender'].to_numpy(), df['receiver'].to_numpy(),
+            df['amount'].to_numpy(dtype=np.float64), self._time_features(df)
+        )
+    
+    def _stream_profiles(self, senders, receivers, amounts, seconds):
+        values = np.empty((len(senders), len(HISTORY_FEATURES)))
+        
+        # Stable sort keeps same-second transactions in their original order.
+        # The profile stores take one row at a time; the graph takes the
+        # whole sorted batch, with the same result.
+        order = np.argsort(seconds, kind='stable')
+        for i in order.tolist():
+            sender_frequency, sender_amount_zscore, sender_seconds_since_last = \
+                self.sender_profiles.observe(senders[i], amounts[i], seconds[i])
+            receiver_frequency, _, _ = self.receiver_profiles.observe(receivers[i], amounts[i], seconds[i])
+            values[i, :len(PROFILE_FEATURES)] = \
+                sender_frequency, receiver_frequency, sender_amount_zscore, sender_seconds_since_last
+        values[order, len(PROFILE_FEATURES):] = self.graph.observe_batch(
+            np.asarray(senders)[order], np.asarray(receivers)[order], np.asarray(seconds, dtype=np.float64)[order]
+        )
+        
+        return {feature: values[:, column] for column, feature in enumerate(HISTORY_FEATURES)}
     
     def predict(self, transaction_data):
         # Convert transaction data to DataFrame
@@ -127,11 +597,118 @@ class FraudDetectionModel:
         # Preprocess
         X, _ = self.preprocess(df, training=False)
         
-        # Predict
+        # Predict; one forest pass, predict() would pick the more probable class
         fraud_proba = self.model.predict_proba(X)[:, 1]
-        fraud_prediction = self.model.predict(X)
         
         return {
-            'is_fraud': bool(fraud_prediction[0]),
+            'is_fraud': bool(fraud_proba[0] > 0.5),
             'fraud_probability': float(fraud_proba[0])
-        }
\ No newline at end of file
+        }
+    
+    def predict_realtime(self, transaction):
+        # Low-latency scoring of a single transaction dict. Builds the feature
+        # vector straight from self.features without pandas and walks each tree
+        # once in plain Python. Gives the same result as predict() on one row.
+        #
+        # Latency target (500 trees, max_depth=15): p50 <= 0.5 ms, p99 <= 2 ms,
+        # checked by benchmarks/bench_realtime_latency.py
+        return self.realtime_predict(self.realtime_features(transaction))
+    
+    def realtime_features(self, transaction):
+        # predict_realtime's first half: records the transaction in the profile
+        # stores and returns its scaled feature vector as a list
+        amount = float(transaction['amount'])
+        if transaction.get('timestamp') is not None:
+            timestamp = _to_datetime(transaction['timestamp'])
+            hour, day_of_week = timestamp.hour, timestamp.weekday()
+            seconds = _epoch_seconds(timestamp)
+        else:
+            hour, day_of_week, seconds = 0, 0, 0.0
+        
+        sender = str(transaction['sender']).lower()
+        receiver = str(transaction['receiver']).lower()
+        profile_values = self._observe_profiles(sender, receiver, amount, seconds)
+        
+        values = {
+            'amount': amount,
+            'amount_log': math.log1p(amount),
+            'is_high_amount': int(amount > 8000),
+            'hour': hour,
+            'is_unusual_hour': int(hour < 9 or hour > 17),
+            'day_of_week': day_of_week,
+            'amount_hour_interaction': amount * hour,
+            'sender_hash': _address_hash(sender),
+            'receiver_hash': _address_hash(receiver)
+        }
+        values.update(zip(HISTORY_FEATURES, profile_values))
+        x = np.array([values[feature] for feature in self.features], dtype=np.float64)
+        
+        # Same arithmetic as StandardScaler.transform, then the float32 cast
+        # sklearn's trees apply before comparing against thresholds
+        return ((x - self.scaler.mean_) / self.scaler.scale_).astype(np.float32).tolist()
+    
+    def realtime_predict(self, x):
+        # predict_realtime's second half: walks every tree for one vector
+        # from realtime_features()
+        self.warm_up()
+        fraud_proba = 0.0
+        for feature, threshold, left, right, value in self._realtime_trees:
+            node = 0
+            while left[node] != -1:
+                node = left[node] if x[feature[node]] <= threshold[node] else right[node]
+            fraud_proba += value[node]
+        fraud_proba /= len(self._realtime_trees)
+        
+        return {
+            'is_fraud': fraud_proba > 0.5,
+            'fraud_probability': fraud_proba
+        }
+    
+    def set_forest(self, forest):
+        # Serve with forest: a fitted RandomForestClassifier, or a CompiledForest
+        # that then stands in for it everywhere
+        self.model = forest
+        self._engine = forest if isinstance(forest, CompiledForest) else None
+        self._realtime_trees = None
+    
+    @property
+    def engine(self):
+        # The trained forest as contiguous node arrays (see ml/forest_engine.py)
+        if self._engine is None:
+            self._engine = CompiledForest.from_sklearn(self.model)
+        return self._engine
+    
+    def warm_up(self):
+        # Build the flattened forest and predict_realtime's tree lists now
+        # rather than on the first prediction
+        if self._realtime_trees is None:
+            self._realtime_trees = self.engine.tree_lists()
+    
+    def predict_batch(self, transaction_data, profile_features=None):
+        # Score many transactions with one feature matrix and one forest pass.
+        # Rows go through the profile stores in time order, so each gets the
+        # result it would get if the batch were scored one at a time. Rows
+        # already recorded with observe_profiles() pass its result instead.
+        df = pd.DataFrame(transaction_data)
+        
+        # Preprocess
+        X, _ = self.preprocess(df, training=False, profile_features=profile_features)
+        
+        return self.predict_scaled(X)
+    
+    def predict_features(self, X):
+        # predict_batch() for an unscaled matrix from feature_matrix()
+        return self.predict_scaled(self.scaler.transform(X))
+    
+    def predict_scaled(self, X):
+        # Predict from preprocess() output; predict() would pick the class
+        # with the higher probability
+        if len(X) <= self.ENGINE_BATCH_LIMIT:
+            fraud_proba = self.engine.predict_fraud_proba(X)
+        else:
+            fraud_proba = self.model.predict_proba(X)[:, 1]
+        
+        return {
+            'is_fraud': fraud_proba > 0.5,
+            'fraud_probability': fraud_proba
+        }
@@ -1,26 +1,34 @@
 from model import FraudDetectionModel
+from client import PredictionClient
+import argparse
 import json
-import sys
 
-def predict_fraud(transaction_json):
+def predict_fraud(transaction_json, server_url=None):
+    # Parse transaction data
+    transaction = json.loads(transaction_json)
+    
+    # A running ml/server.py already has the model loaded
+    if server_url:
+        return PredictionClient(server_url).predict(transaction)
+    
     # Load the trained model
     model = FraudDetectionModel()
     model.load_model()
     
-    # Parse transaction data
-    transaction = json.loads(transaction_json)
-    
     # Make prediction
     result = model.predict(transaction)
     
     return result
 
 if __name__ == "__main__":
-    # Read transaction data from command line argument
-    transaction_json = sys.argv[1]
+    parser = argparse.ArgumentParser(description="Score one transaction given as JSON")
+    parser.add_argument('transaction_json', help='Transaction as a JSON object')
+    parser.add_argument('--server', help='Score through a running ml/server.py at this URL '
+                                         '(http://host:port or unix:///path) instead of loading the model')
+    args = parser.parse_args()
     
     # Get prediction
-    result = predict_fraud(transaction_json)
+    result = predict_fraud(args.transaction_json, args.server)
     
     # Print result as JSON
-    print(json.dumps(result))
\ No newline at end of file
+    print(json.dumps(result))
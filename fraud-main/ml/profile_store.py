@@ -0,0 +1,138 @@
+import numpy as np
+from collections import OrderedDict
+import math
+
+class AddressProfileStore:
+    """Per-address activity profiles in fixed-size NumPy arrays, updated in O(1)
+    per transaction and bounded by least-recently-seen eviction"""
+
+    # Addresses kept by default
+    CAPACITY = 200_000
+
+    def __init__(self, capacity=CAPACITY, half_life_days=7.0):
+        self.capacity = capacity
+        self.half_life_days = half_life_days
+        self.decay_rate = math.log(2) / (half_life_days * 24 * 3600)
+
+        self.count = np.zeros(capacity)      # time-decayed transaction count
+        self.mean = np.zeros(capacity)       # decayed mean amount
+        self.var = np.zeros(capacity)        # decayed amount variance
+        self.last_seen = np.zeros(capacity)  # seconds, same clock as observe()
+
+        # address -> slot, least recently seen first. Slots below used_slots
+        # have been handed out; evicted ones wait in free_slots for reuse.
+        self.slots = OrderedDict()
+        self.used_slots = 0
+        self.free_slots = []
+
+    def __len__(self):
+        return len(self.slots)
+
+    def __contains__(self, address):
+        return address in self.slots
+
+    def observe(self, address, amount, timestamp):
+        # Record one transaction for address and return its features:
+        # (frequency, amount_zscore, seconds_since_last). frequency counts this
+        # transaction; the other two describe the history before it.
+        slot = self.slots.get(address)
+        if slot is None:
+            slot = self._allocate(address)
+            self.count[slot] = 1.0
+            self.mean[slot] = amount
+            self.var[slot] = 0.0
+            self.last_seen[slot] = timestamp
+            return 1.0, 0.0, -1.0
+
+        self.slots.move_to_end(address)
+        frequency, amount_zscore, seconds_since_last = self._features(slot, amount, timestamp)
+
+        # Exponentially weighted mean/variance update, weighting this
+        # transaction as one of `frequency` decayed observations
+        weight = 1.0 / frequency
+        delta = amount - self.mean[slot]
+        self.mean[slot] += weight * delta
+        self.var[slot] = (1.0 - weight) * (self.var[slot] + weight * delta * delta)
+        self.count[slot] = frequency
+        self.last_seen[slot] = max(self.last_seen[slot], timestamp)
+
+        return frequency, amount_zscore, seconds_since_last
+
+    def reset(self):
+        self.slots.clear()
+        self.used_slots = 0
+        self.free_slots = []
+
+    def state(self):
+        # Plain arrays in LRU order, for np.savez; no pickle needed to reload
+        slots = np.fromiter(self.slots.values(), dtype=np.int64, count=len(self.slots))
+        return {
+            'addresses': np.array(list(self.slots.keys()), dtype=str),
+            'count': self.count[slots],
+            'mean': self.mean[slots],
+            'var': self.var[slots],
+            'last_seen': self.last_seen[slots],
+            'config': np.array([self.capacity, self.half_life_days])
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        capacity, half_life_days = state['config']
+        store = cls(capacity=int(capacity), half_life_days=float(half_life_days))
+        n = len(state['addresses'])
+        if n > store.capacity:
+            raise ValueError(f"Profile state holds {n} addresses but capacity is {store.capacity}")
+
+        store.count[:n] = state['count']
+        store.mean[:n] = state['mean']
+        store.var[:n] = state['var']
+        store.last_seen[:n] = state['last_seen']
+        store.slots = OrderedDict((str(address), slot) for slot, address in enumerate(state['addresses']))
+        store.used_slots = n
+        return store
+
+    @classmethod
+    def merged(cls, first, second):
+        # One store with, for every address in either, the profile seen most
+        # recently (second's on ties): how processes that started from the
+        # same saved profiles combine what each went on to see
+        a, b = first.state(), second.state()
+        addresses = np.concatenate([a['addresses'], b['addresses']])
+        last_seen = np.concatenate([a['last_seen'], b['last_seen']])
+        source = np.repeat([0, 1], [len(a['addresses']), len(b['addresses'])])
+        # Oldest first, so the last row of each address is the one kept
+        order = np.lexsort((source, last_seen))
+        _, last = np.unique(addresses[order][::-1], return_index=True)
+        keep = np.sort(order[::-1][last])
+        keep = keep[np.argsort(last_seen[keep], kind='stable')][-int(b['config'][0]):]
+
+        state = {'addresses': addresses[keep], 'last_seen': last_seen[keep], 'config': b['config']}
+        for name in ('count', 'mean', 'var'):
+            state[name] = np.concatenate([a[name], b[name]])[keep]
+        return cls.from_state(state)
+
+    def _features(self, slot, amount, timestamp):
+        seconds_since_last = max(timestamp - self.last_seen[slot], 0.0)
+        decayed_count = self.count[slot] * math.exp(-self.decay_rate * seconds_since_last)
+        frequency = decayed_count + 1.0
+
+        std = math.sqrt(self.var[slot])
+        amount_zscore = (amount - self.mean[slot]) / std if std > 0 else 0.0
+
+        return frequency, amount_zscore, seconds_since_last
+
+    def _allocate(self, address):
+        if self.free_slots:
+            slot = self.free_slots.pop()
+        elif self.used_slots < self.capacity:
+            slot = self.used_slots
+            self.used_slots += 1
+        else:
+            # Full: reuse the slot of the least recently seen address
+            self._release(next(iter(self.slots)))
+            slot = self.free_slots.pop()
+        self.slots[address] = slot
+        return slot
+
+    def _release(self, address):
+        self.free_slots.append(self.slots.pop(address))
@@ -0,0 +1,77 @@
+import numpy as np
+
+class ReservoirSample:
+    """Uniform fixed-size sample of a stream of feature rows (Algorithm R),
+    filled a chunk at a time; memory is bounded by capacity, not stream length"""
+
+    def __init__(self, capacity, n_features, rng):
+        self.capacity = capacity
+        self.rng = rng
+        self.seen = 0
+        # Grown on demand up to capacity, so small streams stay small
+        self.X = np.empty((0, n_features))
+        self.y = np.empty(0, dtype=np.int8)
+
+    def __len__(self):
+        return min(self.seen, self.capacity)
+
+    def add(self, X, y):
+        n = len(y)
+        if n == 0:
+            return
+
+        # Stream position i fills slot i while there is room, afterwards
+        # replaces a uniformly drawn slot j in [0, i] if j < capacity
+        positions = self.seen + np.arange(n)
+        slots = np.where(positions < self.capacity, positions, self.rng.integers(0, positions + 1))
+        rows = np.flatnonzero(slots < self.capacity)
+        slots = slots[rows]
+
+        # When rows of one chunk land on the same slot the later one wins,
+        # as it would adding them one at a time
+        _, last = np.unique(slots[::-1], return_index=True)
+        rows = rows[::-1][last]
+        slots = slots[::-1][last]
+
+        self._reserve(min(self.seen + n, self.capacity))
+        self.X[slots] = X[rows]
+        self.y[slots] = y[rows]
+        self.seen += n
+
+    def sample(self):
+        return self.X[:len(self)], self.y[:len(self)]
+
+    def _reserve(self, size):
+        if size <= len(self.X):
+            return
+        size = min(self.capacity, max(size, 2 * len(self.X)))
+        X = np.empty((size, self.X.shape[1]))
+        y = np.empty(size, dtype=np.int8)
+        X[:len(self.X)] = self.X
+        y[:len(self.y)] = self.y
+        self.X, self.y = X, y
+
+class StratifiedReservoir:
+    """One ReservoirSample per class label, so rare fraud rows keep their share
+    of the sample however many legitimate rows stream past"""
+
+    def __init__(self, capacity_per_class, n_features, rng):
+        self.capacity_per_class = capacity_per_class
+        self.n_features = n_features
+        self.rng = rng
+        self.reservoirs = {}
+
+    def add(self, X, y):
+        for label in np.unique(y):
+            mask = y == label
+            if label not in self.reservoirs:
+                self.reservoirs[label] = ReservoirSample(self.capacity_per_class, self.n_features, self.rng)
+            self.reservoirs[label].add(X[mask], y[mask])
+
+    def counts(self):
+        # label -> (rows seen, rows kept)
+        return {int(label): (reservoir.seen, len(reservoir)) for label, reservoir in sorted(self.reservoirs.items())}
+
+    def sample(self):
+        samples = [reservoir.sample() for _, reservoir in sorted(self.reservoirs.items())]
+        return np.concatenate([X for X, _ in samples]), np.concatenate([y for _, y in samples])
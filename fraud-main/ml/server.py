@@ -0,0 +1,204 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from concurrent.futures import Future
+import socketserver
+import threading
+import argparse
+import queue
+import json
+import time
+import os
+
+try:
+    from ml.model import FraudDetectionModel, _to_datetime
+except ImportError:
+    # Run as python ml/server.py
+    from model import FraudDetectionModel, _to_datetime
+
+REQUIRED_FIELDS = ('sender', 'receiver', 'amount', 'timestamp')
+
+class MicroBatcher:
+    """Collects transactions from concurrent requests for up to max_wait_ms and
+    scores them with one vectorized forest call. With max_wait_ms=0 a batch is
+    whatever queued up while the previous one was being scored."""
+
+    def __init__(self, model, max_batch=256, max_wait_ms=0.0):
+        self.model = model
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+        self._worker.start()
+
+    def submit(self, transactions):
+        # Queue already validated transactions; returns one Future per transaction
+        futures = []
+        for transaction in transactions:
+            future = Future()
+            self._queue.put((transaction, future))
+            futures.append(future)
+        return futures
+
+    def close(self):
+        self._queue.put(None)
+        self._worker.join()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+
+            # Wait briefly for more requests to share the forest call
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._score(batch)
+                    return
+                batch.append(item)
+
+            self._score(batch)
+
+    def _score(self, batch):
+        transactions = [transaction for transaction, _ in batch]
+        try:
+            if len(transactions) == 1:
+                # A lone request is cheaper through the pure Python path
+                result = self.model.predict_realtime(transactions[0])
+                results = [(result['is_fraud'], result['fraud_probability'])]
+            else:
+                result = self.model.predict_batch(transactions)
+                results = zip(result['is_fraud'].tolist(), result['fraud_probability'].tolist())
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        for (_, future), (is_fraud, fraud_probability) in zip(batch, results):
+            future.set_result({'is_fraud': bool(is_fraud), 'fraud_probability': float(fraud_probability)})
+
+def parse_transaction(transaction):
+    # Validate one request transaction and normalise its timestamp the way
+    # predict_realtime reads it, so batched and single scoring agree
+    if not isinstance(transaction, dict):
+        raise ValueError("Each transaction must be a JSON object")
+    missing = [field for field in REQUIRED_FIELDS if field not in transaction]
+    if missing:
+        raise ValueError(f"Transaction is missing {', '.join(missing)}")
+
+    return {
+        'sender': str(transaction['sender']),
+        'receiver': str(transaction['receiver']),
+        'amount': float(transaction['amount']),
+        'timestamp': _to_datetime(transaction['timestamp'])
+    }
+
+class PredictionHandler(BaseHTTPRequestHandler):
+    # Keep-alive, so a client pays the connection setup once
+    protocol_version = 'HTTP/1.1'
+    # Buffer each response so headers and body leave in one write; separate
+    # small writes stall on Nagle's algorithm and delayed ACKs (~40 ms)
+    wbufsize = -1
+
+    def do_GET(self):
+        if self.path != '/health':
+            self._send_json(404, {'error': 'Not found'})
+            return
+        self._send_json(200, {'status': 'ok', 'features': len(self.server.batcher.model.features)})
+
+    def do_POST(self):
+        # POST /predict with a transaction object, or a list of them
+        if self.path != '/predict':
+            self._send_json(404, {'error': 'Not found'})
+            return
+
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+            single = isinstance(body, dict)
+            transactions = [parse_transaction(tx) for tx in ([body] if single else body)]
+        except (ValueError, TypeError) as e:
+            self._send_json(400, {'error': str(e)})
+            return
+
+        try:
+            results = [future.result() for future in self.server.batcher.submit(transactions)]
+        except Exception as e:
+            self._send_json(500, {'error': str(e)})
+            return
+
+        self._send_json(200, results[0] if single else results)
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Per-request access logs would cost more than the prediction itself
+        pass
+
+class PredictionHTTPServer(ThreadingHTTPServer):
+    # The default listen backlog of 5 resets connections from bursts of clients
+    request_queue_size = 128
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+    def get_request(self):
+        # BaseHTTPRequestHandler expects a (host, port) client address
+        request, _ = super().get_request()
+        return request, ('unix', 0)
+
+def create_server(batcher, host='127.0.0.1', port=8600, unix_socket=None):
+    if unix_socket:
+        if os.path.exists(unix_socket):
+            os.remove(unix_socket)
+        server = UnixHTTPServer(unix_socket, PredictionHandler)
+    else:
+        server = PredictionHTTPServer((host, port), PredictionHandler)
+    server.batcher = batcher
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description="Long-running fraud scoring server with micro-batching")
+    parser.add_argument('--model', default='ml/saved_models/fraud_model.pkl', help='Saved model: pickle or artifact directory (ml/export_artifact.py)')
+    parser.add_argument('--host', default='127.0.0.1', help='Address to listen on')
+    parser.add_argument('--port', type=int, default=8600, help='TCP port to listen on')
+    parser.add_argument('--unix-socket', help='Listen on this Unix socket path instead of TCP')
+    parser.add_argument('--max-batch', type=int, default=256, help='Most transactions scored in one forest call')
+    parser.add_argument('--max-wait-ms', type=float, default=0.0,
+                        help='How long the first request of a batch waits for others to join it '
+                             '(0: only batch requests that are already queued)')
+    args = parser.parse_args()
+
+    # Load the model and build the scoring structures once, before serving
+    model = FraudDetectionModel()
+    model.load_model(args.model)
+    model.warm_up()
+
+    batcher = MicroBatcher(model, max_batch=args.max_batch, max_wait_ms=args.max_wait_ms)
+    server = create_server(batcher, args.host, args.port, args.unix_socket)
+    print(f"Serving predictions on {args.unix_socket or f'http://{args.host}:{args.port}'}")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nShutting down")
+    finally:
+        server.server_close()
+        batcher.close()
+        # Keep the address history gathered while serving, alongside what
+        # the monitor and other servers saved
+        model.merge_profiles(model.profiles_path(args.model))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+from sklearn.model_selection import train_test_split
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import multiprocessing
+import pandas as pd
+import numpy as np
+import itertools
+import tempfile
+import time
+import os
+
+try:
+    from ml.model import FraudDetectionModel
+    from ml.forest_engine import CompiledForest
+    from ml.dataset import TransactionDataset, is_dataset
+    from ml.evaluation import classification_metrics, roc_auc
+except ImportError:
+    # Imported as a top-level module by the scripts in ml/
+    from model import FraudDetectionModel
+    from forest_engine import CompiledForest
+    from dataset import TransactionDataset, is_dataset
+    from evaluation import classification_metrics, roc_auc
+
+SPLIT_ARRAYS = ('X_train', 'y_train', 'X_test', 'y_test')
+
+# The worker process's memory-mapped train/test split, loaded once by _init_worker
+_split = None
+
+def _init_worker(split_dir):
+    global _split
+    _split = {name: np.load(os.path.join(split_dir, f'{name}.npy'), mmap_mode='r') for name in SPLIT_ARRAYS}
+
+def _fit_candidate(params, threshold):
+    # One tree-building job per worker; the pool supplies the parallelism
+    forest = FraudDetectionModel.new_forest(n_jobs=1, **params)
+    start = time.perf_counter()
+    forest.fit(_split['X_train'], _split['y_train'])
+    fit_seconds = time.perf_counter() - start
+
+    fraud_proba = forest.predict_proba(_split['X_test'])[:, 1]
+    recall = classification_metrics(_split['y_test'], fraud_proba, [threshold])['recall'][0]
+    return forest, fit_seconds, roc_auc(_split['y_test'], fraud_proba), float(recall)
+
+def candidate_grid(n_estimators, max_depth, min_samples_leaf):
+    return [
+        {'n_estimators': trees, 'max_depth': depth, 'min_samples_leaf': leaf}
+        for trees, depth, leaf in itertools.product(n_estimators, max_depth, min_samples_leaf)
+    ]
+
+def pareto_front(results):
+    # Indices of results no other result beats on every axis: higher AUC and
+    # recall, lower single-row and batch latency and size
+    def axes(result):
+        return (-(result['auc'] or 0.0), -result['recall'], result['single_p50_ms'],
+                result['batch_p50_ms'], result['size_mb'])
+
+    front = []
+    for i, result in enumerate(results):
+        mine = axes(result)
+        dominated = any(
+            all(a <= b for a, b in zip(axes(other), mine)) and axes(other) != mine
+            for j, other in enumerate(results) if j != i
+        )
+        if not dominated:
+            front.append(i)
+    return front
+
+def latency_transactions(data_path, count):
+    # Raw transactions from the head of the data, to score as the monitor would
+    if is_dataset(data_path):
+        df = TransactionDataset.load(data_path).slice(0, count).to_frame()
+    else:
+        df = pd.read_csv(data_path, nrows=count)
+    return df[['sender', 'receiver', 'amount', 'timestamp']].to_dict('records')
+
+def measure_serving(forest, scaler, transactions, batch_size, batch_repeat):
+    # Single-row latency through predict_realtime and batch latency through
+    # predict_batch, as serving would run this forest (sklearn or compiled)
+    model = FraudDetectionModel()
+    model.set_forest(forest)
+    model.scaler = scaler
+    model.warm_up()
+
+    single_ms = []
+    for tx in transactions:
+        start = time.perf_counter()
+        model.predict_realtime(tx)
+        single_ms.append((time.perf_counter() - start) * 1000)
+
+    batch = transactions[:batch_size]
+    batch_ms = []
+    for _ in range(batch_repeat):
+        start = time.perf_counter()
+        model.predict_batch(batch)
+        batch_ms.append((time.perf_counter() - start) * 1000)
+
+    engine = model.engine
+    size_bytes = sum(getattr(engine, name).nbytes for name in CompiledForest.ARRAYS)
+    return {
+        'single_p50_ms': float(np.percentile(single_ms, 50)),
+        'single_p99_ms': float(np.percentile(single_ms, 99)),
+        'batch_p50_ms': float(np.percentile(batch_ms, 50)),
+        'size_mb': size_bytes / 1024 / 1024
+    }
+
+def run_sweep(data_path, candidates, workers=None, threshold=0.4, cache=None,
+              latency_rows=1000, batch_size=1000, batch_repeat=5):
+    """Fit every candidate forest on one shared train/test split across a
+    process pool, then measure each one's serving latency in this process,
+    one at a time so the timings do not compete for CPU"""
+    model = FraudDetectionModel()
+    X, y = model.feature_matrix(data_path, cache)
+    X = model.scaler.fit_transform(X)
+    # The split train() uses
+    X_train, X_test, y_train, y_test = train_test_split(X, y.to_numpy(), test_size=0.2, random_state=42, stratify=y)
+    split = {'X_train': X_train, 'y_train': y_train, 'X_test': X_test, 'y_test': y_test}
+
+    workers = workers or os.cpu_count()
+    print(f"Fitting {len(candidates)} candidates on {len(split['y_train'])} rows with {workers} workers")
+    fitted = [None] * len(candidates)
+    with tempfile.TemporaryDirectory() as split_dir:
+        for name in SPLIT_ARRAYS:
+            np.save(os.path.join(split_dir, f'{name}.npy'), split[name])
+
+        # Spawn, as ScoringPool does; workers map the split instead of copying it
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                                 initializer=_init_worker, initargs=(split_dir,)) as executor:
+            futures = {executor.submit(_fit_candidate, params, threshold): i for i, params in enumerate(candidates)}
+            for done, future in enumerate(as_completed(futures), 1):
+                fitted[futures[future]] = future.result()
+                print(f"Fitted {done}/{len(candidates)}", end="\r", flush=True)
+    print()
+
+    transactions = latency_transactions(data_path, max(latency_rows, batch_size))
+    results = []
+    for params, (forest, fit_seconds, auc, recall) in zip(candidates, fitted):
+        # Score with all cores, as a forest fit by train() would
+        forest.n_jobs = -1
+        result = dict(params, auc=auc, recall=recall, fit_seconds=fit_seconds)
+        result.update(measure_serving(forest, model.scaler, transactions[:latency_rows], batch_size, batch_repeat))
+        results.append(result)
+    return results
+
+def print_results(results, threshold, min_auc=None, min_recall=None):
+    front = set(pareto_front(results))
+    print(f"\n{'':1} {'trees':>5} {'depth':>5} {'leaf':>4} | {'AUC':>6} | {f'recall@{threshold}':>10} | "
+          f"{'size MB':>7} | {'1-row p50':>9} | {'1-row p99':>9} | {'batch p50':>9} | {'fit s':>6}")
+    print("-" * 100)
+    order = sorted(range(len(results)), key=lambda i: results[i]['single_p50_ms'])
+    for i in order:
+        r = results[i]
+        auc = f"{r['auc']:.4f}" if r['auc'] is not None else 'n/a'
+        print(f"{'*' if i in front else '':1} {r['n_estimators']:>5} {str(r['max_depth']):>5} {r['min_samples_leaf']:>4} | "
+              f"{auc:>6} | {r['recall']:>10.4f} | {r['size_mb']:>7.2f} | {r['single_p50_ms']:>7.3f}ms | "
+              f"{r['single_p99_ms']:>7.3f}ms | {r['batch_p50_ms']:>7.1f}ms | {r['fit_seconds']:>6.1f}")
+    print("* Pareto front (AUC, recall, latency, size)")
+
+    if min_auc is not None or min_recall is not None:
+        eligible = [
+            r for r in results
+            if (min_auc is None or (r['auc'] or 0.0) >= min_auc) and (min_recall is None or r['recall'] >= min_recall)
+        ]
+        if not eligible:
+            # Only the bounds that were given
+            bars = [f"{name} >= {bound}" for name, bound in (('AUC', min_auc), ('recall', min_recall))
+                    if bound is not None]
+            print(f"\nNo candidate reaches {' and '.join(bars)}")
+            return None
+        best = min(eligible, key=lambda r: (r['single_p50_ms'], r['size_mb']))
+        print(f"\nCheapest candidate meeting the bar: n_estimators={best['n_estimators']}, "
+              f"max_depth={best['max_depth']}, min_samples_leaf={best['min_samples_leaf']}")
+        return best
+    return None
@@ -1,17 +1,68 @@
 from model import FraudDetectionModel
-import pandas as pd
-import sys
+from transaction_graph import TransactionGraph
+from feature_cache import FeatureCache, DEFAULT_CACHE_DIR
+from sweep import candidate_grid, run_sweep, print_results
+import argparse
 
-def train_model(data_path='data/sample_transactions.csv'):
+def train_model(data_path='data/sample_transactions.csv', streaming=False, chunk_rows=100_000, sample_rows=1_000_000,
+                cache=None, graph_edges=None):
     print(f"Training fraud detection model using data from {data_path}")
     
     # Create and train the model
     model = FraudDetectionModel()
-    model.train(data_path)
+    if graph_edges:
+        # Kept in the saved profiles, so serving stays within the same bound
+        model.graph.max_edges = graph_edges
+    if streaming:
+        model.train_streaming(data_path, chunk_rows=chunk_rows, sample_rows=sample_rows, cache=cache)
+    else:
+        model.train(data_path, cache=cache)
     
     print("Training completed. Model saved to ml/saved_models/fraud_model.pkl")
 
 if __name__ == "__main__":
-    # Use command line argument for data path if provided
-    data_path = sys.argv[1] if len(sys.argv) > 1 else 'data/sample_transactions.csv'
-    train_model(data_path)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Train the fraud detection model")
+    parser.add_argument('data_path', nargs='?', default='data/sample_transactions.csv',
+                        help='Labelled transactions CSV, or a dataset directory written by ml/dataset.py')
+    parser.add_argument('--streaming', action='store_true',
+                        help='Read the CSV in chunks and fit on a bounded reservoir sample (for files larger than RAM)')
+    parser.add_argument('--chunk-rows', type=int, default=100_000, help='CSV rows read at a time when streaming')
+    parser.add_argument('--sample-rows', type=int, default=1_000_000, help='Most rows the forest is fit on when streaming')
+    parser.add_argument('--memory-mb', type=int,
+                        help='Memory budget for data and address history when streaming; sets --chunk-rows, '
+                             '--sample-rows and --graph-edges from it')
+    parser.add_argument('--graph-edges', type=int,
+                        help=f'Most sender -> receiver pairs the transaction graph keeps before pruning the '
+                             f'oldest half (default: {TransactionGraph.MAX_EDGES})')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR,
+                        help=f'Feature cache reused by runs on unchanged data (default: {DEFAULT_CACHE_DIR})')
+    parser.add_argument('--cache-max-mb', type=int, default=4096,
+                        help='Size above which the least recently used cached features are evicted')
+    parser.add_argument('--no-cache', action='store_true', help='Always recompute features, without caching them')
+    
+    sweep = parser.add_argument_group('sweep', 'Compare forest settings by accuracy and serving cost; saves no model')
+    sweep.add_argument('--sweep', action='store_true', help='Fit every combination of the values below and report them')
+    sweep.add_argument('--n-estimators', type=int, nargs='+', default=[50, 100, 200, 500])
+    sweep.add_argument('--max-depth', type=int, nargs='+', default=[8, 12, 15])
+    sweep.add_argument('--min-samples-leaf', type=int, nargs='+', default=[FraudDetectionModel.FOREST_PARAMS['min_samples_leaf']])
+    sweep.add_argument('--workers', type=int, help='Processes fitting candidates (default: one per CPU)')
+    sweep.add_argument('--threshold', type=float, default=0.4, help='Flag threshold recall is reported at (default: 0.4)')
+    sweep.add_argument('--min-auc', type=float, help='Accuracy bar for picking the cheapest candidate')
+    sweep.add_argument('--min-recall', type=float, help='Recall bar for picking the cheapest candidate')
+    args = parser.parse_args()
+    
+    if args.memory_mb:
+        limits = FraudDetectionModel.streaming_limits(args.memory_mb)
+        args.streaming = True
+        args.chunk_rows, args.sample_rows = limits['chunk_rows'], limits['sample_rows']
+        args.graph_edges = args.graph_edges or limits['graph_edges']
+        print(f"Streaming in chunks of {args.chunk_rows} rows, sampling up to {args.sample_rows} rows, "
+              f"keeping up to {args.graph_edges} graph edges")
+    
+    cache = None if args.no_cache else FeatureCache(args.cache_dir, args.cache_max_mb * 1024 * 1024)
+    if args.sweep:
+        candidates = candidate_grid(args.n_estimators, args.max_depth, args.min_samples_leaf)
+        results = run_sweep(args.data_path, candidates, args.workers, args.threshold, cache)
+        print_results(results, args.threshold, args.min_auc, args.min_recall)
+    else:
+        train_model(args.data_path, args.streaming, args.chunk_rows, args.sample_rows, cache, args.graph_edges)
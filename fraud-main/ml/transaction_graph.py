@@ -0,0 +1,572 @@
+import pandas as pd
+import numpy as np
+
+def _offsets(lengths):
+    # Position of each item within its run, for runs of the given lengths
+    return np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+
+def _lookup(keys, values, queries, default):
+    # values[i] where keys[i] == query, else default; keys sorted and unique
+    if not len(keys):
+        return np.full(len(queries), default, dtype=values.dtype)
+    position = np.minimum(np.searchsorted(keys, queries), len(keys) - 1)
+    return np.where(keys[position] == queries, values[position], default)
+
+def _covering(row_node, owner, start, stop, n):
+    # For each of n rows, how many of the row intervals [start, stop) cover
+    # it and belong to the row's node (an interval only counts at rows of its
+    # owner). Rows are grouped by node, keeping row order within a group, and
+    # each interval becomes +1/-1 in one difference array over that order; an
+    # owner's intervals land inside its own group, so groups never mix.
+    keep = stop > start
+    owner, start, stop = owner[keep], start[keep], stop[keep]
+    order = np.argsort(row_node, kind='stable')
+    position = row_node[order] * (n + 1) + order
+    low = np.searchsorted(position, owner * (n + 1) + start)
+    high = np.searchsorted(position, owner * (n + 1) + stop)
+    counts = np.empty(n, dtype=np.int64)
+    counts[order] = np.cumsum(np.bincount(low, minlength=n + 1) - np.bincount(high, minlength=n + 1))[:n]
+    return counts
+
+class AdjacencyBlocks:
+    """Per-node lists of ints in one array, CSR-style: a node's list is one
+    contiguous block, so reading it is a single slice. A block that fills up
+    moves to the end of the array with twice the room, which keeps appends
+    amortized O(1); the space it leaves behind is reclaimed by compacting."""
+
+    def __init__(self, nodes=1024, capacity=4096):
+        self.start = np.zeros(nodes, dtype=np.int64)
+        self.length = np.zeros(nodes, dtype=np.int64)
+        self.room = np.zeros(nodes, dtype=np.int64)
+        self.data = np.empty(capacity, dtype=np.int64)
+        self.end = 0         # first unused position of data
+        self.reserved = 0    # total room of live blocks; end - reserved is garbage
+
+    @classmethod
+    def from_keys(cls, keys, nodes):
+        # Blocks listing, for each node, the positions i with keys[i] == node,
+        # in increasing order: the compact layout a rebuild starts from
+        keys = np.asarray(keys, dtype=np.int64)
+        blocks = cls(max(nodes, 1), max(2 * len(keys), 4096))
+        blocks.length[:nodes] = np.bincount(keys, minlength=nodes)
+        blocks.room[:nodes] = blocks.length[:nodes]
+        blocks.start[:nodes] = np.cumsum(blocks.length[:nodes]) - blocks.length[:nodes]
+        blocks.data[:len(keys)] = np.argsort(keys, kind='stable')
+        blocks.end = blocks.reserved = len(keys)
+        return blocks
+
+    def get(self, node):
+        if node >= len(self.length):
+            return self.data[:0]
+        start = self.start[node]
+        return self.data[start:start + self.length[node]]
+
+    def size(self, node):
+        return int(self.length[node]) if node < len(self.length) else 0
+
+    def append(self, node, value):
+        if node >= len(self.length):
+            self._grow_nodes(node + 1)
+        length = self.length[node]
+        if length == self.room[node]:
+            self._relocate(node, max(4, 2 * length))
+        self.data[self.start[node] + length] = value
+        self.length[node] = length + 1
+
+    def extend(self, nodes, values):
+        # append() for many (node, value) pairs at once; each node's values
+        # keep their order. Blocks short of room move to the end together,
+        # with room for twice what they will hold.
+        if not len(nodes):
+            return
+        top = int(nodes.max()) + 1
+        if top > len(self.length):
+            self._grow_nodes(top)
+        order = np.argsort(nodes, kind='stable')
+        nodes, values = nodes[order], values[order]
+        unique, first, counts = np.unique(nodes, return_index=True, return_counts=True)
+        need = self.length[unique] + counts
+        full = need > self.room[unique]
+        if full.any():
+            self._relocate_many(unique[full], np.maximum(4, 2 * need[full]))
+        rank = np.arange(len(nodes)) - np.repeat(first, counts)
+        self.data[self.start[nodes] + self.length[nodes] + rank] = values
+        self.length[unique] = need
+
+    def gather(self, nodes):
+        # (node, value) for every value in the lists of nodes, node by node
+        nodes = nodes[nodes < len(self.length)]
+        lengths = self.length[nodes]
+        return np.repeat(nodes, lengths), self.data[np.repeat(self.start[nodes], lengths) + _offsets(lengths)]
+
+    def lengths(self, nodes):
+        # size() of each of nodes
+        known = nodes < len(self.length)
+        return np.where(known, self.length[np.where(known, nodes, 0)], 0)
+
+    def _relocate(self, node, room):
+        # Move node's block to the end of data with the given room
+        if self.end + room > len(self.data):
+            if 2 * self.reserved < self.end:
+                self.compact()
+            if self.end + room > len(self.data):
+                self._grow_data(2 * (self.end + room))
+        start, length = self.start[node], self.length[node]
+        self.data[self.end:self.end + length] = self.data[start:start + length]
+        self.reserved += room - self.room[node]
+        self.start[node], self.room[node] = self.end, room
+        self.end += room
+
+    def _relocate_many(self, nodes, rooms):
+        # _relocate() for distinct nodes, their new blocks back to back
+        total = int(rooms.sum())
+        if self.end + total > len(self.data):
+            if 2 * self.reserved < self.end:
+                self.compact()
+            if self.end + total > len(self.data):
+                self._grow_data(2 * (self.end + total))
+        lengths = self.length[nodes]
+        offsets = _offsets(lengths)
+        new_start = self.end + np.cumsum(rooms) - rooms
+        self.data[np.repeat(new_start, lengths) + offsets] = self.data[np.repeat(self.start[nodes], lengths) + offsets]
+        self.reserved += total - int(self.room[nodes].sum())
+        self.start[nodes], self.room[nodes] = new_start, rooms
+        self.end += total
+
+    def compact(self):
+        # Rewrite the live blocks back to back, keeping each node's room
+        rooms, lengths = self.room, self.length
+        new_start = np.cumsum(rooms) - rooms
+        offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        data = np.empty(len(self.data), dtype=np.int64)
+        data[np.repeat(new_start, lengths) + offsets] = self.data[np.repeat(self.start, lengths) + offsets]
+        self.data, self.start = data, new_start
+        self.end = self.reserved = int(rooms.sum())
+
+    def _grow_nodes(self, nodes):
+        size = max(nodes, 2 * len(self.length))
+        for name in ('start', 'length', 'room'):
+            values = getattr(self, name)
+            grown = np.zeros(size, dtype=np.int64)
+            grown[:len(values)] = values
+            setattr(self, name, grown)
+
+    def _grow_data(self, capacity):
+        data = np.empty(capacity, dtype=np.int64)
+        data[:self.end] = self.data[:self.end]
+        self.data = data
+
+class TransactionGraph:
+    """Incrementally updated sender -> receiver graph of the transactions seen
+    so far. Addresses get compact integer node ids and each distinct
+    (sender, receiver) pair an edge id with the time it was last used; every
+    node's outgoing and incoming edge ids sit in AdjacencyBlocks. observe()
+    answers fan-out/fan-in in O(1), distinct counterparties within the window
+    in O(degree) and short cycles in O(smaller degree), so serving never
+    rescans history; observe_batch() does the same for a whole chunk with
+    array operations. Past max_edges, the least recently used half of the
+    edges is dropped in one rebuild."""
+
+    # Candidate middle nodes checked at once by observe_batch()'s cycle search
+    CYCLE_BLOCK = 1 << 20
+
+    # Edges kept by default before the oldest half is pruned
+    MAX_EDGES = 1_000_000
+
+    def __init__(self, window_seconds=86400.0, max_edges=MAX_EDGES):
+        self.window_seconds = window_seconds
+        self.max_edges = max_edges
+        self.reset()
+
+    def __len__(self):
+        return len(self.addresses)
+
+    @property
+    def edge_count(self):
+        return len(self.edges)
+
+    def reset(self):
+        self.nodes = {}       # address -> node id
+        self.addresses = []   # node id -> address
+        # (sender id << 32 | receiver id) -> edge id, and per edge id its
+        # endpoints and the last time it was used
+        self.edges = {}
+        self.edge_sender = np.empty(1024, dtype=np.int64)
+        self.edge_receiver = np.empty(1024, dtype=np.int64)
+        self.edge_last_seen = np.empty(1024, dtype=np.float64)
+        self.outgoing = AdjacencyBlocks()
+        self.incoming = AdjacencyBlocks()
+
+    def observe(self, sender, receiver, timestamp):
+        """Record one transaction and return its features, all describing the
+        history before it: (sender_fan_out, receiver_fan_in,
+        sender_recent_receivers, receiver_recent_senders, cycle_length).
+        Fan-out/fan-in count distinct counterparties, the recent ones those
+        within window_seconds of timestamp; cycle_length is 2 if receiver has
+        paid sender, 3 if it paid someone who paid sender, else 0."""
+        s = self._node(sender)
+        r = self._node(receiver)
+        features = self._features(s, r, timestamp)
+
+        key = s << 32 | r
+        edge = self.edges.get(key)
+        if edge is None:
+            if len(self.edges) >= self.max_edges:
+                self.prune(len(self.edges) // 2)
+                s, r = self._node(sender), self._node(receiver)
+                key = s << 32 | r
+            edge = self._add_edge(key, s, r, timestamp)
+        elif timestamp > self.edge_last_seen[edge]:
+            self.edge_last_seen[edge] = timestamp
+        return features
+
+    def observe_batch(self, senders, receivers, seconds):
+        """observe() for many transactions, in the order given: an (n, 5) array
+        whose rows are exactly what observe() would return one by one. Rows
+        should be in time order, as _stream_profiles() sorts them; if they
+        are not, they go through observe() one at a time."""
+        seconds = np.asarray(seconds, dtype=np.float64)
+        n = len(seconds)
+        features = np.zeros((n, 5))
+        if n > 1 and np.any(seconds[1:] < seconds[:-1]):
+            for i in range(n):
+                features[i] = self.observe(senders[i], receivers[i], seconds[i])
+            return features
+
+        start = 0
+        while start < n:
+            start += self._observe_run(senders[start:], receivers[start:], seconds[start:], features[start:])
+            if start < n:
+                # This row's new edge needs a prune first, which observe() does
+                features[start] = self.observe(senders[start], receivers[start], seconds[start])
+                start += 1
+        return features
+
+    def _observe_run(self, senders, receivers, seconds, features):
+        # observe_batch() for rows up to the first whose new edge would go past
+        # max_edges; fills in their features and returns how many rows that was.
+        #
+        # A run has no prune inside it, so node and edge ids only grow and the
+        # features of row i depend only on the graph before the run and on
+        # rows j < i of the run. What the code below relies on:
+        #  - An edge exists before row i iff it was in the graph before the
+        #    run or the row creating it is < i.
+        #  - Fan-out (fan-in) of row i's node counts its out (in) edges that
+        #    exist before row i: its degree before the run plus the edges it
+        #    created at rows < i.
+        #  - Rows are in time order, so since = seconds - window_seconds never
+        #    decreases: an edge that is out of the window at row i stays out
+        #    until its next use.
+        #  - The last use row i sees for an edge is the larger of its last use
+        #    before the run (-inf if new) and its latest use at a row < i; a
+        #    row using an edge still sees the previous value.
+        #  - So each edge counts as recent on disjoint row intervals, "covers":
+        #    [0, min(first use + 1, expiry)) if it was in the graph before the
+        #    run, and [j + 1, min(next use + 1, expiry)) after each use at row
+        #    j, where expiry is the first row whose since passes the last use
+        #    the cover starts with. A row's recent counterparties are the
+        #    covers of its node's edges that contain it (_covering()).
+        #  - Cycle checks ask whether edges exist before row i, as above.
+        n = len(seconds)
+        nodes_before = len(self.addresses)
+        edges_before = len(self.edges)
+
+        # Node ids, new addresses numbered in the order observe() meets them
+        addresses = np.empty(2 * n, dtype=object)
+        addresses[0::2] = senders
+        addresses[1::2] = receivers
+        codes, uniques = pd.factorize(addresses)
+        uniques = np.asarray(uniques, dtype=object)
+        node = np.fromiter((self.nodes.get(address, -1) for address in uniques.tolist()),
+                           dtype=np.int64, count=len(uniques))
+        fresh = node < 0
+        node[fresh] = nodes_before + np.arange(int(fresh.sum()))
+        s, r = node[codes[0::2]], node[codes[1::2]]
+
+        # Edge ids, new pairs numbered in the order of the rows creating them
+        keys, first_row, key_index = np.unique(s << 32 | r, return_index=True, return_inverse=True)
+        edge = np.fromiter((self.edges.get(key, -1) for key in keys.tolist()), dtype=np.int64, count=len(keys))
+        known = np.flatnonzero(edge >= 0)
+        new_keys = np.flatnonzero(edge < 0)
+        new_keys = new_keys[np.argsort(first_row[new_keys], kind='stable')]
+        room = max(self.max_edges - edges_before, 0)
+        if len(new_keys) > room:
+            stop = int(first_row[new_keys[room]])
+            if stop:
+                self._observe_run(senders[:stop], receivers[:stop], seconds[:stop], features[:stop])
+            return stop
+        edge[new_keys] = edges_before + np.arange(len(new_keys))
+        row_edge = edge[key_index]
+        created = {
+            'row': first_row[new_keys], 'key': keys[new_keys],
+            'sender': s[first_row[new_keys]], 'receiver': r[first_row[new_keys]]
+        }
+
+        # Next use of each row's edge (n if none), the last use each use
+        # leaves behind, and the first use of edges already in the graph
+        since = seconds - self.window_seconds
+        order = np.argsort(row_edge, kind='stable')
+        repeated = row_edge[order[1:]] == row_edge[order[:-1]]
+        next_use = np.full(n, n)
+        next_use[order[:-1][repeated]] = order[1:][repeated]
+        last_seen = np.full(n, -np.inf)
+        old = row_edge < edges_before
+        last_seen[old] = self.edge_last_seen[row_edge[old]]
+        last_seen = np.maximum(last_seen, seconds)
+        old_edges = edge[known]
+        order = np.argsort(old_edges)
+        old_edges, old_first_use = old_edges[order], first_row[known][order]
+
+        def counterparties(row_node, blocks, created_node):
+            # Distinct counterparties of each row's node before the row: all of
+            # them, and those within the window
+            total = blocks.lengths(row_node) + _covering(
+                row_node, created_node, created['row'] + 1, np.full(len(created_node), n), n
+            )
+            owner, edges = blocks.gather(np.unique(row_node[row_node < nodes_before]))
+            until = np.minimum(_lookup(old_edges, old_first_use, edges, n) + 1,
+                               np.searchsorted(since, self.edge_last_seen[edges], side='right'))
+            after_use = np.minimum(np.minimum(next_use + 1, n), np.searchsorted(since, last_seen, side='right'))
+            recent = _covering(
+                row_node,
+                np.concatenate([owner, row_node]),
+                np.concatenate([np.zeros(len(owner), dtype=np.int64), np.arange(1, n + 1)]),
+                np.concatenate([until, after_use]),
+                n
+            )
+            return total, recent
+
+        features[:, 0], features[:, 2] = counterparties(s, self.outgoing, created['sender'])
+        features[:, 1], features[:, 3] = counterparties(r, self.incoming, created['receiver'])
+        features[:, 4] = self._batch_cycles(s, r, nodes_before, created)
+
+        # Record the batch: new addresses, new edges, then each edge's last use
+        self.addresses.extend(uniques[fresh].tolist())
+        self.nodes.update(zip(uniques[fresh].tolist(), node[fresh].tolist()))
+        edges_after = edges_before + len(new_keys)
+        if edges_after > len(self.edge_sender):
+            capacity = max(2 * len(self.edge_sender), edges_after)
+            for name in ('edge_sender', 'edge_receiver', 'edge_last_seen'):
+                values = getattr(self, name)
+                grown = np.empty(capacity, dtype=values.dtype)
+                grown[:edges_before] = values[:edges_before]
+                setattr(self, name, grown)
+        new_edges = np.arange(edges_before, edges_after)
+        self.edges.update(zip(created['key'].tolist(), new_edges.tolist()))
+        self.edge_sender[new_edges] = created['sender']
+        self.edge_receiver[new_edges] = created['receiver']
+        self.edge_last_seen[new_edges] = seconds[created['row']]
+        np.maximum.at(self.edge_last_seen, row_edge, seconds)
+        self.outgoing.extend(created['sender'], new_edges)
+        self.incoming.extend(created['receiver'], new_edges)
+        return n
+
+    def _batch_cycles(self, s, r, nodes_before, created):
+        # _cycle_length() of every row of _observe_run(), each against the
+        # graph as it was before that row
+        n = len(s)
+        rows = np.arange(n)
+
+        # Edges already in the graph a check can ask about: every one asked
+        # about leaves a row's receiver or enters its sender
+        _, leaving = self.outgoing.gather(np.unique(r[r < nodes_before]))
+        _, entering = self.incoming.gather(np.unique(s[s < nodes_before]))
+        old = np.unique(np.concatenate([leaving, entering]))
+        old_keys = np.sort(self.edge_sender[old] << 32 | self.edge_receiver[old])
+        by_key = np.argsort(created['key'])
+        new_keys, new_rows = created['key'][by_key], created['row'][by_key]
+
+        def exists(keys, before):
+            # Whether each edge was in the graph before the matching row
+            return (_lookup(old_keys, np.ones(len(old_keys), dtype=bool), keys, False) |
+                    (_lookup(new_keys, new_rows, keys, n) < before))
+
+        cycles = np.where(exists(r << 32 | s, rows), 2, 0)
+
+        def created_before(created_node, nodes, before):
+            # Position in the (node, row) order of the edges created from (or
+            # to) each of nodes, and how many of them before the given rows
+            order = np.lexsort((created['row'], created_node))
+            position = created_node[order] * (n + 1) + created['row'][order]
+            first = np.searchsorted(position, nodes * (n + 1))
+            return order, first, np.searchsorted(position, nodes * (n + 1) + before) - first
+
+        out_order, out_first, out_created = created_before(created['sender'], r, rows)
+        in_order, in_first, in_created = created_before(created['receiver'], s, rows)
+        out_degree = self.outgoing.lengths(r) + out_created
+        in_degree = self.incoming.lengths(s) + in_created
+
+        # Like _cycle_length(), walk whichever side is smaller: the receiver's
+        # payees looking for one that paid the sender, or the other way round
+        check = (cycles == 0) & (out_degree > 0) & (in_degree > 0)
+        from_receiver = out_degree <= in_degree
+        sides = [
+            (check & from_receiver, r, self.outgoing, self.edge_receiver, out_order, out_first, out_created,
+             created['receiver'], lambda middle, row: middle << 32 | s[row]),
+            (check & ~from_receiver, s, self.incoming, self.edge_sender, in_order, in_first, in_created,
+             created['sender'], lambda middle, row: r[row] << 32 | middle)
+        ]
+        for mask, node, blocks, endpoint, order, first, count, created_endpoint, key in sides:
+            checked = np.flatnonzero(mask)
+            lengths = blocks.lengths(node[checked])
+            starts = blocks.start[np.where(node[checked] < len(blocks.length), node[checked], 0)]
+            # Bounded blocks of rows, so the candidate arrays stay small
+            block = np.cumsum(lengths + count[checked]) // self.CYCLE_BLOCK
+            for part in np.split(np.arange(len(checked)), np.flatnonzero(np.diff(block)) + 1):
+                if not len(part):
+                    continue
+                row_of, old_count = checked[part], lengths[part]
+                new_count = count[row_of]
+                middle = np.concatenate([
+                    endpoint[blocks.data[np.repeat(starts[part], old_count) + _offsets(old_count)]],
+                    created_endpoint[order[np.repeat(first[row_of], new_count) + _offsets(new_count)]]
+                ])
+                candidate_row = np.concatenate([np.repeat(row_of, old_count), np.repeat(row_of, new_count)])
+                cycles[np.unique(candidate_row[exists(key(middle, candidate_row), candidate_row)])] = 3
+        return cycles
+
+    def peek(self, sender, receiver, timestamp):
+        # Features observe() would return, without recording the transaction
+        s = self.nodes.get(sender, -1)
+        r = self.nodes.get(receiver, -1)
+        if s < 0 and r < 0:
+            return 0, 0, 0, 0, 0
+        return self._features(s, r, timestamp)
+
+    def _features(self, s, r, timestamp):
+        since = timestamp - self.window_seconds
+        sender_edges = self.outgoing.get(s) if s >= 0 else self.outgoing.data[:0]
+        receiver_edges = self.incoming.get(r) if r >= 0 else self.incoming.data[:0]
+        return (
+            len(sender_edges),
+            len(receiver_edges),
+            int(np.count_nonzero(self.edge_last_seen[sender_edges] >= since)) if len(sender_edges) else 0,
+            int(np.count_nonzero(self.edge_last_seen[receiver_edges] >= since)) if len(receiver_edges) else 0,
+            self._cycle_length(s, r) if s >= 0 and r >= 0 else 0
+        )
+
+    def _cycle_length(self, s, r):
+        # Shortest cycle sender -> receiver would close, up to three hops
+        if (r << 32 | s) in self.edges:
+            return 2
+        paid_by_receiver = self.outgoing.get(r)
+        paid_sender = self.incoming.get(s)
+        if not len(paid_by_receiver) or not len(paid_sender):
+            return 0
+        # Look the other side up edge by edge from whichever side is smaller
+        edges = self.edges
+        if len(paid_by_receiver) <= len(paid_sender):
+            for middle in self.edge_receiver[paid_by_receiver].tolist():
+                if (middle << 32 | s) in edges:
+                    return 3
+        else:
+            for middle in self.edge_sender[paid_sender].tolist():
+                if (r << 32 | middle) in edges:
+                    return 3
+        return 0
+
+    def _node(self, address):
+        node = self.nodes.get(address)
+        if node is None:
+            node = self.nodes[address] = len(self.addresses)
+            self.addresses.append(address)
+        return node
+
+    def _add_edge(self, key, s, r, timestamp):
+        edge = len(self.edges)
+        if edge == len(self.edge_sender):
+            for name in ('edge_sender', 'edge_receiver', 'edge_last_seen'):
+                values = getattr(self, name)
+                grown = np.empty(2 * len(values), dtype=values.dtype)
+                grown[:edge] = values
+                setattr(self, name, grown)
+        self.edges[key] = edge
+        self.edge_sender[edge] = s
+        self.edge_receiver[edge] = r
+        self.edge_last_seen[edge] = timestamp
+        self.outgoing.append(s, edge)
+        self.incoming.append(r, edge)
+        return edge
+
+    def prune(self, keep):
+        # Keep the keep most recently used edges and the addresses they touch,
+        # renumbering both; returns the number of edges dropped
+        n = len(self.edges)
+        if keep >= n:
+            return 0
+        kept = np.sort(np.argsort(-self.edge_last_seen[:n], kind='stable')[:keep])
+        self._rebuild(
+            np.array(self.addresses, dtype=object),
+            self.edge_sender[kept], self.edge_receiver[kept], self.edge_last_seen[kept]
+        )
+        return n - keep
+
+    def _rebuild(self, addresses, senders, receivers, last_seen):
+        # Replace the graph with the given edges, in order, over the addresses
+        # they reference
+        used, inverse = np.unique(np.concatenate([senders, receivers]), return_inverse=True)
+        senders, receivers = inverse[:len(senders)], inverse[len(senders):]
+        self.addresses = [addresses[node] for node in used.tolist()]
+        self.nodes = {address: node for node, address in enumerate(self.addresses)}
+
+        n = len(senders)
+        capacity = max(1024, 2 * n)
+        self.edge_sender = np.empty(capacity, dtype=np.int64)
+        self.edge_receiver = np.empty(capacity, dtype=np.int64)
+        self.edge_last_seen = np.empty(capacity, dtype=np.float64)
+        self.edge_sender[:n] = senders
+        self.edge_receiver[:n] = receivers
+        self.edge_last_seen[:n] = last_seen
+        self.edges = dict(zip((senders << 32 | receivers).tolist(), range(n)))
+        self.outgoing = AdjacencyBlocks.from_keys(senders, len(used))
+        self.incoming = AdjacencyBlocks.from_keys(receivers, len(used))
+
+    @classmethod
+    def merged(cls, first, second):
+        # The union of both graphs' edges, each with its later last-used time,
+        # trimmed to second's max_edges: the AddressProfileStore.merged() of
+        # graphs grown by processes that started from the same saved state
+        graph = cls(window_seconds=second.window_seconds, max_edges=second.max_edges)
+        edges = []
+        for g in (first, second):
+            n = len(g.edges)
+            addresses = np.array(g.addresses, dtype=object)
+            edges.append((addresses[g.edge_sender[:n]], addresses[g.edge_receiver[:n]], g.edge_last_seen[:n]))
+        senders, receivers, last_seen = (np.concatenate(column) for column in zip(*edges))
+        if not len(senders):
+            return graph
+
+        addresses, inverse = np.unique(np.concatenate([senders, receivers]), return_inverse=True)
+        senders, receivers = inverse[:len(senders)], inverse[len(senders):]
+        # Latest use of each (sender, receiver) pair, oldest pairs first
+        key = senders * len(addresses) + receivers
+        order = np.lexsort((last_seen, key))
+        last = np.flatnonzero(np.append(key[order][1:] != key[order][:-1], True))
+        keep = order[last]
+        keep = keep[np.argsort(last_seen[keep], kind='stable')][-graph.max_edges:]
+        graph._rebuild(addresses, senders[keep], receivers[keep], last_seen[keep])
+        return graph
+
+    def state(self):
+        # Plain arrays for np.savez, like AddressProfileStore.state()
+        n = len(self.edges)
+        return {
+            'addresses': np.array(self.addresses, dtype=str),
+            'edge_sender': self.edge_sender[:n].copy(),
+            'edge_receiver': self.edge_receiver[:n].copy(),
+            'edge_last_seen': self.edge_last_seen[:n].copy(),
+            'config': np.array([self.window_seconds, self.max_edges])
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        window_seconds, max_edges = state['config']
+        graph = cls(window_seconds=float(window_seconds), max_edges=int(max_edges))
+        if len(state['edge_sender']):
+            graph._rebuild(
+                [str(address) for address in state['addresses']],
+                np.asarray(state['edge_sender'], dtype=np.int64),
+                np.asarray(state['edge_receiver'], dtype=np.int64),
+                state['edge_last_seen']
+            )
+        return graph
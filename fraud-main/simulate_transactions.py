@@ -1,5 +1,9 @@
-from integration.blockchain_interface import BlockchainInterface
+from integration.chain_backends import shared_chain, CHAIN_BACKENDS, DEFAULT_NODE_URL
 from web3 import Web3
+import numpy as np
+import threading
+import queue
+import functools
 import random
 import argparse
 import time
@@ -7,33 +11,131 @@ import datetime
 import csv
 import os
 
-def create_blockchain_transaction():
-    """Create a transaction directly on the blockchain with random fraud status"""
-    blockchain = BlockchainInterface()
-    
-    # Randomly determine if this transaction should be fraudulent 
-    is_fraud = random.random() < 0.9
+# The columns of data/sample_transactions.csv, then the transaction's id on chain
+CSV_COLUMNS = ['sender', 'receiver', 'amount', 'timestamp', 'is_fraud', 'transaction_id']
+
+# Ground truth of the transactions sent to the chain; kept apart from the
+# generated training data, whose rows have no transaction id
+DEFAULT_CSV = os.path.join('data', 'chain_transactions.csv')
+
+def random_transaction(fraud_rate):
+    """Random transaction following the amount criteria of generate_sample_data.py;
+    returns (receiver, amount, is_fraud). The sender and timestamp are the
+    chain's: the sending account and the block time."""
+    is_fraud = random.random() < fraud_rate
     
-    # Generate transaction details
-    sender_address = '0x' + ''.join(random.choices('0123456789abcdef', k=40))
     receiver_address = Web3.to_checksum_address('0x' + ''.join(random.choices('0123456789abcdef', k=40)))
     
-    # Generate amount based on fraud criteria from generate_sample_data.py
     # Fraudulent transactions often have high amounts (>8000)
     if is_fraud:
         amount = random.randint(8000, 10000)
     else:
         amount = random.randint(100, 5000)
     
-    # Generate timestamp
-    now = datetime.datetime.now()
-    if is_fraud:
-        hour = random.choice(list(range(0, 8)) + list(range(18, 24)))
-    else:
-        hour = random.randint(9, 17)
-    minute = random.randint(0, 59)
-    timestamp = now.replace(hour=hour, minute=minute)
-    timestamp_str = timestamp.strftime('%Y-%m-%d %H:%M:%S')
+    return receiver_address, amount, is_fraud
+
+def ground_truth_row(transaction, is_fraud):
+    # CSV row for a transaction as read back from the chain, so the CSV holds
+    # what the monitor scores
+    timestamp = datetime.datetime.fromtimestamp(transaction['timestamp'])
+    return [transaction['sender'], transaction['receiver'], transaction['amount'],
+            timestamp.strftime('%Y-%m-%d %H:%M:%S'), 1 if is_fraud else 0, transaction['id']]
+
+def open_ground_truth(path):
+    # Start the CSV with its header, or check an existing one has our columns
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w', newline='') as f:
+            csv.writer(f).writerow(CSV_COLUMNS)
+        return
+    with open(path, newline='') as f:
+        header = next(csv.reader(f), [])
+    if header != CSV_COLUMNS:
+        raise ValueError(f"{path} has columns {header}, not {CSV_COLUMNS}; choose another --csv")
+
+class GroundTruthWriter:
+    """Appends ground-truth CSV rows of confirmed transactions in batches of
+    batch_rows: add() takes the on-chain id and the fraud label, and each batch
+    is read back from the chain (one get_transactions call per run of
+    consecutive ids) before it is written. add() only queues the id, so it may
+    be called from any thread, including the submitter's confirmer; the reads
+    and writes happen on the writer's own thread."""
+    
+    def __init__(self, path, blockchain, batch_rows=1000):
+        self.path = path
+        self.blockchain = blockchain
+        self.batch_rows = batch_rows
+        self.written = 0
+        self.failed = 0  # rows lost to failed reads or writes
+        open_ground_truth(path)
+        
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._write_loop, name='ground-truth-writer', daemon=True)
+        self._thread.start()
+    
+    def add(self, transaction_id, is_fraud):
+        self._queue.put((transaction_id, is_fraud))
+    
+    def flush(self):
+        # Wait until everything added so far is written
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait()
+    
+    def close(self):
+        # Write what is left and stop the writer thread
+        self._queue.put(None)
+        self._thread.join()
+    
+    def _write_loop(self):
+        labels = {}  # transaction id -> is_fraud
+        while True:
+            item = self._queue.get()
+            if isinstance(item, tuple):
+                transaction_id, is_fraud = item
+                labels[transaction_id] = is_fraud
+                if len(labels) >= self.batch_rows:
+                    self._write(labels)
+                    labels = {}
+                continue
+            
+            # A flush or close: write the partial batch
+            self._write(labels)
+            labels = {}
+            if item is None:
+                return
+            item.set()
+    
+    def _write(self, labels):
+        if not labels:
+            return
+        try:
+            ids = sorted(labels)
+            rows = []
+            start = 0
+            while start < len(ids):
+                # Other senders' transactions may sit between ours; read each
+                # run of consecutive ids in one call
+                end = start
+                while end + 1 < len(ids) and ids[end + 1] == ids[end] + 1:
+                    end += 1
+                for transaction in self.blockchain.get_transactions(ids[start], ids[end]):
+                    rows.append(ground_truth_row(transaction, labels[transaction['id']]))
+                start = end + 1
+            with open(self.path, 'a', newline='') as f:
+                csv.writer(f).writerows(rows)
+            self.written += len(rows)
+        except Exception as e:
+            # Keep the thread alive for later batches; flush() must not hang
+            self.failed += len(labels)
+            print(f"❌ Error recording {len(labels)} transactions in {self.path}: {e}")
+
+def create_blockchain_transaction(fraud_rate=0.3, csv_path=DEFAULT_CSV, blockchain=None):
+    """Create a transaction directly on the blockchain with random fraud status"""
+    # One connection, contract and account lookup for the whole process
+    blockchain = blockchain or shared_chain()
+    
+    receiver_address, amount, is_fraud = random_transaction(fraud_rate)
     
     print("\n" + "="*60)
     print(f"[{datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] BLOCKCHAIN TRANSACTION")
@@ -49,12 +151,13 @@ def create_blockchain_transaction():
         print(f"Transaction ID: {tx_id}")
         print(f"Block confirmation time: {datetime.datetime.now().strftime('%H:%M:%S')}")
         
-        # Add transaction to CSV file
-        csv_path = os.path.join('data', 'sample_transactions.csv')
+        # Add the transaction as mined to the CSV file
         try:
+            row = ground_truth_row(blockchain.get_transaction(tx_id), is_fraud)
+            open_ground_truth(csv_path)
             with open(csv_path, 'a', newline='') as f:
                 writer = csv.writer(f)
-                writer.writerow([sender_address, receiver_address, amount, timestamp_str, 1 if is_fraud else 0])
+                writer.writerow(row)
             print(f"✅ Transaction also recorded in CSV file")
         except Exception as e:
             print(f"❌ Error adding to CSV: {e}")
@@ -68,6 +171,95 @@ def create_blockchain_transaction():
         print("="*60 + "\n")
         return None, is_fraud
 
+def generate_load(blockchain, count, fraud_rate=0.3, tps=None, concurrency=64, writer=None, progress_every=5.0):
+    """Send count transactions paced at tps per second (None: as fast as
+    possible) with at most concurrency of them unconfirmed at once; the
+    client's submitter assigns nonces locally, so sends never wait on the
+    node. Confirmed transactions go to writer. Returns the run's statistics."""
+    # Let the submitter hold as many unconfirmed transactions as we allow,
+    # whether or not an earlier caller already started it
+    blockchain.reserve_in_flight(concurrency)
+    in_flight = threading.BoundedSemaphore(concurrency)
+    latencies = []
+    failures = []
+    fraud_count = 0
+    
+    def confirmed(is_fraud, submitted, future):
+        # Runs on the submitter's thread (or at once for resolved futures)
+        try:
+            if future.exception() is None:
+                latencies.append(time.perf_counter() - submitted)
+                if writer is not None:
+                    writer.add(future.result(), is_fraud)
+            else:
+                failures.append(future.exception())
+        finally:
+            in_flight.release()
+    
+    interval = 1.0 / tps if tps else 0.0
+    start = time.perf_counter()
+    next_report = start + progress_every
+    for sent in range(count):
+        if interval:
+            # Send i is due at start + i / tps; late sends go out at once
+            delay = start + sent * interval - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        in_flight.acquire()
+        
+        receiver, amount, is_fraud = random_transaction(fraud_rate)
+        fraud_count += is_fraud
+        submitted = time.perf_counter()
+        try:
+            future = blockchain.add_transaction_async(receiver, amount)
+        except Exception as e:
+            failures.append(e)
+            in_flight.release()
+            continue
+        future.add_done_callback(functools.partial(confirmed, is_fraud, submitted))
+        
+        now = time.perf_counter()
+        if now >= next_report:
+            print(f"Sent {sent + 1}/{count}, confirmed {len(latencies)}, failed {len(failures)}, "
+                  f"{len(latencies) / (now - start):.1f} tx/s confirmed")
+            next_report = now + progress_every
+    send_seconds = time.perf_counter() - start
+    
+    # Wait for every send to confirm or fail
+    for _ in range(concurrency):
+        in_flight.acquire()
+    total_seconds = time.perf_counter() - start
+    if writer is not None:
+        writer.flush()
+    
+    return {
+        'sent': count,
+        'confirmed': len(latencies),
+        'failed': len(failures),
+        'errors': failures[:5],
+        'fraud_count': fraud_count,
+        'send_seconds': send_seconds,
+        'total_seconds': total_seconds,
+        'latencies_ms': np.array(latencies) * 1000
+    }
+
+def print_load_report(stats, tps=None):
+    print(f"\n===== LOAD REPORT =====")
+    print(f"Sent: {stats['sent']}, confirmed: {stats['confirmed']}, failed: {stats['failed']}")
+    print(f"Fraud mix: {stats['fraud_count']} fraudulent ({stats['fraud_count'] / max(stats['sent'], 1):.1%}), "
+          f"{stats['sent'] - stats['fraud_count']} normal")
+    target = f" (target {tps:g})" if tps else ""
+    print(f"Submit rate: {stats['sent'] / stats['send_seconds']:.1f} tx/s{target}")
+    print(f"Achieved TPS: {stats['confirmed'] / stats['total_seconds']:.1f} confirmed tx/s "
+          f"over {stats['total_seconds']:.1f}s")
+    if len(stats['latencies_ms']):
+        p50, p95, p99 = np.percentile(stats['latencies_ms'], [50, 95, 99])
+        print(f"Confirmation latency: p50 {p50:.1f} ms, p95 {p95:.1f} ms, p99 {p99:.1f} ms, "
+              f"max {stats['latencies_ms'].max():.1f} ms")
+    for error in stats['errors']:
+        print(f"❌ {error}")
+    print("=======================")
+
 def append_to_csv(is_fraud=False):
     """Add a new transaction to the CSV file"""
     csv_path = os.path.join('data', 'sample_transactions.csv')
@@ -123,39 +315,65 @@ def append_to_csv(is_fraud=False):
 def main():
     parser = argparse.ArgumentParser(description="Generate test blockchain transactions for fraud detection")
     parser.add_argument('--count', type=int, default=1, help='Number of transactions to generate')
-    parser.add_argument('--delay', type=float, default=0.0, help='Delay between transactions in seconds (0 for no delay)')
+    parser.add_argument('--delay', type=float, default=0.0,
+                        help='Send one transaction at a time, printing each, this many seconds apart (0: load mode)')
     parser.add_argument('--fraud-rate', type=float, default=0.3, help='Probability of fraud (0.0 to 1.0, default: 0.3)')
+    parser.add_argument('--tps', type=float, help='Target transactions per second in load mode (default: unlimited)')
+    parser.add_argument('--concurrency', type=int, default=64,
+                        help='Most transactions awaiting confirmation at once in load mode (default: 64)')
+    parser.add_argument('--csv', default=DEFAULT_CSV,
+                        help=f'Ground-truth CSV the sent transactions are appended to, as read back from '
+                             f'the chain with their ids (default: {DEFAULT_CSV})')
+    parser.add_argument('--csv-batch', type=int, default=1000, help='Rows buffered per CSV write in load mode')
+    parser.add_argument('--no-csv', action='store_true', help='Do not record the sent transactions')
+    parser.add_argument('--chain', choices=CHAIN_BACKENDS, default='node',
+                        help='node, or an in-process eth-tester EVM or memory ledger to measure the sender alone')
+    parser.add_argument('--rpc-url', default=DEFAULT_NODE_URL,
+                        help=f'HTTP, WebSocket or IPC endpoint of the node (default: {DEFAULT_NODE_URL})')
     
     args = parser.parse_args()
+    blockchain = shared_chain(args.chain, args.rpc_url)
     
-    # Set the fraud rate
-    global fraud_rate
-    fraud_rate = args.fraud_rate
-    
-    print(f"Generating {args.count} blockchain transactions with {args.fraud_rate*100:.1f}% chance of fraud")
-    
-    # Track fraud statistics
-    fraud_count = 0
-    normal_count = 0
-    
-    for i in range(args.count):
-        if i > 0 and args.delay > 0:
-            print(f"Waiting {args.delay} seconds before next transaction...")
-            time.sleep(args.delay)
+    if args.delay > 0:
+        # Demo mode: one transaction at a time, each printed
+        print(f"Generating {args.count} blockchain transactions with {args.fraud_rate*100:.1f}% chance of fraud")
+        fraud_count = 0
+        normal_count = 0
+        
+        for i in range(args.count):
+            if i > 0:
+                print(f"Waiting {args.delay} seconds before next transaction...")
+                time.sleep(args.delay)
+                
+            print(f"Creating blockchain transaction {i+1}/{args.count}")
+            _, is_fraud = create_blockchain_transaction(args.fraud_rate, args.csv, blockchain)
             
-        print(f"Creating blockchain transaction {i+1}/{args.count}")
-        _, is_fraud = create_blockchain_transaction()
+            # Update statistics
+            if is_fraud:
+                fraud_count += 1
+            else:
+                normal_count += 1
         
-        # Update statistics
-        if is_fraud:
-            fraud_count += 1
-        else:
-            normal_count += 1
-    
-    print(f"Completed generating {args.count} transactions.")
-    print(f"Statistics: {fraud_count} fraudulent, {normal_count} normal")
-    print(f"Actual fraud rate: {fraud_count/args.count*100:.1f}%")
-    print("Run 'python app.py --mode monitor' to detect these transactions.")
+        print(f"Completed generating {args.count} transactions.")
+        print(f"Statistics: {fraud_count} fraudulent, {normal_count} normal")
+        print(f"Actual fraud rate: {fraud_count/args.count*100:.1f}%")
+    else:
+        writer = None if args.no_csv else GroundTruthWriter(args.csv, blockchain, args.csv_batch)
+        rate = f"at {args.tps:g} tx/s" if args.tps else "as fast as possible"
+        print(f"Sending {args.count} transactions {rate}, at most {args.concurrency} in flight, "
+              f"{args.fraud_rate*100:.1f}% fraudulent")
+        
+        stats = generate_load(blockchain, args.count, args.fraud_rate, args.tps, args.concurrency, writer)
+        blockchain.close()
+        print_load_report(stats, args.tps)
+        if writer is not None:
+            writer.close()
+            print(f"Recorded {writer.written} confirmed transactions in {args.csv}")
+            if writer.failed:
+                print(f"❌ {writer.failed} confirmed transactions could not be recorded")
+    
+    if args.chain == 'node':
+        print("Run 'python app.py --mode monitor' to detect these transactions.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
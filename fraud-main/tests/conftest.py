@@ -0,0 +1,6 @@
+# The modules import each other from the project root (ml.model,
+# integration.blockchain_interface), as when the scripts run from fraud-main
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,49 @@
+from ml.compact import _auc_rows, compaction_candidates, greedy_tree_order
+from ml.forest_engine import CompiledForest
+from sklearn.datasets import make_classification
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import roc_auc_score
+from sklearn.model_selection import train_test_split
+import numpy as np
+import pytest
+
+@pytest.fixture(scope='module')
+def forest():
+    X, y = make_classification(n_samples=6000, n_features=12, n_informative=6, weights=[0.9],
+                               flip_y=0.02, random_state=0)
+    X_train, X_rest, y_train, y_rest = train_test_split(X, y, test_size=0.5, random_state=0, stratify=y)
+    X_select, X_report, y_select, y_report = train_test_split(X_rest, y_rest, test_size=0.5,
+                                                              random_state=0, stratify=y_rest)
+    model = RandomForestClassifier(n_estimators=40, max_depth=12, random_state=0).fit(X_train, y_train)
+    engine = CompiledForest.from_sklearn(model)
+    return engine, X_select, y_select.astype(bool), X_report, y_report.astype(bool)
+
+def test_binned_auc_matches_exact_auc(forest):
+    engine, X_select, y_select, _, _ = forest
+    tree_proba = engine.value[engine.apply(X_select)].T
+    scores = np.vstack([tree_proba[:5], tree_proba.mean(axis=0)])
+
+    exact = [roc_auc_score(y_select, row) for row in scores]
+    np.testing.assert_allclose(_auc_rows(scores, y_select), exact, atol=1e-3)
+
+def test_greedy_order_starts_with_the_best_single_tree(forest):
+    engine, X_select, y_select, _, _ = forest
+    tree_proba = engine.value[engine.apply(X_select)].T
+    order = greedy_tree_order(tree_proba, y_select, 10)
+
+    assert len(set(order)) == 10
+    single = [roc_auc_score(y_select, row) for row in tree_proba]
+    assert single[order[0]] == pytest.approx(max(single), abs=1e-3)
+
+def test_compacted_forest_keeps_auc_within_tolerance(forest):
+    engine, X_select, y_select, X_report, y_report = forest
+    full_auc = roc_auc_score(y_report, engine.predict_fraud_proba(X_report))
+
+    candidates = compaction_candidates(engine, X_select, y_select, [engine.max_depth], max_trees=20)
+    subsets = [(cut, trees) for cut, trees, _ in candidates if trees == 20]
+    assert len(subsets) == 1
+    cut, _ = subsets[0]
+    assert cut.n_trees == 20
+
+    # Half the trees, picked on the selection half, lose little on the report half
+    assert roc_auc_score(y_report, cut.predict_fraud_proba(X_report)) >= full_auc - 0.01
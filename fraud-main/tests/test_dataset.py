@@ -0,0 +1,39 @@
+from ml.dataset import convert_csv, TransactionDataset
+import pandas as pd
+import numpy as np
+
+def test_convert_csv_streams_chunks_into_one_dataset(tmp_path):
+    csv_path = str(tmp_path / 'transactions.csv')
+    rng = np.random.default_rng(3)
+    addresses = np.array([f'0xAbC{i:03d}' for i in range(40)])
+    df = pd.DataFrame({
+        'sender': addresses[rng.integers(0, 40, 1000)],
+        'receiver': addresses[rng.integers(0, 40, 1000)],
+        'amount': np.round(rng.uniform(1, 10_000, 1000), 2),
+        'timestamp': pd.date_range('2024-01-01', periods=1000, freq='min').astype(str),
+        'is_fraud': rng.integers(0, 2, 1000)
+    })
+    df.to_csv(csv_path, index=False)
+
+    dataset = convert_csv(csv_path, str(tmp_path / 'transactions'), chunk_rows=97)
+    assert len(dataset) == 1000
+    # One dictionary entry per lowercased address across all chunks
+    assert sorted(dataset.addresses) == sorted(np.char.lower(np.unique(df[['sender', 'receiver']].to_numpy().astype(str))))
+
+    frame = TransactionDataset.load(str(tmp_path / 'transactions')).to_frame()
+    assert list(frame['sender']) == list(df['sender'].str.lower())
+    assert list(frame['receiver']) == list(df['receiver'].str.lower())
+    np.testing.assert_array_equal(frame['amount'].to_numpy(), df['amount'].to_numpy())
+    np.testing.assert_array_equal(frame['is_fraud'].to_numpy(), df['is_fraud'].to_numpy())
+    assert list(frame['timestamp']) == list(pd.to_datetime(df['timestamp']))
+
+def test_convert_csv_without_labels(tmp_path):
+    csv_path = str(tmp_path / 'transactions.csv')
+    pd.DataFrame({
+        'sender': ['0xa', '0xb', '0xa'], 'receiver': ['0xb', '0xc', '0xc'],
+        'amount': [1.0, 2.0, 3.0], 'timestamp': ['2024-01-01 00:00:00'] * 3
+    }).to_csv(csv_path, index=False)
+
+    dataset = convert_csv(csv_path, str(tmp_path / 'transactions'), chunk_rows=2)
+    assert dataset.is_fraud is None
+    assert list(dataset.sender) == [0, 1, 0] and list(dataset.receiver) == [1, 2, 2]
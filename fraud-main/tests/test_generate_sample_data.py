@@ -0,0 +1,23 @@
+from generate_sample_data import generate_transactions
+from ml.dataset import TransactionDataset
+import pandas as pd
+import numpy as np
+
+def test_csv_and_dataset_outputs_hold_the_same_transactions(tmp_path):
+    csv_path = str(tmp_path / 'transactions.csv')
+    dataset_path = str(tmp_path / 'transactions')
+    options = {'rows': 5000, 'seed': 7, 'chunk_rows': 2000}
+    csv_fraud = generate_transactions(csv_path, output_format='csv', **options)
+    dataset_fraud = generate_transactions(dataset_path, output_format='npy', **options)
+    assert csv_fraud == dataset_fraud
+
+    from_csv = pd.read_csv(csv_path)
+    from_dataset = TransactionDataset.load(dataset_path).to_frame()
+    assert len(from_csv) == len(from_dataset) == 5000
+
+    # Amounts are whole cents, bit for bit the same in both formats
+    np.testing.assert_array_equal(from_csv['amount'].to_numpy(), from_dataset['amount'].to_numpy())
+    np.testing.assert_array_equal(np.round(from_csv['amount'].to_numpy(), 2), from_csv['amount'].to_numpy())
+    np.testing.assert_array_equal(from_csv['is_fraud'].to_numpy(), from_dataset['is_fraud'].to_numpy())
+    assert list(from_csv['sender']) == [str(address) for address in from_dataset['sender']]
+    assert list(pd.to_datetime(from_csv['timestamp'])) == list(pd.to_datetime(from_dataset['timestamp']))
@@ -0,0 +1,60 @@
+from integration.chain_backends import InMemoryLedger
+from integration.checkpoint import MonitorCheckpoint
+from integration.telemetry import Metrics
+from app import monitor_transactions
+
+class StopAfterCatchUp(InMemoryLedger):
+    # Ends a monitor run (as Ctrl+C would) on its first poll after the catch-up
+    # read, so each run is exactly one cycle over the backlog
+
+    def get_new_transaction_events(self, event_filter):
+        raise KeyboardInterrupt
+
+class ScriptedScorer:
+    # Stands in for MLInterface: odd ids are suspicious, and interrupt_at
+    # raises KeyboardInterrupt in the middle of the cycle
+
+    def __init__(self, interrupt_at=None):
+        self.metrics = Metrics()
+        self.interrupt_at = interrupt_at
+        self.scored = []
+
+    def analyze_transaction(self, transaction):
+        if transaction['id'] == self.interrupt_at:
+            raise KeyboardInterrupt
+        self.scored.append(transaction['id'])
+        return {'fraud_probability': 0.9 if transaction['id'] % 2 else 0.1}
+
+    def save_profiles(self):
+        pass
+
+def test_interrupted_cycle_is_rescored_and_flagged_on_restart(tmp_path):
+    ledger = StopAfterCatchUp()
+    checkpoint = MonitorCheckpoint(str(tmp_path / 'checkpoint.json'))
+    # Start from before the first transaction rather than from the chain head
+    checkpoint.save(ledger.contract_address, 0, 0,
+                    {'total_transactions': 0, 'fraud_count': 0, 'ml_correct': 0, 'ml_missed': 0}, {})
+    for amount in range(10):
+        ledger.add_transaction('0x' + '33' * 20, 100 + amount)
+
+    # Interrupted on id 6: ids 1, 3 and 5 were found suspicious but not yet flagged
+    first = ScriptedScorer(interrupt_at=6)
+    monitor_transactions(ledger, first, poll_interval=0, checkpoint=checkpoint)
+    assert first.scored == [1, 2, 3, 4, 5]
+    assert not any(tx['is_flagged'] for tx in ledger.get_transactions(1, 10))
+    state = checkpoint.load(ledger.contract_address)
+    assert state['last_checked_id'] == 0
+    assert state['stats']['total_transactions'] == 0
+
+    # The restart analyzes the whole cycle again and flags every suspicious id
+    second = ScriptedScorer()
+    monitor_transactions(ledger, second, poll_interval=0, checkpoint=checkpoint)
+    assert second.scored == list(range(1, 11))
+    flagged = [tx['id'] for tx in ledger.get_transactions(1, 10) if tx['is_flagged']]
+    assert flagged == [1, 3, 5, 7, 9]
+
+    state = checkpoint.load(ledger.contract_address)
+    assert state['last_checked_id'] == 10
+    assert state['stats']['total_transactions'] == 10
+    assert state['stats']['fraud_count'] == 5
+    assert state['pending_flags'] == {}
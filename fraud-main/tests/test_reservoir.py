@@ -0,0 +1,65 @@
+from ml.reservoir import ReservoirSample, StratifiedReservoir
+from scipy import stats
+import numpy as np
+import pytest
+
+STREAM = 1000
+CAPACITY = 100
+TRIALS = 2000
+
+def inclusion_counts(chunk_rows, seed):
+    # How often each stream position ends up in the sample over TRIALS runs
+    rng = np.random.default_rng(seed)
+    counts = np.zeros(STREAM, dtype=np.int64)
+    rows = np.arange(STREAM, dtype=np.float64)[:, None]
+    labels = np.zeros(STREAM, dtype=np.int8)
+    for _ in range(TRIALS):
+        reservoir = ReservoirSample(CAPACITY, 1, rng)
+        for start in range(0, STREAM, chunk_rows):
+            reservoir.add(rows[start:start + chunk_rows], labels[start:start + chunk_rows])
+        X, _ = reservoir.sample()
+        assert len(X) == CAPACITY
+        assert len(np.unique(X)) == CAPACITY
+        counts[X[:, 0].astype(np.int64)] += 1
+    return counts
+
+@pytest.mark.parametrize('chunk_rows', [7, 37, 250, STREAM])
+def test_every_row_is_equally_likely_to_be_kept(chunk_rows):
+    counts = inclusion_counts(chunk_rows, seed=chunk_rows)
+
+    # Each position is kept with probability CAPACITY / STREAM, whatever the
+    # chunking: no bias towards early rows, late rows or chunk boundaries
+    p = CAPACITY / STREAM
+    expected = TRIALS * p
+    statistic = (((counts - expected) ** 2) / (TRIALS * p * (1 - p))).sum()
+    assert statistic < stats.chi2.ppf(0.999, STREAM - 1)
+
+    first_half, second_half = counts[:STREAM // 2].sum(), counts[STREAM // 2:].sum()
+    assert abs(first_half - second_half) < 4 * np.sqrt(TRIALS * CAPACITY / 2)
+
+def test_short_stream_is_kept_whole_in_order():
+    rng = np.random.default_rng(0)
+    reservoir = ReservoirSample(CAPACITY, 2, rng)
+    X = np.arange(60, dtype=np.float64).reshape(30, 2)
+    y = np.arange(30, dtype=np.int8) % 2
+    reservoir.add(X[:10], y[:10])
+    reservoir.add(X[10:], y[10:])
+
+    sample_X, sample_y = reservoir.sample()
+    np.testing.assert_array_equal(sample_X, X)
+    np.testing.assert_array_equal(sample_y, y)
+    assert reservoir.seen == 30
+
+def test_stratified_reservoir_keeps_each_class_up_to_its_capacity():
+    rng = np.random.default_rng(1)
+    reservoir = StratifiedReservoir(50, 1, rng)
+    for _ in range(20):
+        y = (rng.random(1000) < 0.01).astype(np.int8)
+        reservoir.add(y[:, None].astype(np.float64), y)
+
+    counts = reservoir.counts()
+    assert counts[0][1] == 50
+    # The rare class is not crowded out by the common one
+    assert counts[1][1] == min(50, counts[1][0])
+    X, y = reservoir.sample()
+    np.testing.assert_array_equal(X[:, 0], y)
@@ -0,0 +1,91 @@
+from integration.chain_backends import InMemoryLedger, connect_chain
+from simulate_transactions import CSV_COLUMNS, GroundTruthWriter, generate_load
+import threading
+import datetime
+import csv
+import pytest
+
+def read_rows(path):
+    with open(path, newline='') as f:
+        return list(csv.DictReader(f))
+
+def test_ground_truth_is_read_back_from_the_chain(tmp_path):
+    ledger = InMemoryLedger()
+    path = str(tmp_path / 'ground_truth.csv')
+    writer = GroundTruthWriter(path, ledger, batch_rows=4)
+
+    stats = generate_load(ledger, 10, fraud_rate=0.5, writer=writer)
+    writer.close()
+    assert stats['confirmed'] == writer.written == 10
+
+    rows = read_rows(path)
+    assert list(rows[0]) == CSV_COLUMNS
+    assert [int(row['transaction_id']) for row in rows] == list(range(1, 11))
+    for row in rows:
+        transaction = ledger.get_transaction(int(row['transaction_id']))
+        assert row['sender'] == ledger.sender
+        assert row['receiver'] == transaction['receiver']
+        assert int(row['amount']) == transaction['amount']
+        assert row['timestamp'] == datetime.datetime.fromtimestamp(
+            transaction['timestamp']).strftime('%Y-%m-%d %H:%M:%S')
+    assert sum(int(row['is_fraud']) for row in rows) == stats['fraud_count']
+
+def test_ground_truth_skips_other_senders_transactions(tmp_path):
+    ledger = InMemoryLedger()
+    for amount in range(6):
+        ledger.add_transaction('0x' + '44' * 20, 100 + amount)
+    path = str(tmp_path / 'ground_truth.csv')
+    writer = GroundTruthWriter(path, ledger)
+
+    # Ours are 1, 2, 5 and 6; 3 and 4 were someone else's
+    for transaction_id, is_fraud in [(6, True), (1, False), (5, False), (2, True)]:
+        writer.add(transaction_id, is_fraud)
+    writer.close()
+
+    rows = read_rows(path)
+    assert [(row['transaction_id'], row['is_fraud'], row['amount']) for row in rows] == \
+        [('1', '0', '100'), ('2', '1', '101'), ('5', '0', '104'), ('6', '1', '105')]
+
+def test_ground_truth_is_read_on_the_writer_thread(tmp_path):
+    ledger = InMemoryLedger()
+    readers = []
+    get_transactions = ledger.get_transactions
+
+    def recording_get_transactions(start, end):
+        readers.append(threading.current_thread().name)
+        return get_transactions(start, end)
+
+    ledger.get_transactions = recording_get_transactions
+    writer = GroundTruthWriter(str(tmp_path / 'ground_truth.csv'), ledger, batch_rows=3)
+    stats = generate_load(ledger, 7, writer=writer)
+    assert stats['confirmed'] == writer.written == 7
+
+    # Batches of 3, 3 and the flushed 1, none read by the caller or the submitter
+    assert readers and set(readers) == {'ground-truth-writer'}
+    writer.close()
+    assert not writer._thread.is_alive()
+
+def test_ground_truth_refuses_a_csv_with_other_columns(tmp_path):
+    path = tmp_path / 'sample_transactions.csv'
+    path.write_text('sender,receiver,amount,timestamp,is_fraud\n')
+    with pytest.raises(ValueError):
+        GroundTruthWriter(str(path), InMemoryLedger())
+
+def test_load_raises_the_cap_of_an_already_started_submitter():
+    pytest.importorskip('eth_tester')
+    blockchain = connect_chain('eth-tester')
+    try:
+        started = blockchain.submitter
+        assert started.max_in_flight == blockchain.MAX_IN_FLIGHT
+
+        stats = generate_load(blockchain, 3, concurrency=blockchain.MAX_IN_FLIGHT * 2)
+        assert stats['confirmed'] == 3
+        assert blockchain.submitter is not started
+        assert blockchain.submitter.max_in_flight == blockchain.MAX_IN_FLIGHT * 2
+
+        # A smaller request keeps the running submitter
+        current = blockchain.submitter
+        blockchain.reserve_in_flight(8)
+        assert blockchain.submitter is current
+    finally:
+        blockchain.close()
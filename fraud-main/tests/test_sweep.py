@@ -0,0 +1,24 @@
+from ml.sweep import print_results
+
+def candidate(auc, recall, single_p50_ms):
+    return {
+        'n_estimators': 100, 'max_depth': 12, 'min_samples_leaf': 4, 'auc': auc, 'recall': recall,
+        'fit_seconds': 1.0, 'single_p50_ms': single_p50_ms, 'single_p99_ms': single_p50_ms * 2,
+        'batch_p50_ms': 10.0, 'size_mb': 5.0
+    }
+
+def test_unmet_bar_names_only_the_bounds_given(capsys):
+    results = [candidate(0.8, 0.5, 0.2)]
+
+    assert print_results(results, 0.4, min_auc=0.9) is None
+    assert capsys.readouterr().out.splitlines()[-1] == "No candidate reaches AUC >= 0.9"
+
+    assert print_results(results, 0.4, min_recall=0.7) is None
+    assert capsys.readouterr().out.splitlines()[-1] == "No candidate reaches recall >= 0.7"
+
+    assert print_results(results, 0.4, min_auc=0.9, min_recall=0.7) is None
+    assert capsys.readouterr().out.splitlines()[-1] == "No candidate reaches AUC >= 0.9 and recall >= 0.7"
+
+def test_cheapest_candidate_meeting_the_bar_is_picked():
+    results = [candidate(0.95, 0.8, 0.5), candidate(0.92, 0.8, 0.2), candidate(0.85, 0.9, 0.1)]
+    assert print_results(results, 0.4, min_auc=0.9) is results[1]
@@ -0,0 +1,162 @@
+from ml.transaction_graph import TransactionGraph
+import numpy as np
+import pytest
+
+WINDOW = 3600.0
+
+class BruteForceGraph:
+    # The features of TransactionGraph.observe() recomputed from the full
+    # (sender, receiver) -> last used map on every call
+
+    def __init__(self, window_seconds=WINDOW):
+        self.window_seconds = window_seconds
+        self.last_used = {}
+
+    def observe(self, sender, receiver, timestamp):
+        since = timestamp - self.window_seconds
+        paid = {b: t for (a, b), t in self.last_used.items() if a == sender}
+        paid_by = {a: t for (a, b), t in self.last_used.items() if b == receiver}
+        if (receiver, sender) in self.last_used:
+            cycle = 2
+        elif any((receiver, m) in self.last_used and (m, sender) in self.last_used
+                 for m in {b for a, b in self.last_used}):
+            cycle = 3
+        else:
+            cycle = 0
+        features = (len(paid), len(paid_by), sum(t >= since for t in paid.values()),
+                    sum(t >= since for t in paid_by.values()), cycle)
+        key = (sender, receiver)
+        self.last_used[key] = max(self.last_used.get(key, timestamp), timestamp)
+        return features
+
+def transactions(count, addresses, seed, start=0.0):
+    # Random transactions among a few addresses, so repeats and cycles are common
+    rng = np.random.default_rng(seed)
+    names = np.array([f'0x{i:040x}' for i in range(addresses)], dtype=object)
+    return (names[rng.integers(0, addresses, count)], names[rng.integers(0, addresses, count)],
+            np.sort(start + rng.integers(0, 4 * int(WINDOW), count)).astype(np.float64))
+
+@pytest.mark.parametrize('seed', range(4))
+def test_observe_matches_brute_force(seed):
+    graph, oracle = TransactionGraph(window_seconds=WINDOW), BruteForceGraph()
+    for sender, receiver, timestamp in zip(*transactions(400, 12, seed)):
+        assert graph.observe(sender, receiver, timestamp) == oracle.observe(sender, receiver, timestamp)
+
+@pytest.mark.parametrize('seed', range(4))
+def test_observe_batch_matches_brute_force(seed):
+    graph, oracle = TransactionGraph(window_seconds=WINDOW), BruteForceGraph()
+    senders, receivers, seconds = transactions(600, 15, seed)
+    for start in range(0, 600, 150):
+        stop = start + 150
+        expected = [oracle.observe(*row) for row in zip(senders[start:stop], receivers[start:stop], seconds[start:stop])]
+        np.testing.assert_array_equal(graph.observe_batch(senders[start:stop], receivers[start:stop],
+                                                          seconds[start:stop]), expected)
+
+@pytest.mark.parametrize('max_edges', [7, 40, 150])
+def test_observe_batch_matches_observe_through_prunes(max_edges):
+    one, batch = (TransactionGraph(window_seconds=WINDOW, max_edges=max_edges) for _ in range(2))
+    senders, receivers, seconds = transactions(900, 25, max_edges)
+    for start in range(0, 900, 113):
+        rows = slice(start, start + 113)
+        expected = [one.observe(*row) for row in zip(senders[rows], receivers[rows], seconds[rows])]
+        np.testing.assert_array_equal(batch.observe_batch(senders[rows], receivers[rows], seconds[rows]), expected)
+    # Same edges, numbered the same way
+    for name, values in one.state().items():
+        np.testing.assert_array_equal(batch.state()[name], values)
+
+def test_observe_batch_takes_rows_out_of_time_order_one_at_a_time():
+    one, batch = TransactionGraph(window_seconds=WINDOW), TransactionGraph(window_seconds=WINDOW)
+    senders, receivers, seconds = transactions(200, 10, 5)
+    seconds = seconds[::-1].copy()
+    expected = [one.observe(*row) for row in zip(senders, receivers, seconds)]
+    np.testing.assert_array_equal(batch.observe_batch(senders, receivers, seconds), expected)
+
+def test_prune_keeps_the_most_recently_used_edges():
+    graph = TransactionGraph(window_seconds=WINDOW)
+    senders, receivers, _ = transactions(300, 20, 9)
+    # Distinct times, so which edges are most recent is unambiguous
+    for index, (sender, receiver) in enumerate(zip(senders, receivers)):
+        graph.observe(sender, receiver, float(index))
+    oracle = BruteForceGraph()
+    oracle.last_used = {(graph.addresses[s], graph.addresses[r]): t for s, r, t in zip(
+        graph.edge_sender[:graph.edge_count], graph.edge_receiver[:graph.edge_count],
+        graph.edge_last_seen[:graph.edge_count])}
+
+    keep = graph.edge_count // 3
+    dropped = graph.prune(keep)
+    assert dropped == len(oracle.last_used) - keep and graph.edge_count == keep
+    oracle.last_used = dict(sorted(oracle.last_used.items(), key=lambda item: item[1])[-keep:])
+    # Only addresses of the kept edges remain
+    assert set(graph.addresses) == {address for pair in oracle.last_used for address in pair}
+
+    for sender, receiver, timestamp in zip(*transactions(200, 20, 10, start=300.0)):
+        assert graph.observe(sender, receiver, timestamp) == oracle.observe(sender, receiver, timestamp)
+
+def test_reaching_max_edges_prunes_the_oldest_half():
+    graph = TransactionGraph(window_seconds=WINDOW, max_edges=10)
+    for index in range(10):
+        graph.observe('0xa', f'0x{index}', float(index))
+    assert graph.edge_count == 10
+    graph.observe('0xb', '0xc', 10.0)
+    assert graph.edge_count == 6
+    assert graph.peek('0xa', '0x9', 11.0)[0] == 5
+
+def test_state_round_trip_continues_identically():
+    senders, receivers, seconds = transactions(500, 15, 11)
+    graph = TransactionGraph(window_seconds=WINDOW, max_edges=80)
+    graph.observe_batch(senders[:300], receivers[:300], seconds[:300])
+    restored = TransactionGraph.from_state(graph.state())
+    assert (restored.window_seconds, restored.max_edges) == (WINDOW, 80)
+    assert set(restored.addresses) == set(graph.addresses)
+
+    for row in zip(senders[300:], receivers[300:], seconds[300:]):
+        assert restored.observe(*row) == graph.observe(*row)
+
+def test_merged_keeps_the_latest_use_of_every_edge():
+    first, second = TransactionGraph(window_seconds=WINDOW), TransactionGraph(window_seconds=WINDOW)
+    first.observe('0xa', '0xb', 100.0)
+    first.observe('0xb', '0xc', 500.0)
+    second.observe('0xa', '0xb', 300.0)
+    second.observe('0xc', '0xd', 200.0)
+
+    merged = TransactionGraph.merged(first, second)
+    last_used = {(merged.addresses[s], merged.addresses[r]): t for s, r, t in zip(
+        merged.edge_sender[:merged.edge_count], merged.edge_receiver[:merged.edge_count],
+        merged.edge_last_seen[:merged.edge_count])}
+    assert last_used == {('0xa', '0xb'): 300.0, ('0xb', '0xc'): 500.0, ('0xc', '0xd'): 200.0}
+    # c paid d, b paid c: a payment d -> b closes a 3-cycle
+    assert merged.peek('0xd', '0xb', 600.0) == (0, 1, 0, 1, 3)
+
+@pytest.mark.parametrize('seed', range(150))
+def test_observe_batch_is_observe_on_random_streams(seed):
+    # Random edge streams, window, max_edges and chunking: every chunk goes
+    # through observe() on one graph and observe_batch() on another, and the
+    # features and the saved state must come out identical
+    rng = np.random.default_rng(seed)
+    addresses = int(rng.integers(1, 30))
+    window = float(rng.choice([1.0, 60.0, WINDOW, 1e9]))
+    max_edges = int(rng.choice([3, 10, 50, 1000]))
+    names = np.array([f'0x{i:040x}' for i in range(addresses)], dtype=object)
+
+    one, batch = (TransactionGraph(window_seconds=window, max_edges=max_edges) for _ in range(2))
+    if rng.random() < 0.3:
+        # Start both from the same restored history
+        for row in zip(*transactions(100, addresses, seed + 1000)):
+            one.observe(*row)
+        one, batch = TransactionGraph.from_state(one.state()), TransactionGraph.from_state(one.state())
+
+    clock = 1e6
+    for _ in range(int(rng.integers(1, 6))):
+        count = int(rng.integers(0, 120))
+        senders = names[rng.integers(0, addresses, count)]
+        # Self-payments and same-second rows included
+        receivers = np.where(rng.random(count) < 0.1, senders, names[rng.integers(0, addresses, count)])
+        seconds = clock + np.cumsum(rng.choice([0.0, 1.0, 30.0, 5000.0], count))
+        if rng.random() < 0.1:
+            seconds = rng.permutation(seconds)
+        clock = seconds.max() if count else clock
+
+        expected = np.array([one.observe(*row) for row in zip(senders, receivers, seconds)]).reshape(-1, 5)
+        np.testing.assert_array_equal(batch.observe_batch(senders, receivers, seconds), expected)
+    for name, values in one.state().items():
+        np.testing.assert_array_equal(batch.state()[name], values)
@@ -0,0 +1,128 @@
+from integration.transaction_submitter import TransactionSubmitter, TransactionReverted
+from web3.datastructures import AttributeDict
+from web3.exceptions import TransactionNotFound
+import threading
+import pytest
+import time
+
+class FakeEth:
+    # Just enough of w3.eth for the submitter; nothing is mined until mine()
+
+    def __init__(self):
+        self.block_number = 0
+        self.sent = []
+        self.receipts = {}
+        self._lock = threading.Lock()
+
+    def get_transaction_count(self, account, block_identifier):
+        return 7
+
+    def send_transaction(self, tx):
+        with self._lock:
+            self.sent.append(dict(tx))
+            return '0x%064x' % len(self.sent)
+
+    def get_transaction_receipt(self, tx_hash):
+        with self._lock:
+            if tx_hash not in self.receipts:
+                raise TransactionNotFound(f"Transaction {tx_hash} not found")
+            return self.receipts[tx_hash]
+
+    def mine(self, index, status=1):
+        # Mine the index-th transaction sent
+        with self._lock:
+            self.block_number += 1
+            tx_hash = '0x%064x' % (index + 1)
+            self.receipts[tx_hash] = AttributeDict({
+                'transactionHash': bytes.fromhex(tx_hash[2:]), 'blockNumber': self.block_number, 'status': status
+            })
+
+class FakeWeb3:
+    def __init__(self):
+        self.eth = FakeEth()
+
+class FakeCall:
+    # A contract function: build_transaction() fills in the call's fields
+    def build_transaction(self, transaction):
+        return dict(transaction, to='0x' + '11' * 20, data='0x', gas=100_000, gasPrice=1_000)
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+@pytest.fixture
+def w3():
+    return FakeWeb3()
+
+def make_submitter(w3, **options):
+    options = dict({'account': '0x' + '22' * 20, 'poll_interval': 0.01, 'stuck_after': 60.0}, **options)
+    return TransactionSubmitter(w3, **options)
+
+def test_nonces_are_assigned_locally_in_order(w3):
+    submitter = make_submitter(w3)
+    futures = [submitter.submit(FakeCall()) for _ in range(3)]
+    wait_for(lambda: len(w3.eth.sent) == 3)
+    assert [tx['nonce'] for tx in w3.eth.sent] == [7, 8, 9]
+
+    for index in range(3):
+        w3.eth.mine(index)
+    assert [future.result(timeout=5)['status'] for future in futures] == [1, 1, 1]
+    assert submitter.pending_count == 0
+    submitter.close(wait=False)
+
+def test_reverted_receipt_fails_the_future(w3):
+    submitter = make_submitter(w3)
+    future = submitter.submit(FakeCall())
+    wait_for(lambda: w3.eth.sent)
+    w3.eth.mine(0, status=0)
+
+    with pytest.raises(TransactionReverted) as excinfo:
+        future.result(timeout=5)
+    assert excinfo.value.receipt['status'] == 0
+    assert submitter.pending_count == 0
+    submitter.close(wait=False)
+
+def test_stuck_transaction_is_replaced_with_higher_fees(w3):
+    submitter = make_submitter(w3, stuck_after=0.05, max_replacements=2)
+    future = submitter.submit(FakeCall())
+    wait_for(lambda: len(w3.eth.sent) == 3)
+    time.sleep(0.2)
+
+    # Same nonce every time, each copy paying fee_bump more than the last,
+    # and no more copies than max_replacements
+    original, first, second = w3.eth.sent
+    assert len(w3.eth.sent) == 3
+    assert original['nonce'] == first['nonce'] == second['nonce']
+    assert first['gasPrice'] == int(original['gasPrice'] * submitter.fee_bump) + 1
+    assert second['gasPrice'] > first['gasPrice']
+
+    # Whichever copy is mined resolves the Future
+    w3.eth.mine(1)
+    assert future.result(timeout=5)['transactionHash'] == bytes.fromhex('%064x' % 2)
+    submitter.close(wait=False)
+
+def test_unmined_transaction_times_out(w3):
+    submitter = make_submitter(w3, timeout=0.1, max_replacements=0)
+    future = submitter.submit(FakeCall())
+
+    with pytest.raises(TimeoutError):
+        future.result(timeout=5)
+    assert submitter.pending_count == 0
+    submitter.close(wait=False)
+
+def test_failed_send_resyncs_the_nonce(w3):
+    submitter = make_submitter(w3)
+
+    class FailingCall:
+        def build_transaction(self, transaction):
+            raise ValueError("execution reverted")
+
+    with pytest.raises(ValueError):
+        submitter.submit(FailingCall()).result(timeout=5)
+    # The nonce handed to the failed call is asked for again from the node
+    submitter.submit(FakeCall())
+    wait_for(lambda: w3.eth.sent)
+    assert w3.eth.sent[0]['nonce'] == 7
+    submitter.close(wait=False)